@@ -0,0 +1,327 @@
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from CiteSide.Benchmark.SyntheticCorpus import SyntheticCorpus
+from CiteSide.FileHandler.JsonHandler import JsonHandler
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+
+class BenchmarkSuite:
+    """
+    Benchmarks of the pipeline stages on a synthetic corpus.
+
+    Every benchmark prepares its input outside of the timed part and is run
+    `repeat` times, the fastest run counts; a benchmark returning an int
+    reports that many ops instead of the prepared count. Chunking, linking,
+    retrieval, entailment and validation_run use the stub models
+    (StubModels), so they measure the code around the models and run without
+    model weights. Results are plain JSON;
+    `compare` checks them against a baseline and reports every benchmark that
+    got slower than `threshold` (relative) as regression.
+    """
+
+    BENCHMARKS = (
+        "graph_build", "crawl", "comb_index", "propagated_index", "store_load", "snapshot", "corpus_load",
+        "chunking", "chunking_spans", "linking", "linking_spans", "retrieval", "entailment", "dedup", "validation_run",
+    )
+
+    def __init__(self, papers: int = 500, references: int = 10, sentences: int = 60,
+                 repeat: int = 3, seed: int = 0, crawl_roots: int = 50, entailment_snippets: int = 500):
+        self.config = {
+            "papers": papers, "references": references, "sentences": sentences,
+            "repeat": repeat, "seed": seed, "crawl_roots": crawl_roots, "entailment_snippets": entailment_snippets,
+        }
+        self.repeat = max(1, repeat)
+        self._tmp = tempfile.TemporaryDirectory(prefix="citeside_bench_")
+        self.tmp = Path(self._tmp.name)
+        self.records = SyntheticCorpus(papers, references, sentences, seed=seed).generate()
+        self.corpus_path = self.tmp / "corpus.jsonl"
+        with open(self.corpus_path, "w", encoding="utf-8") as f:
+            for record in self.records:
+                f.write(json.dumps(record) + "\n")
+        self.jh = JsonHandler()
+        self.jh.loadDataset(str(self.corpus_path))
+        self._weighted_snapshot = None
+
+    def close(self):
+        self._tmp.cleanup()
+
+    def run(self, names: Optional[List[str]] = None, log: Callable[[str], None] = print) -> dict:
+        results = {}
+        for name in names or self.BENCHMARKS:
+            if name not in self.BENCHMARKS:
+                raise ValueError(f"Unknown benchmark {name}, available: {', '.join(self.BENCHMARKS)}")
+            runs = []
+            ops = 0
+            for _ in range(self.repeat):
+                fn, ops = getattr(self, f"_{name}")()
+                start = time.perf_counter()
+                done = fn()
+                runs.append(time.perf_counter() - start)
+                if isinstance(done, int):
+                    ops = done
+            best = min(runs)
+            results[name] = {"seconds": best, "runs": runs, "ops": ops, "ops_per_s": ops / best if best > 0 else 0.0}
+            log(f"[BENCH] {name:<18} {best:9.4f}s  {results[name]['ops_per_s']:12.1f} ops/s  ({ops} ops)")
+        return {
+            "meta": {
+                "config": self.config,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "results": results,
+        }
+
+    # ---------- preparation ----------
+
+    def _weightedTree(self) -> ReferenceTreeBuilder:
+        # a tree with scored edges, built once and reloaded from a snapshot
+        if self._weighted_snapshot is None:
+            tree = ReferenceTreeBuilder.fromCorpus(self.jh, follow=False)
+            rng = random.Random(self.config["seed"])
+            for source, target, _ in tree.getEdges():
+                if rng.random() < 0.8:
+                    tree.changeWeightOfEdge(source, target, rng.random())
+            self._weighted_snapshot = str(self.tmp / "weighted.npz")
+            tree.storeSnapshot(self._weighted_snapshot)
+        return ReferenceTreeBuilder.loadSnapshot(self._weighted_snapshot)
+
+    def _chunks(self) -> List[Tuple[dict, str, int, int]]:
+        # (paper, chunk text, offset, length) per sentence, from the precomputed spans
+        chunks = []
+        for record in self.records:
+            text = record["full_text"]
+            for offset, length in record["sentence_spans"]:
+                chunks.append((record, text[offset:offset + length], offset, length))
+        return chunks
+
+    def _refs(self, record: dict) -> List[dict]:
+        # what ValidationRunner.getSuccessorAuthorAndYear hands to the linker
+        return [
+            {"paper_id": ref, "authors": self.jh.getAuthors(ref), "year": self.jh.getYear(ref)}
+            for ref in record["references"] if ref in self.jh.getFiles()
+        ]
+
+    # ---------- graph ----------
+
+    def _graph_build(self):
+        edges = sum(len(r["references"]) for r in self.records)
+        return lambda: ReferenceTreeBuilder.fromCorpus(self.jh, follow=False), edges
+
+    def _crawl(self):
+        tree = self._weightedTree()
+        ids = [r["paper_id"] for r in self.records]
+        roots = ids[-self.config["crawl_roots"]:]
+
+        def crawl():
+            for root in roots:
+                tree.buildCrawlTree(root, 3, 1).edges()
+        return crawl, len(roots)
+
+    def _comb_index(self):
+        tree = self._weightedTree()
+        return tree.buildCombCritIndex, len(tree.getEdges())
+
+    def _propagated_index(self):
+        tree = self._weightedTree()
+        return tree.buildPropagatedCritIndex, len(self.records)
+
+    def _store_load(self):
+        tree = self._weightedTree()
+        path = str(self.tmp / "tree.json")
+
+        def store_load():
+            tree.store(path)
+            ReferenceTreeBuilder.load(path)
+        return store_load, len(self.records)
+
+    def _snapshot(self):
+        tree = self._weightedTree()
+        path = str(self.tmp / "tree.npz")
+
+        def snapshot():
+            tree.storeSnapshot(path)
+            ReferenceTreeBuilder.loadSnapshot(path)
+        return snapshot, len(self.records)
+
+    def _corpus_load(self):
+        def load():
+            JsonHandler().loadDataset(str(self.corpus_path))
+        return load, len(self.records)
+
+    # ---------- usage validation (stub models) ----------
+
+    def _collector(self):
+        from CiteSide.UsageValidator.SnippetCollector import SnippetCollector
+        from CiteSide.UsageValidator.StubModels import StubSentenceTransformer
+        return SnippetCollector(model=StubSentenceTransformer())
+
+    def _chunking(self):
+        collector = self._collector()
+
+        def chunking():
+            for record in self.records:
+                collector.chunk_sentences(record["full_text"])
+        return chunking, len(self.records)
+
+    def _chunking_spans(self):
+        collector = self._collector()
+
+        def chunking():
+            for record in self.records:
+                collector.chunk_sentences(record["full_text"], record["sentence_spans"])
+        return chunking, len(self.records)
+
+    def _linking(self):
+        from CiteSide.UsageValidator.ReferenceLinker import ReferenceLinker
+        linker = ReferenceLinker()
+        chunks = self._chunks()
+        refs = {r["paper_id"]: self._refs(r) for r in self.records}
+
+        def linking():
+            for record, text, _, _ in chunks:
+                linker.link_references(text, refs[record["paper_id"]])
+        return linking, len(chunks)
+
+    def _linking_spans(self):
+        from CiteSide.UsageValidator.ReferenceLinker import ReferenceLinker
+        linker = ReferenceLinker()
+        chunks = self._chunks()
+        refs = {r["paper_id"]: self._refs(r) for r in self.records}
+
+        def linking():
+            for record, _, offset, length in chunks:
+                linker.link_citations(offset, length, record["citation_spans"], refs[record["paper_id"]])
+        return linking, len(chunks)
+
+    def _retrieval(self):
+        collector = self._collector()
+        argument = "The mean incubation period of the virus is between 4 and 14 days."
+
+        def retrieval():
+            for record in self.records:
+                collector.match_argument(record["full_text"], argument, sentence_spans=record["sentence_spans"])
+        return retrieval, len(self.records)
+
+    def _entailment(self):
+        from CiteSide.UsageValidator.LlamaContentEntailment import LlamaContentEntailment
+        from CiteSide.UsageValidator.StubModels import StubLlama
+        entailment = LlamaContentEntailment(llm=StubLlama())
+        argument = "The mean incubation period of the virus is between 4 and 14 days."
+        snippets = [text for _, text, _, _ in self._chunks()[:self.config["entailment_snippets"]]]
+
+        def validate():
+            for snippet in snippets:
+                entailment.validate(argument, snippet)
+        return validate, len(snippets)
+
+    def _dedup(self):
+        from CiteSide.UsageValidator.SnippetDeduplicator import SnippetDeduplicator
+        deduplicator = SnippetDeduplicator()
+        texts = [text for _, text, _, _ in self._chunks()[:self.config["entailment_snippets"]]]
+        # every snippet once more with its last word swapped, as a follow-up paper would repeat it
+        snippets = texts + [text.rsplit(" ", 1)[0] + " reported." for text in texts]
+
+        def dedup():
+            deduplicator.clear()
+            for snippet in snippets:
+                deduplicator.assign(snippet)
+        return dedup, len(snippets)
+
+    def _validation_run(self):
+        # the whole crawl of ValidationRunner on stub models, ops are the validated papers
+        from CiteSide.Runner import ValidationRunner
+        from CiteSide.Runner.RunContext import RunContext
+        from CiteSide.UsageValidator.UsageValidator import UsageValidator
+        context = RunContext(self.jh, ReferenceTreeBuilder.fromCorpus(self.jh, follow=False), UsageValidator.withStubs())
+        argument = "The mean incubation period of the virus is between 4 and 14 days."
+        root = self.records[-1]["paper_id"]
+
+        def validation_run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                searched_tree, _ = ValidationRunner.run(argument, root, context, plot=False)
+            return len(searched_tree.toNetworkx())
+        return validation_run, 0
+
+
+def compare(results: dict, baseline: dict, threshold: float = 0.25) -> List[dict]:
+    """
+    One row per benchmark of `results`: baseline and current seconds, their
+    ratio and status "regression" (slower than 1 + threshold times the
+    baseline), "improved" (faster than 1 - threshold), "ok" or "new".
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, result in results["results"].items():
+        base = base_results.get(name)
+        if base is None:
+            rows.append({"name": name, "baseline_s": None, "seconds": result["seconds"], "ratio": None, "status": "new"})
+            continue
+        ratio = result["seconds"] / base["seconds"] if base["seconds"] > 0 else float("inf")
+        if ratio > 1.0 + threshold:
+            status = "regression"
+        elif ratio < 1.0 - threshold:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"name": name, "baseline_s": base["seconds"], "seconds": result["seconds"], "ratio": ratio, "status": status})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="CiteSide benchmark suite")
+    ap.add_argument("--papers", type=int, default=500)
+    ap.add_argument("--references", type=int, default=10)
+    ap.add_argument("--sentences", type=int, default=60)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--only", nargs="+", default=None, choices=BenchmarkSuite.BENCHMARKS, help="Run only these benchmarks")
+    ap.add_argument("--json", default=None, help="Write the results to this file (use it as next baseline)")
+    ap.add_argument("--baseline", default=None, help="Compare against these results and fail on regressions")
+    ap.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown against the baseline")
+    args = ap.parse_args(argv)
+
+    print(f"Generating synthetic corpus with {args.papers} papers...")
+    suite = BenchmarkSuite(args.papers, args.references, args.sentences, args.repeat, args.seed)
+    try:
+        results = suite.run(args.only)
+    finally:
+        suite.close()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("meta", {}).get("config") != results["meta"]["config"]:
+        print("Warning: the baseline was recorded with a different configuration")
+    rows = compare(results, baseline, args.threshold)
+    print(f"\nComparison with {args.baseline} (threshold {args.threshold:.0%}):")
+    for row in rows:
+        base = f"{row['baseline_s']:9.4f}s" if row["baseline_s"] is not None else "        -"
+        ratio = f"{row['ratio']:6.2f}x" if row["ratio"] is not None else "      -"
+        print(f"  {row['name']:<18} {base} -> {row['seconds']:9.4f}s {ratio}  {row['status']}")
+    regressions = [row["name"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"FAILED: {len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    print("OK: no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
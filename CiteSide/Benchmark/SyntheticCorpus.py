@@ -0,0 +1,129 @@
+import argparse
+import json
+import random
+from typing import Iterator, List, Optional
+
+_WORDS = (
+    "virus incubation period days patients cohort analysis data model estimate mean "
+    "transmission infection clinical symptoms onset study cases median interval "
+    "respiratory outbreak population exposure risk severe hospital reported vaccine "
+    "antibody response trial dose efficacy mortality rate age group region"
+).split()
+_FORENAMES = ["Ann", "Bo", "Chen", "Dee", "Emil", "Fatima", "Goran", "Hana", "Ivo", "Julia", "Kofi", "Lena"]
+_SURNAMES = [
+    "Lai", "Wang", "Smith", "Li", "Novak", "Huber", "Garcia", "Kim", "Okafor", "Rossi",
+    "Nguyen", "Schmidt", "Tanaka", "Silva", "Kowalski", "Moreau", "Ivanova", "Haddad",
+]
+
+
+class SyntheticCorpus:
+    """
+    Generator for synthetic corpora in the JsonHandler schema.
+
+    Every paper has an author string ("Forename Surname and ..."), a year, a
+    full_text of generated sentences and references to older papers of the
+    corpus (so the citation graph is acyclic) plus a share of references to
+    papers outside of it. Cited corpus papers appear in the text as
+    "(Surname et al., Year)" markers like the preprocessor writes them, and
+    the sentence_spans / citation_spans the preprocessor emits with --spans
+    are generated alongside. The same seed always gives the same corpus.
+    """
+
+    def __init__(
+            self,
+            papers: int = 1000,
+            references: int = 20,
+            sentences: int = 60,
+            citation_rate: float = 0.3,
+            external_rate: float = 0.2,
+            seed: int = 0):
+        self.papers = papers
+        self.references = references
+        self.sentences = sentences
+        self.citation_rate = citation_rate
+        self.external_rate = external_rate
+        self.seed = seed
+
+    @staticmethod
+    def paperId(i: int) -> str:
+        return f"P{i:07d}"
+
+    @staticmethod
+    def marker(authors: List[str], year: str) -> str:
+        surnames = [a.split()[-1] for a in authors]
+        if len(surnames) == 1:
+            return f"({surnames[0]}, {year})"
+        if len(surnames) == 2:
+            return f"({surnames[0]} & {surnames[1]}, {year})"
+        return f"({surnames[0]} et al., {year})"
+
+    def records(self) -> Iterator[dict]:
+        rng = random.Random(self.seed)
+        authors_of: List[List[str]] = []
+        years: List[str] = []
+        for i in range(self.papers):
+            authors = [f"{rng.choice(_FORENAMES)} {rng.choice(_SURNAMES)}" for _ in range(rng.randint(1, 5))]
+            year = str(1990 + i * 35 // max(1, self.papers) + rng.randint(0, 2))
+            authors_of.append(authors)
+            years.append(year)
+
+            cited = sorted(rng.sample(range(i), min(i, self.references)))
+            references = [self.paperId(c) for c in cited]
+            references += [f"R_ext{i}_{k}" for k in range(int(self.references * self.external_rate))]
+
+            text = ""
+            sentence_spans, citation_spans = [], []
+            for _ in range(self.sentences):
+                if text:
+                    text += " "
+                sentence = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 20))).capitalize()
+                if cited and rng.random() < self.citation_rate:
+                    c = rng.choice(cited)
+                    marker = self.marker(authors_of[c], years[c])
+                    citation_spans.append([len(text) + len(sentence) + 1, len(marker), self.paperId(c)])
+                    sentence += " " + marker
+                sentence += "."
+                sentence_spans.append([len(text), len(sentence)])
+                text += sentence
+
+            yield {
+                "paper_id": self.paperId(i),
+                "title": " ".join(rng.choice(_WORDS) for _ in range(8)).capitalize(),
+                "full_text": text,
+                "abstract": " ".join(rng.choice(_WORDS) for _ in range(40)).capitalize() + ".",
+                "year": year,
+                "authors": " and ".join(authors),
+                "references": references,
+                "sentence_spans": sentence_spans,
+                "citation_spans": citation_spans,
+            }
+
+    def generate(self) -> List[dict]:
+        return list(self.records())
+
+    def write(self, path: str) -> int:
+        # JSONL, readable by JsonHandler.loadDataset/loadLazy and SqliteStore.importFile
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records():
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Write a synthetic corpus JSONL")
+    ap.add_argument("output", help="JSONL file to write")
+    ap.add_argument("--papers", type=int, default=1000)
+    ap.add_argument("--references", type=int, default=20, help="References to corpus papers per paper")
+    ap.add_argument("--sentences", type=int, default=60, help="Sentences of full_text per paper")
+    ap.add_argument("--citation-rate", type=float, default=0.3, help="Share of sentences with a citation marker")
+    ap.add_argument("--external-rate", type=float, default=0.2, help="References outside the corpus, relative to --references")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    corpus = SyntheticCorpus(args.papers, args.references, args.sentences, args.citation_rate, args.external_rate, args.seed)
+    print(f"Wrote {corpus.write(args.output)} paper(s) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
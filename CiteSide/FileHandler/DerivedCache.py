@@ -0,0 +1,77 @@
+from typing import Callable, Dict, Hashable, Iterable
+
+
+class DerivedCache:
+    """
+    Cache for results derived from corpus papers (embeddings, entailment and
+    validation results, ...).
+
+    Every entry records the content hashes of the papers it was computed
+    from and is only returned while all of them are unchanged. The cache
+    subscribes to the JsonHandler, so entries are also dropped as soon as
+    one of their papers is updated or removed.
+    """
+
+    def __init__(self, corpus):
+        self._corpus = corpus
+        self._entries: Dict[Hashable, tuple] = {}
+        self._by_paper: Dict[str, set] = {}
+        self._hits = 0
+        self._misses = 0
+        self._invalidated = 0
+        corpus.subscribe(self.onCorpusChange)
+
+    def get(self, key: Hashable, default=None):
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, depends_on = entry
+            if all(self._corpus.getHash(paper_id) == content_hash for paper_id, content_hash in depends_on.items()):
+                self._hits += 1
+                return value
+            self._drop(key)
+        self._misses += 1
+        return default
+
+    def put(self, key: Hashable, value, papers: Iterable[str]):
+        self._drop(key)
+        depends_on = {paper_id: self._corpus.getHash(paper_id) for paper_id in papers}
+        self._entries[key] = (value, depends_on)
+        for paper_id in depends_on:
+            self._by_paper.setdefault(paper_id, set()).add(key)
+
+    def getOrCompute(self, key: Hashable, papers: Iterable[str], compute: Callable[[], object]):
+        papers = list(papers)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value, papers)
+        return value
+
+    def onCorpusChange(self, change):
+        for key in list(self._by_paper.get(change.paper_id, ())):
+            self._drop(key)
+            self._invalidated += 1
+
+    def getStats(self) -> dict:
+        return {"entries": len(self._entries), "hits": self._hits, "misses": self._misses, "invalidated": self._invalidated}
+
+    def close(self):
+        self._corpus.unsubscribe(self.onCorpusChange)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for paper_id in entry[1]:
+            keys = self._by_paper.get(paper_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_paper[paper_id]
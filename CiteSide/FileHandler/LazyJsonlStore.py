@@ -0,0 +1,87 @@
+import json
+import mmap
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+
+
+class LazyJsonlStore(Mapping):
+    """
+    Read-only paper_id -> record mapping over a JSONL corpus.
+
+    The file is memory-mapped and a byte-offset index keyed by paper_id is
+    built once and persisted next to it (`<file>.idx.json`); it is rebuilt
+    when the corpus file changes. Records are only decoded on first access
+    and the last `cache_size` decoded records are kept in an LRU.
+    """
+
+    def __init__(self, path: str, cache_size: int = 128):
+        self._path = Path(path)
+        self._cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._file = open(self._path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else b""
+        self._offsets = self._loadIndex()
+
+    @staticmethod
+    def indexPath(path: str) -> Path:
+        return Path(f"{path}.idx.json")
+
+    def __getitem__(self, paper_id: str) -> dict:
+        record = self._cache.get(paper_id)
+        if record is not None:
+            self._cache.move_to_end(paper_id)
+            return record
+        start, length = self._offsets[paper_id]
+        record = json.loads(self._mm[start:start + length])
+        self._cache[paper_id] = record
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return record
+
+    def __contains__(self, paper_id) -> bool:
+        return paper_id in self._offsets
+
+    def __iter__(self):
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def close(self):
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def _loadIndex(self) -> dict:
+        stat = self._path.stat()
+        index_path = LazyJsonlStore.indexPath(self._path)
+        if index_path.exists():
+            with open(index_path, "r", encoding="UTF8") as f:
+                index = json.load(f)
+            if index.get("size") == stat.st_size and index.get("mtime_ns") == stat.st_mtime_ns:
+                return {paper_id: tuple(pos) for paper_id, pos in index["offsets"].items()}
+
+        offsets = {}
+        start = 0
+        end = len(self._mm)
+        while start < end:
+            stop = self._mm.find(b"\n", start)
+            if stop < 0:
+                stop = end
+            line = self._mm[start:stop]
+            if line.strip():
+                offsets[json.loads(line)["paper_id"]] = (start, stop - start)
+            start = stop + 1
+
+        tmp = index_path.with_name(index_path.name + ".tmp")
+        try:
+            with open(tmp, "w", encoding="UTF8") as f:
+                json.dump({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offsets": offsets}, f)
+            os.replace(tmp, index_path)
+        except OSError:
+            # read-only location, the index is simply rebuilt next time
+            pass
+        return offsets
@@ -0,0 +1,192 @@
+import argparse
+import json
+import sqlite3
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Iterator, List
+
+
+class SqliteStore(Mapping):
+    """
+    paper_id -> record mapping backed by an indexed SQLite database.
+
+    Used by JsonHandler.loadSqlite for corpora that do not fit a single JSON
+    blob: getters become O(log n) point lookups of single columns and memory
+    stays constant. Build the database with `importFile` or from the command
+    line:
+        python -m CiteSide.FileHandler.SqliteStore import corpus.jsonl corpus.sqlite
+
+    The columns hold text so that they can be indexed and searched. Values
+    of another type (e.g. an int year or a list of authors) are kept as JSON
+    in `typed` as well and read back with their type, so records come out
+    exactly as they were put in.
+    """
+
+    COLUMNS = ("title", "full_text", "abstract", "year", "authors", "url")
+
+    def __init__(self, path: str):
+        self._path = Path(path)
+        self._conn = sqlite3.connect(str(self._path))
+        SqliteStore.createSchema(self._conn)
+
+    @staticmethod
+    def createSchema(conn: sqlite3.Connection):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS papers (
+                paper_id   TEXT PRIMARY KEY,
+                title      TEXT,
+                full_text  TEXT,
+                abstract   TEXT,
+                year       TEXT,
+                authors    TEXT,
+                url        TEXT,
+                refs       TEXT,
+                extra      TEXT,
+                typed      TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_papers_authors ON papers(authors);
+            CREATE INDEX IF NOT EXISTS idx_papers_year ON papers(year);
+        """)
+        # databases written before the typed column existed
+        if "typed" not in {row[1] for row in conn.execute("PRAGMA table_info(papers)")}:
+            conn.execute("ALTER TABLE papers ADD COLUMN typed TEXT")
+
+    def __getitem__(self, paper_id: str) -> dict:
+        row = self._conn.execute(
+            f"SELECT paper_id, {', '.join(self.COLUMNS)}, refs, extra, typed FROM papers WHERE paper_id = ?", (paper_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(paper_id)
+        return SqliteStore._toRecord(row)
+
+    def getField(self, paper_id: str, field: str):
+        # single column lookup, avoids decoding full_text for getAuthors/getYear
+        if field in self.COLUMNS:
+            row = self._conn.execute(f"SELECT {field}, typed FROM papers WHERE paper_id = ?", (paper_id,)).fetchone()
+            if row is None:
+                return None
+            typed = json.loads(row[1]) if row[1] else {}
+            return typed.get(field, row[0])
+        if field == "references":
+            row = self._conn.execute("SELECT refs FROM papers WHERE paper_id = ?", (paper_id,)).fetchone()
+            return json.loads(row[0]) if row and row[0] is not None else None
+        item = self.get(paper_id)
+        return item.get(field) if item else None
+
+    def __contains__(self, paper_id) -> bool:
+        return self._conn.execute("SELECT 1 FROM papers WHERE paper_id = ?", (paper_id,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (paper_id,) in self._conn.execute("SELECT paper_id FROM papers ORDER BY rowid"):
+            yield paper_id
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def getIdsByAuthors(self, authors: str) -> List[str]:
+        return [r[0] for r in self._conn.execute("SELECT paper_id FROM papers WHERE authors = ?", (authors,))]
+
+    def getIdsByYear(self, year: str) -> List[str]:
+        return [r[0] for r in self._conn.execute("SELECT paper_id FROM papers WHERE year = ?", (str(year),))]
+
+    def put(self, records):
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO papers (paper_id, {', '.join(self.COLUMNS)}, refs, extra, typed) VALUES ({', '.join('?' * (len(self.COLUMNS) + 4))})",
+            (SqliteStore._toRow(r) for r in records),
+        )
+        self._conn.commit()
+
+    def delete(self, paper_id: str):
+        self._conn.execute("DELETE FROM papers WHERE paper_id = ?", (paper_id,))
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+    @staticmethod
+    def _toRow(record: dict) -> tuple:
+        extra = {k: v for k, v in record.items() if k not in SqliteStore.COLUMNS and k not in ("paper_id", "references")}
+        refs = record.get("references")
+        typed = {c: record[c] for c in SqliteStore.COLUMNS if record.get(c) is not None and not isinstance(record[c], str)}
+        return (
+            record["paper_id"],
+            *(SqliteStore._columnText(record.get(c)) for c in SqliteStore.COLUMNS),
+            json.dumps(refs) if refs is not None else None,
+            json.dumps(extra) if extra else None,
+            json.dumps(typed) if typed else None,
+        )
+
+    @staticmethod
+    def _columnText(value):
+        # numbers as their text so that getIdsByYear(2021) and "2021" match, everything else as JSON
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value)
+        return json.dumps(value, ensure_ascii=False)
+
+    @staticmethod
+    def _toRecord(row: tuple) -> dict:
+        record = {"paper_id": row[0]}
+        for column, value in zip(SqliteStore.COLUMNS, row[1:]):
+            if value is not None:
+                record[column] = value
+        refs, extra, typed = row[-3], row[-2], row[-1]
+        if typed:
+            record.update(json.loads(typed))
+        if refs is not None:
+            record["references"] = json.loads(refs)
+        if extra:
+            record.update(json.loads(extra))
+        return record
+
+    @staticmethod
+    def iterRecords(path: str):
+        # JSON arrays have to be parsed at once, JSONL is streamed line by line
+        with open(path, "r", encoding="UTF8") as f:
+            first = f.read(1)
+            while first and first.isspace():
+                first = f.read(1)
+            f.seek(0)
+            if first == "[":
+                yield from json.load(f)
+                return
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    @classmethod
+    def importFile(cls, source: str, db_path: str, batch_size: int = 1000) -> int:
+        store = cls(db_path)
+        batch = []
+        count = 0
+        for record in cls.iterRecords(source):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                store.put(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            store.put(batch)
+            count += len(batch)
+        store.close()
+        return count
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="SQLite corpus store for the JsonHandler")
+    sub = ap.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Bulk import a JSON/JSONL dataset")
+    imp.add_argument("source", help="JSON array or JSONL dataset")
+    imp.add_argument("database", help="SQLite file to create or extend")
+    imp.add_argument("--batch-size", type=int, default=1000)
+    args = ap.parse_args()
+
+    if args.command == "import":
+        count = SqliteStore.importFile(args.source, args.database, args.batch_size)
+        print(f"Imported {count} paper(s) into {args.database}")
+
+
+if __name__ == "__main__":
+    main()
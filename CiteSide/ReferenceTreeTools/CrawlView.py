@@ -0,0 +1,69 @@
+import numpy as np
+from typing import List, Optional
+
+
+class CrawlView:
+    """
+    Lightweight result of ReferenceTreeBuilder.buildCrawlTree.
+
+    Holds only the crawl depth of every node of the parent graph (NaN for
+    nodes outside the crawl) and reads nodes, depths and edges from the
+    parent. Everything else (printTree, plotTree, buildCombCritIndex, store,
+    ...) works on the standalone ReferenceTreeBuilder returned by
+    materialize(), which copies the crawled part of the graph once.
+    """
+
+    def __init__(self, parent, root: str, max_depth: int, reverse_depth: Optional[int], depth: np.ndarray):
+        self._parent = parent
+        self._root = root
+        self._max_depth = max_depth
+        self._reverse_depth = reverse_depth
+        self._depth = depth
+        self._m = parent._graph.numberOfEdges()
+        self._tree = None
+
+    def getRoot(self) -> str:
+        return self._root
+
+    def nodeMask(self) -> np.ndarray:
+        return ~np.isnan(self._depth)
+
+    def nodes(self) -> np.ndarray:
+        return np.flatnonzero(self.nodeMask())
+
+    def getNodes(self) -> List[str]:
+        graph = self._parent._graph
+        return [graph.nodeId(n) for n in self.nodes().tolist()]
+
+    def getDepth(self, node_id: str):
+        node = self._parent._graph.nodeIndex(node_id)
+        if node < 0 or node >= len(self._depth) or np.isnan(self._depth[node]):
+            return None
+        return int(self._depth[node])
+
+    def edges(self) -> np.ndarray:
+        # out-edges of forward nodes that were expanded and in-edges of expanded reverse nodes
+        src, dst = self._parent._graph.edgeEndpoints()
+        src_depth = self._depth[src[:self._m]]
+        dst_depth = self._depth[dst[:self._m]]
+        with np.errstate(invalid="ignore"):
+            mask = (src_depth >= 0) & (src_depth < self._max_depth)
+            if self._reverse_depth is not None:
+                mask |= (dst_depth <= 0) & (dst_depth > self._reverse_depth)
+        return np.flatnonzero(mask & self._parent._graph.edgeMask()[:self._m])
+
+    def materialize(self):
+        if self._tree is not None:
+            return self._tree
+        graph = self._parent._graph
+        nodes = self.nodes()
+        edges = self.edges()
+        tree = self._parent.__class__()
+        tree._graph = graph.subgraph(nodes, edges)
+        tree._graph.edgeColumn("weight", -1.0)[:] = graph.edgeColumn("weight")[edges]
+        tree._graph.nodeColumn("depth")[:] = self._depth[nodes]
+        tree._crawl_root = self._root
+        tree._crawl_depth = self._max_depth
+        tree._reverse_depth = self._reverse_depth
+        self._tree = tree
+        return tree
@@ -0,0 +1,141 @@
+import numpy as np
+from typing import Iterable, Optional
+
+# share of changed edges above which a full re-sort is cheaper than splicing
+RESORT_RATIO = 0.05
+
+
+class CritIndex:
+    """
+    Ordered index over the scored (non-negative) weights of the live edges
+    of a CsrGraph.
+
+    Keeps the edge ids sorted by weight and sorted by (source, weight), so
+    top-k, range and per-source queries are binary searches. Weight changes
+    are only collected and merged lazily before the next query: a few are
+    spliced into the sorted arrays, many trigger a full re-sort.
+
+    Queries follow the pipeline's convention that a low weight is critical
+    (a contradicted citation) and a high one non critical (a supported
+    citation), so results are ordered by ascending weight, most critical
+    first; descending=True returns the least critical first.
+    """
+
+    def __init__(self, graph):
+        self._graph = graph
+        self._dirty = set()
+        self._stale = True
+        self._by_weight = np.empty(0, dtype=np.int64)
+        self._weights = np.empty(0)
+        self._by_source = np.empty(0, dtype=np.int64)
+        self._sources = np.empty(0, dtype=np.int64)
+        self._source_weights = np.empty(0)
+
+    def invalidate(self, edges: Iterable[int]):
+        if not self._stale:
+            self._dirty.update(int(e) for e in edges)
+
+    def invalidateAll(self):
+        self._stale = True
+        self._dirty.clear()
+
+    def topK(self, k: int, min_depth: Optional[int] = None, max_depth: Optional[int] = None, descending: bool = False) -> np.ndarray:
+        """Ids of the k most critical (lowest weight) edges, most critical first."""
+        self._refresh()
+        ordered = self._by_weight[::-1] if descending else self._by_weight
+        if min_depth is None and max_depth is None:
+            return ordered[:k]
+        found = []
+        count = 0
+        chunk = max(k, 64)
+        # walk along the order in chunks until k edges pass the depth filter
+        for start in range(0, len(ordered), chunk):
+            edges = ordered[start:start + chunk]
+            edges = edges[self._depthMask(edges, min_depth, max_depth)]
+            found.append(edges)
+            count += len(edges)
+            if count >= k:
+                break
+        return np.concatenate(found)[:k] if found else self._by_weight[:0]
+
+    def inRange(self, low: float, high: float, min_depth: Optional[int] = None, max_depth: Optional[int] = None,
+                descending: bool = False) -> np.ndarray:
+        """Ids of the edges with low <= weight <= high, most critical first."""
+        self._refresh()
+        lo = np.searchsorted(self._weights, low, side="left")
+        hi = np.searchsorted(self._weights, high, side="right")
+        edges = self._by_weight[lo:hi]
+        if descending:
+            edges = edges[::-1]
+        return edges[self._depthMask(edges, min_depth, max_depth)]
+
+    def topKOfSource(self, source: int, k: int, descending: bool = False) -> np.ndarray:
+        self._refresh()
+        lo = np.searchsorted(self._sources, source, side="left")
+        hi = np.searchsorted(self._sources, source, side="right")
+        edges = self._by_source[lo:hi]
+        return (edges[::-1] if descending else edges)[:k]
+
+    def _depthMask(self, edges: np.ndarray, min_depth: Optional[int], max_depth: Optional[int]) -> np.ndarray:
+        # an edge lies at the crawl depth of its citing (source) paper
+        mask = np.ones(len(edges), dtype=bool)
+        if min_depth is None and max_depth is None:
+            return mask
+        if not self._graph.hasNodeColumn("depth"):
+            return ~mask
+        depth = self._graph.nodeColumn("depth")[self._graph.edgeEndpoints()[0][edges]]
+        with np.errstate(invalid="ignore"):
+            if min_depth is not None:
+                mask &= depth >= min_depth
+            if max_depth is not None:
+                mask &= depth <= max_depth
+        return mask
+
+    def _refresh(self):
+        if self._stale or len(self._dirty) > RESORT_RATIO * max(1, len(self._by_weight)):
+            self._rebuild()
+        elif self._dirty:
+            self._splice(np.fromiter(self._dirty, dtype=np.int64))
+        self._dirty.clear()
+
+    def _rebuild(self):
+        weights = self._graph.edgeColumn("weight")
+        src = self._graph.edgeEndpoints()[0]
+        edges = np.flatnonzero((weights >= 0) & self._graph.edgeMask())
+        order = np.argsort(weights[edges], kind="stable")
+        self._by_weight = edges[order]
+        self._weights = weights[self._by_weight]
+        order = np.lexsort((weights[edges], src[edges]))
+        self._by_source = edges[order]
+        self._sources = src[self._by_source].astype(np.int64)
+        self._source_weights = weights[self._by_source]
+        self._stale = False
+
+    def _splice(self, changed: np.ndarray):
+        weights = self._graph.edgeColumn("weight")
+        src = self._graph.edgeEndpoints()[0]
+        changed = np.unique(changed)
+
+        keep = ~np.isin(self._by_weight, changed)
+        self._by_weight, self._weights = self._by_weight[keep], self._weights[keep]
+        keep = ~np.isin(self._by_source, changed)
+        self._by_source, self._sources, self._source_weights = self._by_source[keep], self._sources[keep], self._source_weights[keep]
+
+        changed = changed[(weights[changed] >= 0) & self._graph.edgeMask()[changed]]
+        new_weights = weights[changed]
+        order = np.argsort(new_weights, kind="stable")
+        changed, new_weights = changed[order], new_weights[order]
+        pos = np.searchsorted(self._weights, new_weights, side="right")
+        self._by_weight = np.insert(self._by_weight, pos, changed)
+        self._weights = np.insert(self._weights, pos, new_weights)
+
+        new_sources = src[changed].astype(np.int64)
+        lo = np.searchsorted(self._sources, new_sources, side="left")
+        hi = np.searchsorted(self._sources, new_sources, side="right")
+        pos = np.array([
+            start + np.searchsorted(self._source_weights[start:end], weight, side="right")
+            for start, end, weight in zip(lo.tolist(), hi.tolist(), new_weights.tolist())
+        ], dtype=np.int64)
+        self._by_source = np.insert(self._by_source, pos, changed)
+        self._sources = np.insert(self._sources, pos, new_sources)
+        self._source_weights = np.insert(self._source_weights, pos, new_weights)
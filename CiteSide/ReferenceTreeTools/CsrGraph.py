@@ -0,0 +1,586 @@
+import struct
+import zipfile
+import numpy as np
+from collections import deque
+from typing import Dict, List, Optional
+
+NODE_DTYPE = np.int32
+PTR_DTYPE = np.int64
+# pending edges are folded into the CSR arrays once they exceed this share of all edges
+PENDING_RATIO = 0.25
+PENDING_MIN = 4096
+
+
+class CsrGraph:
+    """
+    Compact directed graph used as storage backend of the ReferenceTreeBuilder.
+
+    Node ids (paper_ids) are interned to ints. Edges live in append-only
+    parallel arrays (src, dst and one float column per attribute), while
+    forward and reverse adjacency are kept as CSR arrays that are rebuilt
+    lazily. Edges added since the last rebuild are tracked in small pending
+    lists so that single inserts stay cheap. Removed nodes and edges are
+    only marked dead (tombstones): ids stay stable, the next CSR rebuild
+    leaves them out and the vectorized readers mask them with nodeMask /
+    edgeMask.
+    """
+
+    def __init__(self):
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._n = 0
+        self._m = 0
+        self._node_cap = 0
+        self._edge_cap = 0
+        self._src = np.empty(0, dtype=NODE_DTYPE)
+        self._dst = np.empty(0, dtype=NODE_DTYPE)
+        self._node_cols: Dict[str, np.ndarray] = {}
+        self._edge_cols: Dict[str, np.ndarray] = {}
+        self._edge_defaults: Dict[str, float] = {}
+
+        self._fwd_ptr = np.zeros(1, dtype=PTR_DTYPE)
+        self._fwd_edge = np.empty(0, dtype=NODE_DTYPE)
+        self._rev_ptr = np.zeros(1, dtype=PTR_DTYPE)
+        self._rev_edge = np.empty(0, dtype=NODE_DTYPE)
+        self._pending_out: Dict[int, List[int]] = {}
+        self._pending_in: Dict[int, List[int]] = {}
+        self._pending_pairs: Dict[tuple, int] = {}
+        self._node_alive = np.empty(0, dtype=bool)
+        self._edge_alive = np.empty(0, dtype=bool)
+        self._removed_nodes = 0
+        self._removed_edges = 0
+        # edges removed since the last CSR rebuild are still listed in the CSR rows
+        self._csr_removed = 0
+        # set for memory-mapped snapshots: ids are decoded from the blob on demand
+        self._readonly = False
+        self._blob: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._sorted: Optional[np.ndarray] = None
+
+### NODES ###
+    def numberOfNodes(self) -> int:
+        return self._n
+
+    def isReadOnly(self) -> bool:
+        return self._readonly
+
+    def checkWritable(self):
+        if self._readonly:
+            raise ValueError("Graph is a read-only memory-mapped snapshot.")
+
+    def addNode(self, node_id: str) -> int:
+        idx = self._lookup(node_id)
+        if idx >= 0 and self._node_alive[idx]:
+            return idx
+        self.checkWritable()
+        if idx >= 0:
+            # re-adding a removed node revives its tombstone with empty attributes
+            self._node_alive[idx] = True
+            self._removed_nodes -= 1
+            for col in self._node_cols.values():
+                col[idx] = np.nan
+            return idx
+        self._reserveNodes(self._n + 1)
+        idx = self._n
+        self._ids.append(node_id)
+        self._index[node_id] = idx
+        self._node_alive[idx] = True
+        for col in self._node_cols.values():
+            col[idx] = np.nan
+        self._n += 1
+        return idx
+
+    def hasNode(self, node_id: str) -> bool:
+        return self.nodeIndex(node_id) >= 0
+
+    def nodeIndex(self, node_id: str) -> int:
+        idx = self._lookup(node_id)
+        if idx >= 0 and not self._node_alive[idx]:
+            return -1
+        return idx
+
+    def removeNode(self, node: int) -> np.ndarray:
+        """Removes the node and all its edges; returns the ids of the removed edges."""
+        self.checkWritable()
+        if not self._node_alive[node]:
+            return np.empty(0, dtype=NODE_DTYPE)
+        edges = np.unique(np.concatenate((self.outEdges(node), self.inEdges(node))))
+        for eid in edges.tolist():
+            self.removeEdge(eid)
+        self._node_alive[node] = False
+        self._removed_nodes += 1
+        return edges
+
+    def nodeMask(self) -> np.ndarray:
+        return self._node_alive[:self._n]
+
+    def liveNodes(self) -> np.ndarray:
+        if self._removed_nodes == 0:
+            return np.arange(self._n)
+        return np.flatnonzero(self.nodeMask())
+
+    def _lookup(self, node_id: str) -> int:
+        # interned index of node_id, including removed nodes
+        if self._index is not None:
+            return self._index.get(node_id, -1)
+        if self._sorted is None:
+            self._index = {nid: i for i, nid in enumerate(self.nodeIds())}
+            return self._index.get(node_id, -1)
+        # binary search over the sorted permutation of the mapped id table
+        key = node_id.encode("utf-8")
+        lo, hi = 0, self._n
+        while lo < hi:
+            mid = (lo + hi) // 2
+            idx = int(self._sorted[mid])
+            current = self._encodedId(idx)
+            if current == key:
+                return idx
+            if current < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return -1
+
+    def nodeId(self, idx: int) -> str:
+        if self._ids is not None:
+            return self._ids[idx]
+        return self._encodedId(idx).decode("utf-8")
+
+    def nodeIds(self) -> List[str]:
+        if self._ids is not None:
+            return list(self._ids[:self._n])
+        raw = self._blob.tobytes()
+        offsets = self._offsets.tolist()
+        return [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(self._n)]
+
+    def _encodedId(self, idx: int) -> bytes:
+        return self._blob[int(self._offsets[idx]):int(self._offsets[idx + 1])].tobytes()
+
+    def nodeColumn(self, name: str) -> np.ndarray:
+        # writable view, NaN marks an unset attribute
+        if name not in self._node_cols:
+            self._node_cols[name] = np.full(self._node_cap, np.nan, dtype=np.float64)
+        return self._node_cols[name][:self._n]
+
+    def hasNodeColumn(self, name: str) -> bool:
+        return name in self._node_cols
+
+    def nodeColumnNames(self) -> List[str]:
+        return list(self._node_cols.keys())
+
+### EDGES ###
+    def numberOfEdges(self) -> int:
+        return self._m
+
+    def addEdge(self, source: int, target: int) -> int:
+        eid = self.edgeIndex(source, target)
+        if eid >= 0:
+            return eid
+        self.checkWritable()
+        self._reserveEdges(self._m + 1)
+        eid = self._m
+        self._src[eid] = source
+        self._dst[eid] = target
+        self._edge_alive[eid] = True
+        for name, col in self._edge_cols.items():
+            col[eid] = self._edge_defaults[name]
+        self._m += 1
+        self._pending_out.setdefault(source, []).append(eid)
+        self._pending_in.setdefault(target, []).append(eid)
+        self._pending_pairs[(source, target)] = eid
+        if len(self._pending_pairs) > max(PENDING_MIN, PENDING_RATIO * self._m):
+            self.compact()
+        return eid
+
+    def addEdges(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        """
+        Bulk counterpart of addEdge: appends all new (source, target) pairs at
+        once and rebuilds the CSR arrays a single time. Returns the edge id of
+        every pair; pairs that already exist keep their id. No validation is
+        done.
+        """
+        self.checkWritable()
+        sources = np.asarray(sources, dtype=NODE_DTYPE)
+        targets = np.asarray(targets, dtype=NODE_DTYPE)
+        keys = sources.astype(np.int64) * self._n + targets
+        eids = np.full(len(keys), -1, dtype=np.int64)
+        live = self.liveEdges()
+        if live.size and keys.size:
+            live_keys = self._src[live].astype(np.int64) * self._n + self._dst[live]
+            order = np.argsort(live_keys)
+            pos = np.minimum(np.searchsorted(live_keys[order], keys), live.size - 1)
+            hit = live_keys[order[pos]] == keys
+            eids[hit] = live[order[pos[hit]]]
+        missing = np.flatnonzero(eids < 0)
+        if missing.size == 0:
+            return eids
+        # new ids follow the first occurrence of each pair
+        _, first, inverse = np.unique(keys[missing], return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        start, count = self._m, len(first)
+        self._reserveEdges(start + count)
+        picked = missing[first[order]]
+        self._src[start:start + count] = sources[picked]
+        self._dst[start:start + count] = targets[picked]
+        self._edge_alive[start:start + count] = True
+        for name, col in self._edge_cols.items():
+            col[start:start + count] = self._edge_defaults[name]
+        self._m += count
+        eids[missing] = start + rank[inverse.reshape(-1)]
+        self._rebuildCsr()
+        return eids
+
+    def edgeIndex(self, source: int, target: int) -> int:
+        if source < 0 or target < 0:
+            return -1
+        lo, hi = self._row(self._fwd_ptr, source)
+        if hi > lo:
+            row = self._fwd_edge[lo:hi]
+            targets = self._dst[row]
+            pos = int(np.searchsorted(targets, target))
+            # a removed pair may be listed next to a re-added one, so check the whole run
+            while pos < len(row) and targets[pos] == target:
+                if self._edge_alive[row[pos]]:
+                    return int(row[pos])
+                pos += 1
+        return self._pending_pairs.get((source, target), -1)
+
+    def removeEdge(self, eid: int):
+        self.checkWritable()
+        if not self._edge_alive[eid]:
+            return
+        self._edge_alive[eid] = False
+        self._removed_edges += 1
+        source, target = int(self._src[eid]), int(self._dst[eid])
+        if self._pending_pairs.get((source, target)) == eid:
+            del self._pending_pairs[(source, target)]
+            self._pending_out[source].remove(eid)
+            self._pending_in[target].remove(eid)
+        else:
+            self._csr_removed += 1
+
+    def edgeMask(self) -> np.ndarray:
+        return self._edge_alive[:self._m]
+
+    def liveEdges(self) -> np.ndarray:
+        if self._removed_edges == 0:
+            return np.arange(self._m)
+        return np.flatnonzero(self.edgeMask())
+
+    def hasRemovals(self) -> bool:
+        return self._removed_nodes > 0 or self._removed_edges > 0
+
+    def edgeEndpoints(self):
+        return self._src[:self._m], self._dst[:self._m]
+
+    def edgeColumn(self, name: str, default: float = np.nan) -> np.ndarray:
+        if name not in self._edge_cols:
+            self._edge_cols[name] = np.full(self._edge_cap, default, dtype=np.float64)
+            self._edge_defaults[name] = default
+        return self._edge_cols[name][:self._m]
+
+    def hasEdgeColumn(self, name: str) -> bool:
+        return name in self._edge_cols
+
+    def edgeColumnNames(self) -> List[str]:
+        return list(self._edge_cols.keys())
+
+    def outEdges(self, node: int) -> np.ndarray:
+        return self._adjacent(self._fwd_ptr, self._fwd_edge, self._pending_out, node)
+
+    def inEdges(self, node: int) -> np.ndarray:
+        return self._adjacent(self._rev_ptr, self._rev_edge, self._pending_in, node)
+
+    def successors(self, node: int) -> np.ndarray:
+        return self._dst[self.outEdges(node)]
+
+    def predecessors(self, node: int) -> np.ndarray:
+        return self._src[self.inEdges(node)]
+
+    def inDegree(self) -> np.ndarray:
+        return np.bincount(self._dst[self.liveEdges()], minlength=self._n)
+
+    def outDegree(self) -> np.ndarray:
+        return np.bincount(self._src[self.liveEdges()], minlength=self._n)
+
+### CSR ###
+    def csr(self, reverse: bool = False):
+        """Returns (indptr, edge_ids) of the forward or reverse adjacency."""
+        self.compact()
+        if reverse:
+            return self._rev_ptr, self._rev_edge
+        return self._fwd_ptr, self._fwd_edge
+
+    def compact(self):
+        if self._pending_pairs or self._csr_removed:
+            self._rebuildCsr()
+        elif len(self._fwd_ptr) < self._n + 1:
+            # nodes added since the last rebuild have empty rows, no need to touch the edges
+            self._fwd_ptr = self._padPtr(self._fwd_ptr)
+            self._rev_ptr = self._padPtr(self._rev_ptr)
+
+    def _padPtr(self, ptr: np.ndarray) -> np.ndarray:
+        return np.concatenate((ptr, np.full(self._n + 1 - len(ptr), ptr[-1], dtype=PTR_DTYPE)))
+
+    def _rebuildCsr(self):
+        edges = self.liveEdges()
+        src, dst = self._src[edges], self._dst[edges]
+        self._fwd_ptr, self._fwd_edge = self._buildCsr(edges, src, dst)
+        self._rev_ptr, self._rev_edge = self._buildCsr(edges, dst, src)
+        self._pending_out.clear()
+        self._pending_in.clear()
+        self._pending_pairs.clear()
+        self._csr_removed = 0
+
+    def _buildCsr(self, edges: np.ndarray, keys: np.ndarray, secondary: np.ndarray):
+        # rows sorted by secondary key so that edge lookups can bisect
+        order = edges[np.lexsort((secondary, keys))].astype(NODE_DTYPE)
+        counts = np.bincount(keys, minlength=self._n)
+        ptr = np.zeros(self._n + 1, dtype=PTR_DTYPE)
+        np.cumsum(counts, out=ptr[1:])
+        return ptr, order
+
+### TRAVERSAL ###
+    def hasPath(self, source: int, target: int) -> bool:
+        if source == target:
+            return True
+        seen = {source}
+        q = deque([source])
+        while q:
+            node = q.popleft()
+            for nbr in self.successors(node).tolist():
+                if nbr == target:
+                    return True
+                if nbr not in seen:
+                    seen.add(nbr)
+                    q.append(nbr)
+        return False
+
+    def cyclicNodes(self) -> np.ndarray:
+        """
+        Kahn's algorithm on the CSR arrays, one frontier per iteration:
+        nodes without in-edges are peeled off, then nodes without out-edges
+        among the rest. Returns the nodes that remain, i.e. those on or
+        between cycles; empty for a DAG. Every cycle lies within them.
+        """
+        src, dst = self.edgeEndpoints()
+        edges = self.liveEdges()
+        remaining = self.nodeMask().copy()
+        for reverse in (False, True):
+            ends = src[edges] if reverse else dst[edges]
+            inner = remaining[src[edges]] & remaining[dst[edges]]
+            degree = np.bincount(ends[inner], minlength=self._n)
+            frontier = np.flatnonzero(remaining & (degree == 0))
+            while frontier.size:
+                remaining[frontier] = False
+                nbrs = src[self.gatherEdges(frontier, reverse=True)] if reverse else dst[self.gatherEdges(frontier)]
+                degree -= np.bincount(nbrs, minlength=self._n)
+                nbrs = np.unique(nbrs)
+                frontier = nbrs[remaining[nbrs] & (degree[nbrs] == 0)]
+        return np.flatnonzero(remaining)
+
+    def gatherEdges(self, frontier: np.ndarray, reverse: bool = False) -> np.ndarray:
+        """Returns the ids of all out-edges (in-edges if reverse) of the frontier nodes in one gather."""
+        ptr, perm = self.csr(reverse)
+        starts = ptr[frontier]
+        counts = ptr[frontier + 1] - starts
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return perm[offsets + np.arange(offsets.size)]
+
+    def crawlDepths(self, root: int, max_depth: int, reverse_depth: Optional[int] = None) -> np.ndarray:
+        """
+        Hop distance of every node from root: positive along references up to
+        max_depth, negative along citations down to reverse_depth and NaN for
+        nodes outside the crawl. Both directions expand one hop per iteration.
+        """
+        depth = np.full(self._n, np.nan)
+        depth[root] = 0
+        src, dst = self.edgeEndpoints()
+        empty = np.empty(0, dtype=NODE_DTYPE)
+        fwd = np.array([root], dtype=NODE_DTYPE)
+        rev = np.array([root], dtype=NODE_DTYPE) if reverse_depth else empty
+        max_reverse = abs(reverse_depth) if reverse_depth else 0
+        hop = 0
+        while fwd.size or rev.size:
+            hop += 1
+            fwd = self._expand(depth, dst[self.gatherEdges(fwd)], hop) if hop <= max_depth else empty
+            rev = self._expand(depth, src[self.gatherEdges(rev, reverse=True)], -hop) if hop <= max_reverse else empty
+        return depth
+
+    @staticmethod
+    def _expand(depth: np.ndarray, nbrs: np.ndarray, hop: int) -> np.ndarray:
+        nbrs = np.unique(nbrs[np.isnan(depth[nbrs])])
+        depth[nbrs] = hop
+        return nbrs
+
+    def subgraph(self, nodes: np.ndarray, edges: np.ndarray) -> "CsrGraph":
+        """
+        Builds a new graph from a sorted array of node indices and an array of
+        edge ids whose endpoints are contained in `nodes`. No validation is done.
+        """
+        remap = np.full(self._n, -1, dtype=NODE_DTYPE)
+        remap[nodes] = np.arange(len(nodes), dtype=NODE_DTYPE)
+        sub = CsrGraph()
+        sub._ids = [self.nodeId(i) for i in nodes.tolist()]
+        sub._index = {node_id: i for i, node_id in enumerate(sub._ids)}
+        sub._reserveNodes(len(nodes))
+        sub._n = len(nodes)
+        sub._node_alive[:sub._n] = True
+        sub._reserveEdges(len(edges))
+        sub._m = len(edges)
+        sub._edge_alive[:sub._m] = True
+        sub._src[:sub._m] = remap[self._src[edges]]
+        sub._dst[:sub._m] = remap[self._dst[edges]]
+        sub.compact()
+        return sub
+
+### SNAPSHOTS ###
+    def toArrays(self) -> Dict[str, np.ndarray]:
+        """Flat array representation used by snapshots; see fromArrays."""
+        self.compact()
+        ids = self.nodeIds()
+        encoded = [node_id.encode("utf-8") for node_id in ids]
+        offsets = np.zeros(self._n + 1, dtype=PTR_DTYPE)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        arrays = {
+            "ids_blob": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            "ids_offsets": offsets,
+            "ids_sorted": np.array(sorted(range(self._n), key=ids.__getitem__), dtype=NODE_DTYPE),
+            "src": self._src[:self._m],
+            "dst": self._dst[:self._m],
+            "fwd_ptr": self._fwd_ptr,
+            "fwd_edge": self._fwd_edge,
+            "rev_ptr": self._rev_ptr,
+            "rev_edge": self._rev_edge,
+        }
+        if self.hasRemovals():
+            arrays["alive_nodes"] = self._node_alive[:self._n]
+            arrays["alive_edges"] = self._edge_alive[:self._m]
+        for name, col in self._node_cols.items():
+            arrays[f"node_{name}"] = col[:self._n]
+        for name, col in self._edge_cols.items():
+            arrays[f"edge_{name}"] = col[:self._m]
+        return arrays
+
+    @classmethod
+    def fromArrays(cls, arrays, edge_defaults: Optional[Dict[str, float]] = None, mapped: bool = False) -> "CsrGraph":
+        """
+        Rebuilds a graph from toArrays output without validating edges. With
+        `mapped` the arrays are used as they are (e.g. read-only memmaps) and
+        the graph becomes read-only.
+        """
+        graph = cls()
+        take = (lambda a, dtype: a) if mapped else (lambda a, dtype: np.array(a, dtype=dtype))
+        if mapped:
+            graph._readonly = True
+            graph._ids = None
+            graph._index = None
+            graph._blob = arrays["ids_blob"]
+            graph._offsets = arrays["ids_offsets"]
+            graph._sorted = arrays.get("ids_sorted")
+            graph._n = graph._node_cap = len(graph._offsets) - 1
+        else:
+            raw = np.asarray(arrays["ids_blob"]).tobytes()
+            offsets = np.asarray(arrays["ids_offsets"]).tolist()
+            graph._ids = [raw[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+            graph._index = {node_id: i for i, node_id in enumerate(graph._ids)}
+            graph._n = graph._node_cap = len(graph._ids)
+        graph._src = take(arrays["src"], NODE_DTYPE)
+        graph._dst = take(arrays["dst"], NODE_DTYPE)
+        graph._m = graph._edge_cap = len(graph._src)
+        graph._fwd_ptr = take(arrays["fwd_ptr"], PTR_DTYPE)
+        graph._fwd_edge = take(arrays["fwd_edge"], NODE_DTYPE)
+        graph._rev_ptr = take(arrays["rev_ptr"], PTR_DTYPE)
+        graph._rev_edge = take(arrays["rev_edge"], NODE_DTYPE)
+        if "alive_nodes" in arrays:
+            graph._node_alive = take(arrays["alive_nodes"], bool)
+            graph._edge_alive = take(arrays["alive_edges"], bool)
+            graph._removed_nodes = int(graph._n - np.count_nonzero(graph._node_alive))
+            graph._removed_edges = int(graph._m - np.count_nonzero(graph._edge_alive))
+        else:
+            graph._node_alive = np.ones(graph._n, dtype=bool)
+            graph._edge_alive = np.ones(graph._m, dtype=bool)
+        edge_defaults = edge_defaults or {}
+        for key in arrays.keys():
+            if key.startswith("node_"):
+                graph._node_cols[key[len("node_"):]] = take(arrays[key], np.float64)
+            elif key.startswith("edge_"):
+                name = key[len("edge_"):]
+                graph._edge_cols[name] = take(arrays[key], np.float64)
+                graph._edge_defaults[name] = edge_defaults.get(name, np.nan)
+        return graph
+
+    @staticmethod
+    def mapNpz(path: str) -> Dict[str, np.ndarray]:
+        """
+        Memory-maps every member of an uncompressed npz file read-only, so
+        that all processes opening the same snapshot share the page cache.
+        Compressed members are loaded into memory instead.
+        """
+        arrays = {}
+        with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+            for info in zf.infolist():
+                name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+                if info.compress_type != zipfile.ZIP_STORED:
+                    with zf.open(info) as member:
+                        arrays[name] = np.lib.format.read_array(member)
+                    continue
+                # local file header: 30 fixed bytes, then file name and extra field
+                f.seek(info.header_offset)
+                header = f.read(30)
+                name_len, extra_len = struct.unpack("<HH", header[26:30])
+                f.seek(info.header_offset + 30 + name_len + extra_len)
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+                else:
+                    shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+                if int(np.prod(shape)) == 0:
+                    arrays[name] = np.empty(shape, dtype=dtype)
+                    continue
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape, order="F" if fortran else "C")
+        return arrays
+
+### HELPERS ###
+    def _row(self, ptr: np.ndarray, node: int):
+        if node + 1 >= len(ptr):
+            return 0, 0
+        return int(ptr[node]), int(ptr[node + 1])
+
+    def _adjacent(self, ptr: np.ndarray, perm: np.ndarray, pending: Dict[int, List[int]], node: int) -> np.ndarray:
+        lo, hi = self._row(ptr, node)
+        row = perm[lo:hi]
+        if self._csr_removed:
+            row = row[self._edge_alive[row]]
+        extra = pending.get(node)
+        if extra:
+            return np.concatenate((row, np.asarray(extra, dtype=NODE_DTYPE)))
+        return row
+
+    def _reserveNodes(self, size: int):
+        if size <= self._node_cap:
+            return
+        cap = max(size, 2 * self._node_cap, 16)
+        for name, col in self._node_cols.items():
+            self._node_cols[name] = self._grow(col, cap, np.nan)
+        self._node_alive = self._grow(self._node_alive, cap, False)
+        self._node_cap = cap
+
+    def _reserveEdges(self, size: int):
+        if size <= self._edge_cap:
+            return
+        cap = max(size, 2 * self._edge_cap, 16)
+        self._src = self._grow(self._src, cap, 0)
+        self._dst = self._grow(self._dst, cap, 0)
+        self._edge_alive = self._grow(self._edge_alive, cap, False)
+        for name, col in self._edge_cols.items():
+            self._edge_cols[name] = self._grow(col, cap, self._edge_defaults[name])
+        self._edge_cap = cap
+
+    @staticmethod
+    def _grow(arr: np.ndarray, cap: int, fill) -> np.ndarray:
+        out = np.full(cap, fill, dtype=arr.dtype)
+        out[:len(arr)] = arr
+        return out
@@ -0,0 +1,75 @@
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+class EdgeJournal:
+    """
+    Append-only log of the mutations of a ReferenceTreeBuilder.
+
+    Every addNode, addEdge, changeWeightOfEdge, buildCombCritIndex,
+    removeEdge and removeNode is
+    appended as one JSON line and flushed, so saving progress costs O(change)
+    and readers can follow a running crawl with readEntries. Every
+    `compact_every` entries the full tree is written as binary snapshot next
+    to the journal (`<journal>.snapshot.npz`) and the journal is truncated.
+    """
+
+    ADD_NODE = "addNode"
+    ADD_EDGE = "addEdge"
+    CHANGE_WEIGHT = "changeWeightOfEdge"
+    COMB_INDEX = "buildCombCritIndex"
+    REMOVE_EDGE = "removeEdge"
+    REMOVE_NODE = "removeNode"
+
+    def __init__(self, path: str, tree, compact_every: Optional[int] = 10000):
+        self._path = Path(path)
+        self._tree = tree
+        self._compact_every = compact_every
+        self._entries = len(EdgeJournal.readEntries(path)[0]) if self._path.exists() else 0
+        self._file = open(self._path, "a", encoding="utf-8")
+
+    @staticmethod
+    def snapshotPath(path: str) -> Path:
+        return Path(f"{path}.snapshot.npz")
+
+    def record(self, op: str, *args):
+        self._file.write(json.dumps([op, *args]) + "\n")
+        self._file.flush()
+        self._entries += 1
+        if self._compact_every is not None and self._entries >= self._compact_every:
+            self.compact()
+
+    def compact(self):
+        # the snapshot is replaced atomically before the journal is truncated;
+        # a crash in between only leaves entries that replay idempotently
+        snapshot = EdgeJournal.snapshotPath(self._path)
+        tmp = snapshot.with_name(snapshot.name + ".tmp")
+        self._tree.storeSnapshot(str(tmp))
+        os.replace(tmp, snapshot)
+        self._file.close()
+        self._file = open(self._path, "w", encoding="utf-8")
+        self._entries = 0
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def readEntries(path: str, offset: int = 0) -> Tuple[Optional[List[list]], int]:
+        """
+        Reads all complete entries from byte `offset` on and returns them with
+        the offset to continue from. If the journal got shorter than `offset`
+        it was compacted in the meantime; then (None, 0) is returned and the
+        reader should reload the tree with ReferenceTreeBuilder.loadJournal.
+        """
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() < offset:
+                return None, 0
+            f.seek(offset)
+            data = f.read()
+        # a trailing line without newline is still being written
+        end = data.rfind(b"\n") + 1
+        entries = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        return entries, offset + end
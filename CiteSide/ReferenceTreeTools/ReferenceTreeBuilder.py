@@ -1,29 +1,78 @@
+import io
 import json
+from pathlib import Path
 
 import networkx as nx
 import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from typing import List, Optional
-from collections import deque
+from collections import OrderedDict
+from CiteSide.FileHandler.JsonHandler import PAPER_ADDED, PAPER_REMOVED, CorpusChange
+from CiteSide.ReferenceTreeTools.CsrGraph import CsrGraph
+from CiteSide.ReferenceTreeTools.CrawlView import CrawlView
+from CiteSide.ReferenceTreeTools.CritIndex import CritIndex
+from CiteSide.ReferenceTreeTools.EdgeJournal import EdgeJournal
 from CiteSide.ReferenceTreeTools.ScoreCombiner import ScoreCombiner
 
+# attributes that are stored as float columns but reported as ints
+INT_ATTRS = ("depth",)
+# above this many nodes plots use a fast layout and skip labels and arrow heads
+LARGE_GRAPH_NODES = 300
+
 class ReferenceTreeBuilder:
+    CRAWL_CACHE_SIZE = 32
+
     def __init__(self):
-        self._tree = nx.DiGraph()
+        self._graph = CsrGraph()
+        self._graph.edgeColumn("weight", -1.0)
         self._crawl_root = None
         self._crawl_depth = None
         self._reverse_depth = None
         self._comb_indexed = False
+        self._comb_mode = ScoreCombiner.MULTIPLICATION
+        self._journal = None
+        self._version = 0
+        self._crawl_cache = OrderedDict()
+        self._crit_index = None
+        self._layout_cache = None
+        # reference target -> citing papers, for references to papers not (yet) in the tree
+        self._unresolved = {}
 
 ### GETTERS / SETTERS ###
     def addNode(self, node_id: str):
-        if (self._tree.has_node(str)):
+        if (self._graph.hasNode(node_id)):
             self.warning(f"Adding node {node_id} not possible as it already exists")
-        self._tree.add_node(node_id)
+            return
+        node = self._graph.addNode(node_id)
+        if self._comb_indexed:
+            # a new paper has no scored references yet
+            self._graph.nodeColumn("critical")[node] = -1.0
+        self._onMutation(EdgeJournal.ADD_NODE, node_id)
+
+    def hasNode(self, node_id: str) -> bool:
+        return self._graph.hasNode(node_id)
+
+    def removeNode(self, node_id: str):
+        """Removes the node with all its edges."""
+        node = self._nodeIndex(node_id)
+        citing = np.unique(self._graph.predecessors(node))
+        edges = self._graph.removeNode(node)
+        self._weightsChanged(edges)
+        if self._comb_indexed:
+            # the citing papers lost a scored reference
+            for source in citing.tolist():
+                self._updateCombCritIndex(source)
+        self._onMutation(EdgeJournal.REMOVE_NODE, node_id)
 
     def getEdges(self) -> List[tuple]:
-        return list(self._tree.edges(data=True))
+        src, dst = self._graph.edgeEndpoints()
+        return [
+            (self._graph.nodeId(int(src[e])), self._graph.nodeId(int(dst[e])), self._edgeAttrs(e))
+            for e in self._graph.liveEdges().tolist()
+        ]
 
     def addEdge(self, source_id: str, target_id: str, weight: float = -1.0):
         self.addEdgeTuple((source_id, target_id, weight))
@@ -33,9 +82,9 @@ class ReferenceTreeBuilder:
             not isinstance(edge[0], str) or
             not isinstance(edge[1], str)):
             raise ValueError("Invalid tuple format!")
-        elif (not self._tree.has_node(edge[0])):
+        elif (not self._graph.hasNode(edge[0])):
             self.warning(f"Adding edge from {edge[0]} to {edge[1]} not possible. {edge[0]} is not a node.")
-        elif (not self._tree.has_node(edge[1])):
+        elif (not self._graph.hasNode(edge[1])):
             self.warning(f"Adding edge from {edge[0]} to {edge[1]} not possible. {edge[1]} is not a node.")
         elif self.checkIfCircular(edge[0], edge[1]):
             self.warning(f"Adding edge from {edge[0]} to {edge[1]} would create a cycle. Edge not added.")
@@ -43,36 +92,207 @@ class ReferenceTreeBuilder:
             isinstance(edge[0], str) and
             isinstance(edge[1], str) and
             isinstance(edge[2], float)):
-            self._tree.add_edge(edge[0], edge[1], weight=edge[2])
+            self._setEdge(edge[0], edge[1], edge[2])
         elif (len(edge) == 2 and
             isinstance(edge[0], str) and
             isinstance(edge[1], str)):
-            self._tree.add_edge(edge[0], edge[1], weight= -1.0)
+            self._setEdge(edge[0], edge[1], -1.0)
         else:
             raise ValueError("Edge must be a tuple of (source_id: str, target_id: str, weight: float)")
 
+    def addEdges(self, edges: List[tuple]):
+        """
+        Bulk counterpart of addEdgeTuple. All edges are inserted at once and
+        checked for cycles by one topological sort of the graph; only new
+        edges among the nodes it cannot order are re-checked one by one, in
+        the given order, so the result is the same as adding them one after
+        another.
+        """
+        batch = []
+        for edge in edges:
+            if  (len(edge) not in (2,3) or
+                not isinstance(edge[0], str) or
+                not isinstance(edge[1], str)):
+                raise ValueError("Invalid tuple format!")
+            if len(edge) == 3 and not isinstance(edge[2], float):
+                raise ValueError("Edge must be a tuple of (source_id: str, target_id: str, weight: float)")
+            source, target = self._graph.nodeIndex(edge[0]), self._graph.nodeIndex(edge[1])
+            if source < 0:
+                self.warning(f"Adding edge from {edge[0]} to {edge[1]} not possible. {edge[0]} is not a node.")
+            elif target < 0:
+                self.warning(f"Adding edge from {edge[0]} to {edge[1]} not possible. {edge[1]} is not a node.")
+            elif source == target:
+                self.warning(f"Adding edge from {edge[0]} to {edge[1]} would create a cycle. Edge not added.")
+            else:
+                batch.append((edge[0], edge[1], source, target, edge[2] if len(edge) == 3 else -1.0))
+        if not batch:
+            return
+
+        first_new = self._graph.numberOfEdges()
+        sources = np.array([b[2] for b in batch], dtype=np.int64)
+        targets = np.array([b[3] for b in batch], dtype=np.int64)
+        eids = self._graph.addEdges(sources, targets)
+        accepted = np.ones(len(batch), dtype=bool)
+        core = self._graph.cyclicNodes()
+        if core.size:
+            in_core = np.zeros(self._graph.numberOfNodes(), dtype=bool)
+            in_core[core] = True
+            recheck = np.flatnonzero((eids >= first_new) & in_core[sources] & in_core[targets])
+            for eid in np.unique(eids[recheck]).tolist():
+                self._graph.removeEdge(eid)
+            for i in recheck.tolist():
+                source_id, target_id = batch[i][0], batch[i][1]
+                if self.checkIfCircular(source_id, target_id):
+                    self.warning(f"Adding edge from {source_id} to {target_id} would create a cycle. Edge not added.")
+                    accepted[i] = False
+                else:
+                    eids[i] = self._graph.addEdge(int(sources[i]), int(targets[i]))
+
+        for i in np.flatnonzero(accepted).tolist():
+            source_id, target_id, _, _, weight = batch[i]
+            self._setWeight(int(eids[i]), weight)
+            self._onMutation(EdgeJournal.ADD_EDGE, source_id, target_id, float(weight))
+
+    def removeEdge(self, source_id: str, target_id: str):
+        eid = self._edgeIndex(source_id, target_id)
+        if eid < 0:
+            raise ValueError(f"Edge from {source_id} to {target_id} does not exist.")
+        self._graph.removeEdge(eid)
+        self._weightsChanged((eid,))
+        if self._comb_indexed:
+            self._updateCombCritIndex(self._graph.nodeIndex(source_id))
+        self._onMutation(EdgeJournal.REMOVE_EDGE, source_id, target_id)
+
     def getReferences(self, node_id: str):
-        return list(self._tree.successors(node_id))
+        node = self._nodeIndex(node_id)
+        return [self._graph.nodeId(n) for n in self._graph.successors(node).tolist()]
+
+    def getCitedBy(self, node_id: str):
+        node = self._nodeIndex(node_id)
+        return [self._graph.nodeId(n) for n in self._graph.predecessors(node).tolist()]
 
     def getWeight(self, source_id: str, target_id: str):
-        if self._tree.has_edge(source_id, target_id):
-            return self._tree[source_id][target_id].get('weight', None)
+        eid = self._edgeIndex(source_id, target_id)
+        if eid >= 0:
+            return float(self._graph.edgeColumn("weight")[eid])
         else:
-            raise ValueError("Edge from {source_id} to {target_id} does not exist.")
+            raise ValueError(f"Edge from {source_id} to {target_id} does not exist.")
 
     def changeWeightOfEdge(self, source_id: str, target_id: str, weight: float):
-        if self._tree.has_edge(source_id, target_id):
-            self._tree[source_id][target_id]['weight'] = weight
+        eid = self._edgeIndex(source_id, target_id)
+        if eid >= 0:
+            self._setWeight(eid, weight)
+            self._onMutation(EdgeJournal.CHANGE_WEIGHT, source_id, target_id, float(weight))
         else:
             raise ValueError(f"Edge from {source_id} to {target_id} does not exist.")
 
     def create(self, nodes: Optional[List[str]] = None, edges: Optional[List[tuple]] = None):
-        self._tree.add_nodes_from(nodes)
-        for edge in edges:
-            self.addEdgeTuple(edge)
+        for node in nodes or []:
+            if not self._graph.hasNode(node):
+                self._graph.addNode(node)
+                self._onMutation(EdgeJournal.ADD_NODE, node)
+        self.addEdges(edges or [])
+
+    def getMostCritical(self, k: int = 10, min_depth: Optional[int] = None, max_depth: Optional[int] = None,
+                        descending: bool = False) -> List[tuple]:
+        """
+        The k most critical citations as (source_id, target_id, weight), most
+        critical first. Like the crit_index of UsageValidator (and the colors
+        of plotTree/printFindings) a low weight is critical: contradicted
+        citations come before supported ones, descending=True reverses the
+        order. Unscored edges are ignored; the depth filter applies to the
+        crawl depth of the citing paper.
+        """
+        return self._edgeTuples(self._critIndex().topK(k, min_depth, max_depth, descending))
+
+    def getCriticalInRange(self, low: float, high: float, min_depth: Optional[int] = None, max_depth: Optional[int] = None,
+                           descending: bool = False) -> List[tuple]:
+        return self._edgeTuples(self._critIndex().inRange(low, high, min_depth, max_depth, descending))
+
+    def getMostCriticalOf(self, source_id: str, k: int = 10, descending: bool = False) -> List[tuple]:
+        return self._edgeTuples(self._critIndex().topKOfSource(self._nodeIndex(source_id), k, descending))
+
+    def getVersion(self) -> int:
+        return self._version
 
     def getLeafs(self):
-        return [n for n, deg in self._tree.in_degree if deg == 0]
+        in_degree = self._graph.inDegree()
+        leafs = (in_degree == 0) & self._graph.nodeMask()
+        return [self._graph.nodeId(n) for n in np.flatnonzero(leafs).tolist()]
+
+    def toNetworkx(self) -> nx.DiGraph:
+        tree = nx.DiGraph()
+        for n in self._graph.liveNodes().tolist():
+            tree.add_node(self._graph.nodeId(n), **self._nodeAttrs(n))
+        for u, v, data in self.getEdges():
+            tree.add_edge(u, v, **data)
+        return tree
+
+### CORPUS ###
+    @classmethod
+    def fromCorpus(cls, corpus, follow: bool = True):
+        """
+        Builds the reference tree of a JsonHandler corpus: one node per paper
+        and one edge per reference to another paper of the corpus. With
+        `follow` the tree subscribes to the corpus and applies added, updated
+        and removed papers incrementally, touching only the edges of the
+        changed paper and the references to it.
+        """
+        gb = cls()
+        for node in corpus.getIds():
+            gb.addNode(node)
+        edges = []
+        for node in corpus.getIds():
+            for ref in corpus.getOutgoingRefs(node) or []:
+                if gb._graph.hasNode(ref):
+                    edges.append((node, ref))
+                else:
+                    gb._unresolved.setdefault(ref, set()).add(node)
+        gb.addEdges(edges)
+        if follow:
+            corpus.subscribe(gb.onCorpusChange)
+        return gb
+
+    def onCorpusChange(self, change: CorpusChange):
+        paper_id = change.paper_id
+        old_refs = (change.old or {}).get("references") or []
+        new_refs = (change.new or {}).get("references") or []
+        for ref in set(old_refs) - (set(new_refs) if change.kind != PAPER_REMOVED else set()):
+            self._unresolveReference(paper_id, ref)
+
+        if change.kind == PAPER_REMOVED:
+            if self._graph.hasNode(paper_id):
+                citing = self.getCitedBy(paper_id)
+                self.removeNode(paper_id)
+                # citing papers are reconnected if the paper comes back
+                if citing:
+                    self._unresolved.setdefault(paper_id, set()).update(citing)
+            return
+
+        if not self._graph.hasNode(paper_id):
+            self.addNode(paper_id)
+        if change.kind == PAPER_ADDED or paper_id in self._unresolved:
+            for source in sorted(self._unresolved.pop(paper_id, ())):
+                if self._graph.hasNode(source):
+                    self.addEdge(source, paper_id)
+        known = set(old_refs)
+        self._linkReferences(paper_id, [ref for ref in new_refs if ref not in known])
+
+    def _linkReferences(self, node_id: str, refs: List[str]):
+        for ref in refs:
+            if self._graph.hasNode(ref):
+                self.addEdge(node_id, ref)
+            else:
+                self._unresolved.setdefault(ref, set()).add(node_id)
+
+    def _unresolveReference(self, node_id: str, ref: str):
+        citing = self._unresolved.get(ref)
+        if citing is not None:
+            citing.discard(node_id)
+            if not citing:
+                del self._unresolved[ref]
+        if self._edgeIndex(node_id, ref) >= 0:
+            self.removeEdge(node_id, ref)
 
 ### VISUALIZATION ###
     def printTree(self):
@@ -94,7 +314,9 @@ class ReferenceTreeBuilder:
         print("  " + "   ".join(legend_parts))
 
         print("\nNodes:")
-        for n, data in self._tree.nodes(data=True):
+        for n in self._graph.liveNodes().tolist():
+            node_id = self._graph.nodeId(n)
+            data = self._nodeAttrs(n)
             if (self._crawl_root != None):
                 depth = data.get("depth")
                 r, g, b = 0, 0, 0
@@ -103,9 +325,9 @@ class ReferenceTreeBuilder:
                 else:
                     r, g, b = self.rgbForCrawl(self._crawl_depth, depth)
                 color = fg_escape(r, g, b)
-                print(f"  {n}: depth={color}{depth}{reset}")
+                print(f"  {node_id}: depth={color}{depth}{reset}")
             else:
-                print(f"  {n}: {data}")
+                print(f"  {node_id}: {data}")
 
         print("\nLegend (color = weight):")
         samples = [(-1.0, " -1 (blue) undefined"), (0.0, " 0 (green) non critical"), (1.0, " 1 (red) critical")]
@@ -117,7 +339,7 @@ class ReferenceTreeBuilder:
         print("  " + "   ".join(legend_parts))
 
         print("\nEdges:")
-        for u, v, data in self._tree.edges(data=True):
+        for u, v, data in self.getEdges():
             weight = data.get("weight", -1)
             r, g, b = self.rgbForWeight(weight)
             color = fg_escape(r, g, b)
@@ -126,17 +348,103 @@ class ReferenceTreeBuilder:
     def plotTree(
             self,
             node_size: int = 300,
-            seed: Optional[int] = 42):
-
-        pos = nx.spring_layout(self._tree, seed=seed)
-        pos = nx.circular_layout(self._tree, scale=2.0)
+            seed: Optional[int] = 42,
+            path: Optional[str] = None,
+            large_threshold: int = LARGE_GRAPH_NODES):
+        """
+        Draws the tree. Without `path` it is shown interactively with
+        plt.show(); with a path ending in .svg, .png or .html it is rendered
+        headless (no pyplot, no display needed) and written to that file.
+        Graphs with more than `large_threshold` nodes get a fast layout and
+        are drawn without labels and arrow heads.
+        """
+        tree = self.toNetworkx()
+        large = tree.number_of_nodes() > large_threshold
+        pos = self._layout(tree, seed, large)
+
+        if path is None:
+            fig = plt.figure()
+            ax = plt.gca()
+        else:
+            fig = Figure(figsize=(12, 12) if large else (8, 8))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+        self._drawTree(fig, ax, tree, pos, node_size, large)
 
-        if (self._crawl_root != None):
+        if path is None:
+            plt.show()
+            return
+        suffix = Path(path).suffix.lower()
+        if suffix == ".html":
+            buffer = io.StringIO()
+            fig.savefig(buffer, format="svg", bbox_inches="tight")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{self._crawl_root or 'Reference Tree'}</title></head>\n<body>\n{buffer.getvalue()}\n</body></html>\n")
+        elif suffix in (".svg", ".png"):
+            fig.savefig(path, bbox_inches="tight", dpi=150)
+        else:
+            raise ValueError(f"Unsupported export format {suffix}, use .svg, .png or .html")
+
+    def _layout(self, tree: nx.DiGraph, seed: Optional[int], large: bool) -> dict:
+        key = (self._version, large, seed)
+        if self._layout_cache is not None and self._layout_cache[0] == key:
+            return self._layout_cache[1]
+        if large:
+            #"sfdp" is the scalable graphviz layout, without graphviz a numpy force layout is used
+            try:
+                pos = nx.nx_pydot.graphviz_layout(tree, prog="sfdp")
+            except Exception:
+                pos = self._forceLayout(seed)
+        elif (self._crawl_root != None):
             #"fdp"/"neato"/"sfdp"(faster version) seems to be the best, but "circo", "twopi", "dot" in this order should also be testet!
-            pos = nx.nx_pydot.graphviz_layout(self._tree, prog="neato", root=self._crawl_root)
+            try:
+                pos = nx.nx_pydot.graphviz_layout(tree, prog="neato", root=self._crawl_root)
+            except Exception:
+                pos = self._forceLayout(seed)
+        else:
+            pos = nx.circular_layout(tree, scale=2.0)
+        self._layout_cache = (key, pos)
+        return pos
+
+    def _forceLayout(self, seed: Optional[int], iterations: int = 50, sample: int = 256) -> dict:
+        # Fruchterman-Reingold style layout; repulsion is estimated against a
+        # random sample of nodes so every iteration stays O(n * sample)
+        rng = np.random.default_rng(seed)
+        n = self._graph.numberOfNodes()
+        if n == 0:
+            return {}
+        pos = rng.uniform(-1.0, 1.0, size=(n, 2))
+        if self._crawl_root != None and self._graph.hasNodeColumn("depth"):
+            # crawled trees start with depth as x coordinate
+            depth = np.nan_to_num(self._graph.nodeColumn("depth"))
+            pos[:, 0] = depth / max(1.0, np.abs(depth).max())
+        src, dst = self._graph.edgeEndpoints()
+        live = self._graph.liveEdges()
+        src, dst = src[live].astype(np.int64), dst[live].astype(np.int64)
+        k = 1.0 / np.sqrt(n)
+        step = 0.1
+        for _ in range(iterations):
+            others = rng.choice(n, size=min(n, sample), replace=False)
+            delta = pos[:, None, :] - pos[None, others, :]
+            dist2 = np.maximum((delta ** 2).sum(axis=2), 1e-6)
+            disp = (delta * (k * k / dist2)[:, :, None]).sum(axis=1) * (n / len(others))
+            edge_delta = pos[src] - pos[dst]
+            edge_dist = np.maximum(np.sqrt((edge_delta ** 2).sum(axis=1)), 1e-6)
+            pull = edge_delta * (edge_dist / k)[:, None]
+            np.add.at(disp, src, -pull)
+            np.add.at(disp, dst, pull)
+            length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+            pos += disp / length[:, None] * np.minimum(length, step)[:, None]
+            step *= 0.95
+        return {self._graph.nodeId(i): (float(pos[i, 0]), float(pos[i, 1])) for i in self._graph.liveNodes().tolist()}
+
+    def _drawTree(self, fig, ax, tree: nx.DiGraph, pos: dict, node_size: int, large: bool):
+        if large:
+            node_size = max(5, node_size // 20)
+        if (self._crawl_root != None):
             nodelist = []
             node_colors = []
-            for node, data in self._tree.nodes(data=True):
+            for node, data in tree.nodes(data=True):
                 depth = data.get("depth", None)
                 if depth == None:
                     raise ValueError("Depth could not be None for crawled Trees.")
@@ -147,30 +455,32 @@ class ReferenceTreeBuilder:
                 if (depth < 0 and self._reverse_depth != None):
                     rgb = self.rgbForCrawl(self._reverse_depth, depth)
                 node_colors.append(self.rgbNorm(rgb))
-            nx.draw_networkx_nodes(self._tree, pos, node_size=node_size, node_color=node_colors, nodelist=nodelist)
+            nx.draw_networkx_nodes(tree, pos, node_size=node_size, node_color=node_colors, nodelist=nodelist, ax=ax)
         else:
-            nx.draw_networkx_nodes(self._tree, pos, node_size=node_size, node_color="#88ccee")
-        nx.draw_networkx_labels(self._tree, pos, font_size=9)
+            nx.draw_networkx_nodes(tree, pos, node_size=node_size, node_color="#88ccee", ax=ax)
+        if not large:
+            nx.draw_networkx_labels(tree, pos, font_size=9, ax=ax)
 
         edge_colors = []
         edge_widths = []
-        for u, v, data in self._tree.edges(data=True):
+        for u, v, data in tree.edges(data=True):
             w = data.get("weight", -1.0)
             edge_colors.append(self.rgbNorm(self.rgbForWeight(w)))
             try:
                 width = 1.0 + abs(float(w)) * 3.0
             except Exception:
                 width = 1.0
-            edge_widths.append(width)
+            edge_widths.append(width / 4.0 if large else width)
 
+        # large graphs are drawn as one line collection without arrow heads
+        arrows = {"arrows": False} if large else {"arrows": True, "arrowstyle": "-|>", "arrowsize": 12}
         nx.draw_networkx_edges(
-            self._tree,
+            tree,
             pos,
             edge_color=edge_colors,
             width=edge_widths,
-            arrows=True,
-            arrowstyle="-|>",
-            arrowsize=12,
+            ax=ax,
+            **arrows,
         )
 
         cmap = mpl.colors.LinearSegmentedColormap.from_list(
@@ -179,27 +489,35 @@ class ReferenceTreeBuilder:
         norm = mpl.colors.Normalize(vmin=0.0, vmax=1.0)
         sm = mpl.cm.ScalarMappable(norm=norm, cmap=cmap)
         sm.set_array(np.linspace(0.0, 1.0, 256))  # non-empty array for the colorbar
-        cb = plt.colorbar(sm, ax=plt.gca(), orientation="horizontal", fraction=0.05, pad=0.04)
+        cb = fig.colorbar(sm, ax=ax, orientation="horizontal", fraction=0.05, pad=0.04)
         cb.set_ticks([0.0, 0.5, 1.0])
         cb.set_ticklabels(["0 (red) critical", "0,5", "1 (green) non critical"])
         cb.set_label("critical index")
 
         blue_color = self.rgbNorm(self.rgbForWeight(-1.0))
         blue_patch = mpl.patches.Patch(color=blue_color, label="-1 (blue) unknown")
-        ax = plt.gca()
         ax.legend(handles=[blue_patch], loc="upper left", frameon=False, fontsize=9)
 
-        plt.axis("off")
-        plt.show()
+        ax.axis("off")
 
 ### IO ###
 
+    def getMeta(self):
+        return {"crawl_root": self._crawl_root, "crawl_depth": self._crawl_depth, "reverse_depth": self._reverse_depth, "comb_indexed": self._comb_indexed, "comb_mode": self._comb_mode}
+
+    def setMeta(self, meta: dict):
+        self._crawl_root = meta.get("crawl_root")
+        self._crawl_depth = meta.get("crawl_depth")
+        self._reverse_depth = meta.get("reverse_depth")
+        self._comb_indexed = bool(meta.get("comb_indexed"))
+        self._comb_mode = meta.get("comb_mode", ScoreCombiner.MULTIPLICATION)
+
     def build(self):
-        meta = {"crawl_root": self._crawl_root, "crawl_depth": self._crawl_depth, "reverse_depth": self._reverse_depth, "comb_indexed": self._comb_indexed}
-        nodes = {n: dict(d) for n, d in self._tree.nodes(data=True)}
+        meta = self.getMeta()
+        nodes = {self._graph.nodeId(n): self._nodeAttrs(n) for n in self._graph.liveNodes().tolist()}
         edges = [
-            {"source": u, "target": v, "attrs": dict(data)}
-            for u, v, data in self._tree.edges(data=True)
+            {"source": u, "target": v, "attrs": data}
+            for u, v, data in self.getEdges()
         ]
         return {"meta": meta, "nodes": nodes, "edges": edges}
 
@@ -213,115 +531,308 @@ class ReferenceTreeBuilder:
         with open(path, "r", encoding="utf-8") as f:
             data = json.load(f)
         meta = data.get("meta", {})
-        nodes_h = data.get("nodes").keys()
-        nodes = [str(n) for n in nodes_h]
+        nodes_h = data.get("nodes")
+        nodes = [str(n) for n in nodes_h.keys()]
         edges_h = data.get("edges", [])
         edges = [(str(e["source"]), str(e["target"]), float(e["attrs"].get("weight", -1.0))) for e in edges_h]
         gb = cls()
         gb.create(nodes, edges)
-        gb._crawl_root = meta.get("crawl_root")
-        gb._crawl_depth = meta.get("crawl_depth")
-        gb._reverse_depth = meta.get("reverse_depth")
-        gb._comb_indexed = meta.get("comb_indexed")
+        gb.setMeta(meta)
+        # restore the remaining attributes (depth, critical, base_weight, ...)
+        for node_id, attrs in nodes_h.items():
+            node = gb._graph.nodeIndex(str(node_id))
+            for name, value in attrs.items():
+                gb._graph.nodeColumn(name)[node] = value
+        for e in edges_h:
+            eid = gb._edgeIndex(str(e["source"]), str(e["target"]))
+            if eid < 0:
+                continue
+            for name, value in e["attrs"].items():
+                if name != "weight":
+                    gb._graph.edgeColumn(name)[eid] = value
         if (gb._crawl_root != None):
-            depths = {meta.get("crawl_root"): 0}
-            for node, attr in data.get('nodes', {}).items():
-                depths[node] = attr["depth"]
-            nx.set_node_attributes(gb._tree, depths, name="depth")
+            gb._graph.nodeColumn("depth")[gb._graph.nodeIndex(gb._crawl_root)] = 0
+        return gb
+
+    def storeSnapshot(self, path: str):
+        """
+        Writes a binary snapshot: an uncompressed npz file holding the
+        interned node table, the edge and CSR arrays, one array per
+        node/edge attribute and the meta data as JSON header.
+        """
+        arrays = self._graph.toArrays()
+        arrays["meta"] = np.frombuffer(json.dumps(self.getMeta()).encode("utf-8"), dtype=np.uint8)
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def loadSnapshot(cls, path: str):
+        # edges of a snapshot are known to be valid, so no cycle checks are replayed
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        gb = cls()
+        gb._graph = CsrGraph.fromArrays(arrays, edge_defaults={"weight": -1.0})
+        gb._graph.edgeColumn("weight", -1.0)
+        gb.setMeta(json.loads(arrays["meta"].tobytes().decode("utf-8")))
+        return gb
+
+    @classmethod
+    def openSnapshot(cls, path: str):
+        """
+        Opens a snapshot read-only on memory-mapped arrays. Nothing is copied
+        or rebuilt, so startup is near-instant and processes opening the same
+        file share one physical copy. Traversal, queries and crawls work as
+        usual, mutations raise a ValueError.
+        """
+        arrays = CsrGraph.mapNpz(path)
+        gb = cls()
+        gb._graph = CsrGraph.fromArrays(arrays, edge_defaults={"weight": -1.0}, mapped=True)
+        gb.setMeta(json.loads(arrays["meta"].tobytes().decode("utf-8")))
+        return gb
+
+    def attachJournal(self, path: str, compact_every: Optional[int] = 10000):
+        """
+        Starts journaling all further mutations to `path`. The current state
+        is written as snapshot first, so snapshot plus journal always describe
+        the whole tree. Reload it with loadJournal.
+        """
+        self.detachJournal()
+        self._journal = EdgeJournal(path, self, compact_every)
+        self._journal.compact()
+
+    def detachJournal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    @classmethod
+    def loadJournal(cls, path: str, attach: bool = False, compact_every: Optional[int] = 10000):
+        snapshot = EdgeJournal.snapshotPath(path)
+        gb = cls.loadSnapshot(str(snapshot)) if snapshot.exists() else cls()
+        entries, _ = EdgeJournal.readEntries(path) if Path(path).exists() else ([], 0)
+        gb.replay(entries)
+        if attach:
+            gb._journal = EdgeJournal(path, gb, compact_every)
         return gb
 
+    def replay(self, entries: List[list]):
+        # runs of added edges are inserted in bulk
+        edges = []
+        for op, *args in entries:
+            if op == EdgeJournal.ADD_EDGE:
+                edges.append((args[0], args[1], float(args[2])))
+                continue
+            if edges:
+                self.addEdges(edges)
+                edges = []
+            if op == EdgeJournal.ADD_NODE:
+                if not self._graph.hasNode(args[0]):
+                    self.addNode(args[0])
+            elif op == EdgeJournal.CHANGE_WEIGHT:
+                self.changeWeightOfEdge(args[0], args[1], float(args[2]))
+            elif op == EdgeJournal.COMB_INDEX:
+                self.buildCombCritIndex(args[0])
+            elif op == EdgeJournal.REMOVE_EDGE:
+                if self._edgeIndex(args[0], args[1]) >= 0:
+                    self.removeEdge(args[0], args[1])
+            elif op == EdgeJournal.REMOVE_NODE:
+                if self._graph.hasNode(args[0]):
+                    self.removeNode(args[0])
+            else:
+                raise ValueError(f"Unknown journal entry: {op}")
+        self.addEdges(edges)
+
 ### HELPERS ###
 
     def buildCombCritIndex(self, mode: str = ScoreCombiner.MULTIPLICATION):
+        self._graph.checkWritable()
         if self._comb_indexed:
+            if mode != self._comb_mode:
+                self.rescoreCombCritIndex(mode)
             return
-        for u, v, data in self.getEdges():
-            weight = data.get("weight", -1)
-            if weight == -1:
-                self.warning("Not all edges have an Index - not executing combination Indexing")
-                return
         self._comb_indexed = True
-        # Creating Crit Index of Nodes:
-        crits = {}
-        for node in self._tree.nodes():
-            total = 0.0
-            count = 0
-            for u, v, data in self._tree.out_edges(node, data=True):
-                weight = float(data.get("weight"))
-                total += weight
-                count += 1
-            crits[node] = (total / count) if count > 0 else -1.0
-        nx.set_node_attributes(self._tree, crits, name="critical")
+        self._comb_mode = mode
+        weights = self._graph.edgeColumn("weight")
+        base_weights = self._graph.edgeColumn("base_weight")
+        base_weights[:] = weights
+
+        # Creating Crit Index of Nodes (mean over the scored out-edges):
+        src, dst = self._graph.edgeEndpoints()
+        scored = (base_weights >= 0) & self._graph.edgeMask()
+        n = self._graph.numberOfNodes()
+        totals = np.bincount(src[scored], weights=base_weights[scored], minlength=n)
+        counts = np.bincount(src[scored], minlength=n)
+        crits = self._graph.nodeColumn("critical")
+        crits[:] = -1.0
+        np.divide(totals, counts, out=crits, where=counts > 0)
 
         # Creating Combination of Edge and Node Index:
-        for u, v, data in self.getEdges():
-            edge_weight = float(data.get("weight"))
-            attr = self._tree.nodes[v]
-            node_weight = float(attr.get("critical"))
-            combined = ScoreCombiner.combineCrits(node_weight, edge_weight, mode)
-            self._tree[u][v]['base_weight'] = edge_weight
-            self._tree[u][v]['weight'] = combined
-
-
-    def buildCrawlTree(self, start_node: str, max_depth: int, reverse_depth: Optional[int] = None):
-        if start_node not in self._tree:
+        self._combineEdges(np.flatnonzero(scored))
+        self._onMutation(EdgeJournal.COMB_INDEX, mode)
+
+    def rescoreCombCritIndex(self, mode: str):
+        # node indices only depend on the base weights, so switching modes is a single recombination
+        self._graph.checkWritable()
+        if not self._comb_indexed:
+            self.buildCombCritIndex(mode)
+            return
+        self._comb_mode = mode
+        self._combineEdges(self._graph.liveEdges())
+        self._onMutation(EdgeJournal.COMB_INDEX, mode)
+
+    def _combineEdges(self, edges: np.ndarray):
+        weights = self._graph.edgeColumn("weight")
+        base_weights = self._graph.edgeColumn("base_weight")[edges]
+        crits = self._graph.nodeColumn("critical")[self._graph.edgeEndpoints()[1][edges]]
+        # nodes that never got a critical index (NaN) count as unknown
+        crits = np.where(np.isnan(crits), -1.0, crits)
+        combined = ScoreCombiner.combineCritArrays(crits, base_weights, self._comb_mode)
+        # unscored edges (negative weight) keep their value
+        weights[edges] = np.where(base_weights >= 0, combined, base_weights)
+        self._weightsChanged(edges)
+
+    def _updateCombCritIndex(self, source: int, edges=()):
+        # an out-edge of `source` changed: only source's critical index and the
+        # edges that depend on it (its in-edges and the given edges) change
+        base_weights = self._graph.edgeColumn("base_weight")
+        out = base_weights[self._graph.outEdges(source)]
+        out = out[out >= 0]
+        self._graph.nodeColumn("critical")[source] = out.mean() if out.size > 0 else -1.0
+        self._combineEdges(np.append(self._graph.inEdges(source), np.asarray(edges, dtype=np.int64)).astype(np.int64))
+
+
+    def buildPropagatedCritIndex(self, damping: float = 0.85, tol: float = 1e-9, max_iter: Optional[int] = None):
+        """
+        Propagates weakness along citation chains. Like the crit_index a low
+        value is critical. The support of a node is the mean over its scored
+        references of
+            weight * ((1 - damping) + damping * support_of_reference)
+        so a claim is only as well supported as the chain it rests on: a weak
+        link anywhere below lowers it, with longer chains damped. Nodes
+        without scored references count as fully supported and keep -1
+        (unknown) as propagated index. The system is solved by sparse
+        fixed-point iteration, which on a DAG is exact after at most
+        longest-path many steps.
+        """
+        self._graph.checkWritable()
+        weights = self._graph.edgeColumn("base_weight" if self._comb_indexed else "weight")
+        src, dst = self._graph.edgeEndpoints()
+        scored = (weights >= 0) & self._graph.edgeMask()
+        src, dst = src[scored], dst[scored]
+        edge_support = weights[scored]
+        n = self._graph.numberOfNodes()
+        counts = np.bincount(src, minlength=n)
+        has_refs = counts > 0
+        inv_counts = np.divide(1.0, counts, out=np.zeros(n), where=has_refs)
+        base = (1.0 - damping) * np.bincount(src, weights=edge_support, minlength=n) * inv_counts
+
+        support = np.ones(n)
+        for _ in range(max_iter if max_iter is not None else n + 1):
+            spread = damping * np.bincount(src, weights=edge_support * support[dst], minlength=n) * inv_counts
+            updated = np.where(has_refs, base + spread, 1.0)
+            delta = np.max(np.abs(updated - support)) if n > 0 else 0.0
+            support = updated
+            if delta <= tol:
+                break
+
+        propagated = self._graph.nodeColumn("propagated")
+        propagated[:] = np.where(has_refs, support, -1.0)
+
+    def getPropagatedCrit(self, node_id: str):
+        node = self._nodeIndex(node_id)
+        if not self._graph.hasNodeColumn("propagated"):
+            raise ValueError("Propagated index has not been built. Call buildPropagatedCritIndex first.")
+        return float(self._graph.nodeColumn("propagated")[node])
+
+    def buildCrawlTree(self, start_node: str, max_depth: int, reverse_depth: Optional[int] = None) -> CrawlView:
+        root = self._graph.nodeIndex(start_node)
+        if root < 0:
             raise ValueError(f"Start node {start_node} does not exist in the graph.")
 
-        visited = {start_node}
-        q = deque([start_node])
-        d = deque([0])
-        edges = []
-        depths = {start_node: 0}
-
-        while q:
-            node = q.popleft()
-            depth = d.popleft()
-            if depth >= max_depth:
-                continue
-            for nbr in self._tree.successors(node):
-                weight = self._tree[node][nbr].get("weight", -1.0)
-                edges.append((str(node), str(nbr), weight))
-                if nbr not in visited:
-                    visited.add(nbr)
-                    depths[nbr] = depth + 1
-                    q.append(nbr)
-                    d.append(depth + 1)
-
-        q = deque([start_node])
-        d = deque([0])
         if (reverse_depth != None):
             reverse_depth = -abs(reverse_depth)
-
-        while q and reverse_depth != None:
-            node = q.popleft()
-            depth = d.popleft()
-            if depth <= reverse_depth:
-                continue
-            for nbr in self._tree.predecessors(node):
-                weight = self._tree[nbr][node].get("weight", -1.0)
-                edges.append((str(nbr), str(node), weight))
-                if nbr not in visited:
-                    visited.add(nbr)
-                    depths[nbr] = depth - 1
-                    q.append(nbr)
-                    d.append(depth - 1)
-
-        tree = self.__class__()
-        tree.create(visited, edges)
-
-        tree._crawl_root = start_node
-        tree._crawl_depth = max_depth
-        tree._reverse_depth = reverse_depth
-
-        nx.set_node_attributes(tree._tree, depths, name="depth")
-        return tree
+        # crawls are memoized per graph version; every mutation bumps the version and drops the cache
+        key = (start_node, max_depth, reverse_depth, self._version)
+        depth = self._crawl_cache.get(key)
+        if depth is None:
+            depth = self._graph.crawlDepths(root, max_depth, reverse_depth)
+            depth.flags.writeable = False
+            self._crawl_cache[key] = depth
+            if len(self._crawl_cache) > self.CRAWL_CACHE_SIZE:
+                self._crawl_cache.popitem(last=False)
+        else:
+            self._crawl_cache.move_to_end(key)
+        return CrawlView(self, start_node, max_depth, reverse_depth, depth)
 
 
     def checkIfCircular(self, source_id: str, target_id: str):
-        if source_id == target_id or nx.has_path(self._tree, target_id, source_id):
+        source = self._graph.nodeIndex(source_id)
+        target = self._graph.nodeIndex(target_id)
+        if source == target or self._graph.hasPath(target, source):
             return True
         return False
 
+    def _nodeIndex(self, node_id: str) -> int:
+        node = self._graph.nodeIndex(node_id)
+        if node < 0:
+            raise ValueError(f"Node {node_id} does not exist.")
+        return node
+
+    def _edgeIndex(self, source_id: str, target_id: str) -> int:
+        return self._graph.edgeIndex(self._graph.nodeIndex(source_id), self._graph.nodeIndex(target_id))
+
+    def _setEdge(self, source_id: str, target_id: str, weight: float):
+        eid = self._graph.addEdge(self._graph.nodeIndex(source_id), self._graph.nodeIndex(target_id))
+        self._setWeight(eid, weight)
+        self._onMutation(EdgeJournal.ADD_EDGE, source_id, target_id, float(weight))
+
+    def _onMutation(self, op: str, *args):
+        self._version += 1
+        self._crawl_cache.clear()
+        if self._journal is not None:
+            self._journal.record(op, *args)
+
+    def _setWeight(self, eid: int, weight: float):
+        self._graph.checkWritable()
+        # once combination indexed, weights are given as raw criticality and recombined
+        if self._comb_indexed:
+            self._graph.edgeColumn("base_weight")[eid] = weight
+            self._updateCombCritIndex(int(self._graph.edgeEndpoints()[0][eid]), (eid,))
+        else:
+            self._graph.edgeColumn("weight")[eid] = weight
+            self._weightsChanged((eid,))
+
+    def _weightsChanged(self, edges):
+        if self._crit_index is not None:
+            self._crit_index.invalidate(edges)
+
+    def _critIndex(self) -> CritIndex:
+        # created on first query, the graph may have been replaced by a loader
+        if self._crit_index is None or self._crit_index._graph is not self._graph:
+            self._crit_index = CritIndex(self._graph)
+        return self._crit_index
+
+    def _edgeTuples(self, edges: np.ndarray) -> List[tuple]:
+        src, dst = self._graph.edgeEndpoints()
+        weights = self._graph.edgeColumn("weight")
+        return [(self._graph.nodeId(int(src[e])), self._graph.nodeId(int(dst[e])), float(weights[e])) for e in edges.tolist()]
+
+    def _nodeAttrs(self, node: int) -> dict:
+        attrs = {}
+        for name in self._graph.nodeColumnNames():
+            value = float(self._graph.nodeColumn(name)[node])
+            if not np.isnan(value):
+                attrs[name] = int(value) if name in INT_ATTRS else value
+        return attrs
+
+    def _edgeAttrs(self, eid: int) -> dict:
+        attrs = {}
+        for name in self._graph.edgeColumnNames():
+            value = float(self._graph.edgeColumn(name)[eid])
+            if not np.isnan(value):
+                attrs[name] = value
+        return attrs
+
     def warning(self, msg: str):
         yellow = "\x1b[93m"  # bright yellow
         reset = "\x1b[0m"
@@ -1,22 +1,68 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+# combiners work on support values (1 - criticality) of the node and the edge
+Combiner = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
 class ScoreCombiner:
     MULTIPLICATION = "multiplication"
     MIN = "min"
+    NOISY_OR = "noisy_or"
+    HARMONIC = "harmonic"
+    GEOMETRIC = "geometric"
+    FLOOR = 0.001
+
+    _combiners: Dict[str, Combiner] = {}
+    _floors: Dict[str, Optional[float]] = {}
+
+    @classmethod
+    def register(cls, mode: str, combiner: Combiner, floor: Optional[float] = None):
+        """
+        Registers a combiner under `mode`. It receives the node and the edge
+        support as arrays and returns the combined support, which is clipped
+        to `floor` if one is given.
+        """
+        cls._combiners[mode] = combiner
+        cls._floors[mode] = floor
+
+    @classmethod
+    def modes(cls) -> List[str]:
+        return list(cls._combiners.keys())
 
     @staticmethod
     def combineCrits(weight_1: float, weight_2: float, mode: str = MULTIPLICATION):
-        if weight_1 == -1:
-            # case that we have the root nodes who reference nothing anymore (would need a specific model to check them or manual setting)
-            return weight_2
-        weight_1 = 1.0 - weight_1
-        weight_2 = 1.0 - weight_2
-        combined = 0.0
-        match mode:
-            case ScoreCombiner.MULTIPLICATION:
-                combined = weight_1 * weight_2
-                if combined < 0.001:
-                    combined = 0.001
-            case ScoreCombiner.MIN:
-                combined = min(weight_1, weight_2)
-            case _:
-                raise ValueError(f"Unknown mode: {mode}")
-        return 1.0 - combined
\ No newline at end of file
+        return float(ScoreCombiner.combineCritArrays(weight_1, weight_2, mode))
+
+    @classmethod
+    def combineCritArrays(cls, weights_1: np.ndarray, weights_2: np.ndarray, mode: str = MULTIPLICATION) -> np.ndarray:
+        combiner = cls._combiners.get(mode)
+        if combiner is None:
+            raise ValueError(f"Unknown mode: {mode}")
+        weights_1 = np.asarray(weights_1, dtype=np.float64)
+        weights_2 = np.asarray(weights_2, dtype=np.float64)
+        combined = combiner(1.0 - weights_1, 1.0 - weights_2)
+        floor = cls._floors[mode]
+        if floor is not None:
+            combined = np.maximum(combined, floor)
+        # case that we have the root nodes who reference nothing anymore (would need a specific model to check them or manual setting)
+        return np.where(weights_1 == -1, weights_2, 1.0 - combined)
+
+    @staticmethod
+    def weightedGeometricMean(node_share: float) -> Combiner:
+        def combine(node_support: np.ndarray, edge_support: np.ndarray) -> np.ndarray:
+            return np.power(node_support, node_share) * np.power(edge_support, 1.0 - node_share)
+        return combine
+
+    @staticmethod
+    def _harmonic(node_support: np.ndarray, edge_support: np.ndarray) -> np.ndarray:
+        total = node_support + edge_support
+        return np.divide(2.0 * node_support * edge_support, total, out=np.zeros_like(total), where=total > 0)
+
+
+ScoreCombiner.register(ScoreCombiner.MULTIPLICATION, np.multiply, floor=ScoreCombiner.FLOOR)
+ScoreCombiner.register(ScoreCombiner.MIN, np.minimum)
+# supported if either the cited paper or the citing usage is supported
+ScoreCombiner.register(ScoreCombiner.NOISY_OR, lambda a, b: 1.0 - (1.0 - a) * (1.0 - b))
+ScoreCombiner.register(ScoreCombiner.HARMONIC, ScoreCombiner._harmonic, floor=ScoreCombiner.FLOOR)
+ScoreCombiner.register(ScoreCombiner.GEOMETRIC, ScoreCombiner.weightedGeometricMean(0.5), floor=ScoreCombiner.FLOOR)
@@ -1,5 +1,6 @@
 import os
 import random
+import time
 
 from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
 
@@ -14,9 +15,20 @@ CRAWL_DEPTH = 5
 REVERSE_DEPTH = 2
 CRAWL_ROOT = "5"
 
+# plots are written here as .svg instead of being shown
+OUT_DIR = os.path.join(os.path.dirname(__file__), "output")
 
 
-def run():
+def timed(label: str, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    print(f"[TIME] {label}: {(time.perf_counter() - start) * 1000:.2f}ms")
+    return result
+
+
+def run(plot: bool = True):
+    # larger graphs and regression thresholds: python -m CiteSide.Benchmark.BenchmarkSuite
+    os.makedirs(OUT_DIR, exist_ok=True)
     rtb = ReferenceTreeBuilder()
     for i in range (NUMBER_NODES):
         rtb.addNode(str(i))
@@ -28,16 +40,14 @@ def run():
         if random.random() < UNKNOWN_WEIGHT_FREQUENCY:
             rtb.changeWeightOfEdge(edge[0], edge[1], random.random() ** RARENESS_EXP)
 
-    built = rtb.build()
+    timed("build", rtb.build)
 
     # Persist and reload
-    out_dir = os.path.join(os.path.dirname(__file__), "output")
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, "rtb_test.json")
-    rtb.store(out_path)
+    out_path = os.path.join(OUT_DIR, "rtb_test.json")
+    timed("store", rtb.store, out_path)
     print(f"Stored to {out_path}")
 
-    gb_loaded = rtb.load(out_path)
+    gb_loaded = timed("load", rtb.load, out_path)
     #gb_loaded.printTree()
     #gb_loaded.plotTree()
 
@@ -56,27 +66,32 @@ def run():
 
     print(rtb_crawl.getReferences("0"))
     rtb_crawl.changeWeightOfEdge("0", "1", -0.5)
-    rtb_crawl.plotTree()
+    if plot:
+        rtb_crawl.plotTree(path=os.path.join(OUT_DIR, "rtb_crawl.svg"))
 
-    rtb_crawl.addNodeIndex("0", 0.9)
+    # node level index: weakness propagated along the citation chains
+    timed("buildPropagatedCritIndex", rtb_crawl.buildPropagatedCritIndex)
+    print("Propagated index of 0:", rtb_crawl.getPropagatedCrit("0"))
 
-    crawled = rtb_crawl.buildCrawlTree(CRAWL_ROOT, CRAWL_DEPTH, REVERSE_DEPTH)
+    crawl = timed("buildCrawlTree", rtb_crawl.buildCrawlTree, CRAWL_ROOT, CRAWL_DEPTH, REVERSE_DEPTH)
+    crawled = timed("materialize", crawl.materialize)
     crawled.printTree()
-    crawled.plotTree()
+    if plot:
+        crawled.plotTree(path=os.path.join(OUT_DIR, "rtb_crawled.svg"))
 
-    crawled.buildCombCritIndex()
+    timed("buildCombCritIndex", crawled.buildCombCritIndex)
     crawled.printTree()
-    crawled.plotTree()
+    if plot:
+        crawled.plotTree(path=os.path.join(OUT_DIR, "rtb_crawled_comb.svg"))
 
-    out_dir = os.path.join(os.path.dirname(__file__), "output")
-    os.makedirs(out_dir, exist_ok=True)
-    out_path = os.path.join(out_dir, "rtb_test.json")
-    crawled.store(out_path)
+    out_path = os.path.join(OUT_DIR, "rtb_test.json")
+    timed("store", crawled.store, out_path)
     print(f"Stored to {out_path}")
 
-    gb_loaded = crawled.load(out_path)
+    gb_loaded = timed("load", crawled.load, out_path)
     gb_loaded.printTree()
-    gb_loaded.plotTree()
+    if plot:
+        gb_loaded.plotTree(path=os.path.join(OUT_DIR, "rtb_loaded.svg"))
 
 
 if __name__ == "__main__":
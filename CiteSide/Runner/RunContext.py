@@ -0,0 +1,46 @@
+from CiteSide.FileHandler.DerivedCache import DerivedCache
+from CiteSide.FileHandler.JsonHandler import JsonHandler
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+from CiteSide.Runner.Tracer import Tracer
+from CiteSide.UsageValidator.UsageValidator import UsageValidator
+from typing import Optional
+
+
+class RunContext:
+    """
+    Collaborators of ValidationRunner.run that can be kept between runs.
+
+    A full_tree built with ReferenceTreeBuilder.fromCorpus(jh) and a
+    DerivedCache(jh) follow jh.addPaper/updatePaper/removePaper, so a run
+    with the same context only revalidates changed papers.
+    uv=UsageValidator.withStubs() runs the crawl without model weights and a
+    tracer times the stages per paper and crawl depth. What is left out is
+    built by prepare() on the first run and kept: the default dataset, its
+    reference tree and a UsageValidator with the real models. Without a
+    cache every paper is validated again.
+    """
+
+    def __init__(
+            self,
+            jh: Optional[JsonHandler] = None,
+            full_tree: Optional[ReferenceTreeBuilder] = None,
+            uv: Optional[UsageValidator] = None,
+            cache: Optional[DerivedCache] = None,
+            tracer: Optional[Tracer] = None):
+        self.jh = jh
+        self.full_tree = full_tree
+        self.uv = uv
+        self.cache = cache
+        self.tracer = tracer
+
+    def prepare(self) -> "RunContext":
+        if self.jh is None:
+            self.jh = JsonHandler()
+            print("Loading dataset...")
+            self.jh.loadDataset()
+        if self.full_tree is None:
+            print("Building Reference Tree...")
+            self.full_tree = ReferenceTreeBuilder.fromCorpus(self.jh, follow=False)
+        if self.uv is None:
+            self.uv = UsageValidator()
+        return self
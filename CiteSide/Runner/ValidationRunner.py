@@ -1,7 +1,9 @@
 from CiteSide.FileHandler.JsonHandler import JsonHandler
 from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
-from CiteSide.UsageValidator.UsageValidator import UsageValidator
+from CiteSide.Runner.RunContext import RunContext
+from CiteSide.Runner.Tracer import NULL_TRACER, Tracer
 from collections import deque
+from typing import Optional
 
 def getSuccessorAuthorAndYear(tree: ReferenceTreeBuilder, data: JsonHandler, paper_id: str):
     successors = tree.getReferences(paper_id)
@@ -48,52 +50,76 @@ def printFindings(replys):
 
         print(f"{color}{reply}{reset}")
 
-def run(argument: str, paper_id: str):
-    # Loading the Data
-    jh = JsonHandler()
-    print("Loading dataset...")
-    jh.loadDataset()
-    full_tree = ReferenceTreeBuilder()
-    for node in jh.getIds():
-        full_tree.addNode(node)
-
-    print("Building Reference Tree...")
-    for node in jh.getIds():
-        outgoing_refs = jh.getOutgoingRefs(node)
-        for ref in outgoing_refs:
-            if ref in jh.getIds():
-                full_tree.addEdge(node, ref)
-
+def run(
+        argument: str,
+        paper_id: str,
+        context: Optional[RunContext] = None,
+        journal_path: Optional[str] = None,
+        plot_path: Optional[str] = None,
+        trace_path: Optional[str] = None,
+        plot: bool = True):
+    # the context holds corpus, reference tree, validator, cache and tracer; keep it between runs to reuse them
+    # with a tracer in the context (or a trace_path) the stages are timed per paper and crawl depth,
+    # trace_path gets a Chrome trace and <trace_path stem>.summary.json
+    # plot=False skips the plot
+    context = (context or RunContext()).prepare()
+    jh, full_tree, uv, cache = context.jh, context.full_tree, context.uv, context.cache
+    tracer = context.tracer
+    if tracer is None:
+        tracer = Tracer() if trace_path else NULL_TRACER
 
     # Validate usages
-    uv = UsageValidator()
+    uv.setTracer(tracer)
     searched_tree = ReferenceTreeBuilder()
     searched_tree.addNode(paper_id)
+    if journal_path:
+        # progress of the crawl is appended as it happens, reload with ReferenceTreeBuilder.loadJournal
+        searched_tree.attachJournal(journal_path)
     search_queue = deque()
-    search_queue.append((argument, paper_id))
+    search_queue.append((argument, paper_id, 0))
     visited = set()
     replys = []
     print("Starting validating...")
     while search_queue:
-        argument, paper_id = search_queue.popleft()
+        argument, paper_id, depth = search_queue.popleft()
         print("Validating Paper:", {paper_id})
-        uv_reply = uv.run(argument, jh.getFullText(paper_id), getSuccessorAuthorAndYear(full_tree, jh, paper_id))
-        if not uv_reply:
-            continue
-        for reply in uv_reply:
-            reply["source_paper_id"] = paper_id
-            replys.append(reply)
-            if (not reply["paper_id"]):
+        with tracer.paper(paper_id, depth):
+            with tracer.span("load_paper"):
+                paper_refs = getSuccessorAuthorAndYear(full_tree, jh, paper_id)
+                # sentence/citation spans are None unless the corpus was preprocessed with --spans
+                sentence_spans, citation_spans = jh.getSentenceSpans(paper_id), jh.getCitationSpans(paper_id)
+            if cache is None:
+                uv_reply = uv.run(argument, jh.getFullText(paper_id), paper_refs,
+                                  sentence_spans=sentence_spans, citation_spans=citation_spans)
+            else:
+                # the reply depends on the paper text, on authors/year of its references and on the validator setup
+                depends_on = [paper_id] + [ref["paper_id"] for ref in paper_refs or []]
+                misses = cache.getStats()["misses"]
+                uv_reply = cache.getOrCompute(
+                    ("usage", uv.configKey(), argument, paper_id),
+                    depends_on,
+                    lambda: uv.run(argument, jh.getFullText(paper_id), paper_refs,
+                                   sentence_spans=sentence_spans, citation_spans=citation_spans),
+                )
+                tracer.count("cache_misses" if cache.getStats()["misses"] > misses else "cache_hits")
+            if not uv_reply:
                 continue
-            argument_reply = argument
-            paper_id_reply = reply["paper_id"]
-            crit_index = reply["crit_index"]
-            if paper_id_reply not in visited:
-                visited.add(paper_id_reply)
-                search_queue.append((argument_reply, paper_id_reply))
-            searched_tree.addNode(paper_id_reply)
-            searched_tree.addEdge(paper_id, paper_id_reply)
-            searched_tree.changeWeightOfEdge(paper_id, paper_id_reply, crit_index)
+            with tracer.span("graph_update", replies=len(uv_reply)):
+                for reply in uv_reply:
+                    reply["source_paper_id"] = paper_id
+                    replys.append(reply)
+                    if (not reply["paper_id"]):
+                        continue
+                    argument_reply = argument
+                    paper_id_reply = reply["paper_id"]
+                    crit_index = reply["crit_index"]
+                    if paper_id_reply not in visited:
+                        visited.add(paper_id_reply)
+                        search_queue.append((argument_reply, paper_id_reply, depth + 1))
+                    if not searched_tree.hasNode(paper_id_reply):
+                        searched_tree.addNode(paper_id_reply)
+                    searched_tree.addEdge(paper_id, paper_id_reply)
+                    searched_tree.changeWeightOfEdge(paper_id, paper_id_reply, crit_index)
     
 
     print("Found Snippets")
@@ -102,7 +128,21 @@ def run(argument: str, paper_id: str):
 
     printFindings(replys)
 
-    searched_tree.plotTree()
+    if uv.snippet_deduplicator is not None:
+        stats = uv.snippet_deduplicator.getStats()
+        print(f"\nSnippet dedup: {stats['snippets']} snippets in {stats['clusters']} clusters "
+              f"({stats['dedup_rate']:.1%} duplicates), {stats['validations']} entailment calls, "
+              f"{stats['reused']} reused ({stats['reuse_rate']:.1%})")
+
+    searched_tree.detachJournal()
+    if trace_path:
+        tracer.printSummary()
+        trace_file, summary_file = tracer.export(trace_path)
+        print(f"Trace written to {trace_file} and {summary_file}")
+    # with a plot_path (.svg/.png/.html) the tree is exported headless instead of shown
+    if plot:
+        searched_tree.plotTree(path=plot_path)
+    return searched_tree, replys
 
 
 if __name__ == "__main__":
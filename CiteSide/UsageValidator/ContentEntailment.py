@@ -1,9 +1,5 @@
-from warnings import deprecated
-
 from CiteSide.FileHandler.JsonHandler import JsonHandler
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
-import torch.nn.functional as F
+from CiteSide.Runner.Tracer import NULL_TRACER
 """
 tested model:
 model_name = "roberta-large-mnli" prob outputs ranged from 0.002 to 0.04
@@ -32,11 +28,21 @@ class ContentEntailment:
     _tokenizer = None
     _model = None
     _device = None
+    # object with predict(premise, hypothesis) -> {label: prob}, e.g. StubModels.StubNli
+    _backend = None
+    tracer = NULL_TRACER
+
+    @classmethod
+    def useBackend(self, backend=None):
+        # None switches back to the transformers model
+        self._backend = backend
 
     @classmethod
     def _ensure_loaded(self):
         if self._model is not None:
             return
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
         self._device = "cuda" if torch.cuda.is_available() else "cpu"
         self._tokenizer = AutoTokenizer.from_pretrained(self._model_name, use_fast=True)
         self._model = AutoModelForSequenceClassification.from_pretrained(self._model_name)
@@ -44,14 +50,17 @@ class ContentEntailment:
         self._model.eval()
 
     @classmethod
-    def validate(self, hypothesis: str, premise: str, threshold: float = 0.65):
+    def predict(self, premise: str, hypothesis: str):
         self._ensure_loaded()
+        import torch
+        import torch.nn.functional as F
 
         if (len(self._tokenizer.encode(premise, hypothesis)) > 400):
             print("Warning: Input too long, truncating may affect results.")
 
         inputs = self._tokenizer(premise, hypothesis, return_tensors="pt", truncation=True, padding=True)
         inputs = {k: v.to(self._device) for k, v in inputs.items()}
+        self.tracer.count("prompt_tokens", int(inputs["input_ids"].shape[-1]))
 
         with torch.inference_mode():
             outputs = self._model(**inputs)
@@ -68,21 +77,30 @@ class ContentEntailment:
                 id2label = {i: labels[i] for i in range(n_labels)}
             else:
                 id2label = {i: str(i) for i in range(n_labels)}
+        probs = probs.cpu().tolist()
+        return {id2label.get(i, str(i)): probs[i] for i in range(n_labels)}
 
-        pred_idx = int(torch.argmax(probs).cpu().item())
-        pred_label = id2label.get(pred_idx, str(pred_idx))
+    @classmethod
+    def validate(self, hypothesis: str, premise: str, threshold: float = 0.65):
+        backend = self._backend if self._backend is not None else self
+        with self.tracer.span("nli_call"):
+            label_probs = backend.predict(premise, hypothesis)
+        self.tracer.count("nli_calls")
+
+        labels = list(label_probs)
+        pred_label = max(labels, key=label_probs.get)
 
-        entail_idx = None
-        for i, label in id2label.items():
+        entail_label = None
+        for label in labels:
             if "entail" in label.lower():
-                entail_idx = i
+                entail_label = label
                 break
-        
-        if entail_idx is not None:
-            entailment_prob = float(probs[entail_idx].cpu().item())
+
+        if entail_label is not None:
+            entailment_prob = float(label_probs[entail_label])
             is_equivalent = entailment_prob >= threshold
-        elif n_labels == 2:
-            entailment_prob = float(probs[1].cpu().item())
+        elif len(labels) == 2:
+            entailment_prob = float(label_probs[labels[1]])
             is_equivalent = entailment_prob >= threshold
         else:
             entailment_prob = None
@@ -1,16 +1,24 @@
 from CiteSide.FileHandler.JsonHandler import JsonHandler
+from CiteSide.Runner.Tracer import NULL_TRACER
 import math
 from typing import Dict
-from llama_cpp import Llama
 from pathlib import Path
 
 
 class LlamaContentEntailment:
     LABELS = ["SUPPORTS", "CONTRADICTS", "UNKNOWN"]
-
-    def __init__(self):
+    tracer = NULL_TRACER
+
+    def __init__(self, llm=None):
+        self.model_path = None
+        if llm is not None:
+            # any callable with the llama_cpp.Llama completion interface, e.g. StubModels.StubLlama
+            self.llm = llm
+            return
+        from llama_cpp import Llama
         base_dir = Path(__file__).resolve().parent
         model_path = base_dir / "mistral-7b-instruct-v0.2.Q5_K_M.gguf"
+        self.model_path = str(model_path)
 
         self.llm = Llama(
             model_path=str(model_path),
@@ -75,13 +83,19 @@ class LlamaContentEntailment:
         scores = {}
 
         for label in self.LABELS:
-            output = self.llm(
-                prompt + " " + label,
-                max_tokens=0,
-                echo=True,
-                logprobs=True,
-                temperature=0.0
-            )
+            with self.tracer.span("llm_call", label=label) as call:
+                output = self.llm(
+                    prompt + " " + label,
+                    max_tokens=0,
+                    echo=True,
+                    logprobs=True,
+                    temperature=0.0
+                )
+                if self.tracer.enabled:
+                    # span duration is the eval time of the prompt
+                    call["prompt_tokens"] = output.get("usage", {}).get("prompt_tokens")
+                    self.tracer.count("llm_calls")
+                    self.tracer.count("prompt_tokens", call["prompt_tokens"] or 0)
 
             token_logprobs = output["choices"][0]["logprobs"]["token_logprobs"]
             scores[label] = sum(lp for lp in token_logprobs if lp is not None)
@@ -89,6 +103,11 @@ class LlamaContentEntailment:
         return scores
 
     def select_label(self, scores: Dict[str, float]):
+        """
+        (label, probability of the most likely label). If the two most likely
+        labels are closer than prob_threshold the label is "Could not
+        determine: difference too small", still with the top probability.
+        """
         prob_threshold = 0.03
         max_log = max(scores.values())
         exp_scores = {
@@ -103,8 +122,8 @@ class LlamaContentEntailment:
         p2 = max(p for k, p in probs.items() if k != label)
         if(p - p2) < prob_threshold:
             label = "Could not determine: difference too small"
-       
-        return label, probs[label]
+
+        return label, p
 
     def contradiction_stress_test(self, premise: str, argument: str) -> Dict:
         negated_argument = f"It is not true that {argument}"
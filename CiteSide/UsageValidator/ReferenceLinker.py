@@ -1,4 +1,5 @@
 import re
+from bisect import bisect_left
 
 class ReferenceLinker:
     def extract_surnames(self, ref):
@@ -34,6 +35,19 @@ class ReferenceLinker:
                     return ref["paper_id"]
         return None
 
+    def link_citations(self, offset, length, citation_spans, refs):
+        # citation_spans are the [offset, length, ref_id] spans (sorted by offset) the preprocessor
+        # wrote with --spans, the first citation inside the snippet that is one of refs wins
+        if not refs:
+            return None
+        ref_ids = {ref["paper_id"] for ref in refs}
+        i = bisect_left(citation_spans, offset, key=lambda span: span[0])
+        while i < len(citation_spans) and citation_spans[i][0] < offset + length:
+            if citation_spans[i][2] in ref_ids:
+                return citation_spans[i][2]
+            i += 1
+        return None
+
 if __name__ == "__main__":
     rl = ReferenceLinker()
     snippet = "The SDP graph banks were originally released through the Linguistic Data Consortium (as catalogue entry LDC 2016T10); they comprise four distinct bi-lexical semantic dependency frameworks, from which the MRP 2019 shared task selects two (a) DELPH-IN MRS Bi-Lexical Dependencies (DM) and (b) Prague Semantic Dependencies (PSD). 1 1 Note, however, that the parsing problem for these frameworks is harder in the current shared task than in the ealier DELPH-IN MRS Bi-Lexical Dependencies The DM bi-lexical dependencies (Ivanova et al., 2012) originally derive from the underspecified logical forms computed by the English Resource Grammar (Flickinger et al., 2017; Copestake et al., 2005) . These logical forms are not in and of themselves semantic graphs (in the sense of §2 above) and are often refered to as English Resource Semantics (ERS; Bender et al., 2015) ."
@@ -1,25 +1,51 @@
 from CiteSide.FileHandler.JsonHandler import JsonHandler
-from sentence_transformers import SentenceTransformer, util
-import nltk
+from CiteSide.Runner.Tracer import NULL_TRACER
+import numpy as np
 from typing import List, Dict
 
-nltk.download("punkt", quiet=True)
-nltk.download("punkt_tab", quiet=True)
+_punkt_ready = False
+
+
+def sent_tokenize(text: str) -> List[str]:
+    # nltk and its punkt data are only loaded once a text without precomputed sentence spans comes in
+    global _punkt_ready
+    import nltk
+    if not _punkt_ready:
+        nltk.download("punkt", quiet=True)
+        nltk.download("punkt_tab", quiet=True)
+        _punkt_ready = True
+    return nltk.sent_tokenize(text)
+
 
 class SnippetCollector:
+    tracer = NULL_TRACER
+
     def __init__(
         self,
         model_name: str = "sentence-transformers/all-mpnet-base-v2",
         chunk_size: int = 1,
-        stride: int | None = None
+        stride: int | None = None,
+        model=None
     ):
-        self.model = SentenceTransformer(model_name)
+        # any object with SentenceTransformer.encode, e.g. StubModels.StubSentenceTransformer
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        self.model = model
+        self.model_name = model_name
         self.chunk_size = max(1, chunk_size)
         # default stride creates overlap; set to 1 for strong overlap or equal to chunk_size for no overlap
         self.stride = stride if stride is not None else max(1, self.chunk_size - 1)
 
-    def chunk_sentences(self, text: str):
-        sents = nltk.sent_tokenize(text)
+    def chunk_sentences(self, text: str, sentence_spans: List[List[int]] | None = None):
+        # precomputed [offset, length] sentence spans (preprocessor --spans) skip the tokenizer
+        # and give every chunk its character span in text
+        with self.tracer.span("sentence_split", precomputed=sentence_spans is not None):
+            if sentence_spans is not None:
+                sents = [text[offset:offset + length] for offset, length in sentence_spans]
+            else:
+                sents = sent_tokenize(text)
+        self.tracer.count("sentences", len(sents))
         if not sents:
             return []
 
@@ -28,12 +54,17 @@ class SnippetCollector:
             chunk_sents = sents[i:i + self.chunk_size]
             if not chunk_sents:
                 continue
-            chunks.append({
+            chunk = {
                 "text": " ".join(chunk_sents),
                 "sentences": chunk_sents,
                 "start_index": i,
                 "end_index": i + len(chunk_sents) - 1
-            })
+            }
+            if sentence_spans is not None:
+                first, last = sentence_spans[i], sentence_spans[i + len(chunk_sents) - 1]
+                chunk["offset"] = first[0]
+                chunk["length"] = last[0] + last[1] - first[0]
+            chunks.append(chunk)
             if i + self.chunk_size >= len(sents):
                 break
         return chunks
@@ -43,28 +74,32 @@ class SnippetCollector:
         text: str,
         argument: str,
         top_k: int = 5,
-        min_score: float = 0.45
+        min_score: float = 0.45,
+        sentence_spans: List[List[int]] | None = None
     ) -> List[Dict]:
-        chunks = self.chunk_sentences(text)
+        chunks = self.chunk_sentences(text, sentence_spans)
         if not chunks:
             return []
 
         chunk_texts = [c["text"] for c in chunks]
 
-        chunk_embeddings = self.model.encode(
-            chunk_texts,
-            convert_to_tensor=True,
-            normalize_embeddings=True
-        )
+        with self.tracer.span("chunk_encoding", chunks=len(chunk_texts)):
+            chunk_embeddings = self.model.encode(
+                chunk_texts,
+                normalize_embeddings=True
+            )
+        self.tracer.count("chunks_encoded", len(chunk_texts))
 
-        argument_embedding = self.model.encode(
-            argument,
-            convert_to_tensor=True,
-            normalize_embeddings=True
-        )
+        with self.tracer.span("argument_encoding"):
+            argument_embedding = self.model.encode(
+                argument,
+                normalize_embeddings=True
+            )
 
-        scores = util.cos_sim(argument_embedding, chunk_embeddings)[0]
-        ranked_indices = scores.argsort(descending=True)
+        with self.tracer.span("ranking"):
+            # the embeddings are normalized, so the dot product is the cosine similarity
+            scores = np.asarray(chunk_embeddings) @ np.asarray(argument_embedding)
+            ranked_indices = np.argsort(-scores, kind="stable")
 
         '''
         results = []
@@ -86,10 +121,14 @@ class SnippetCollector:
             score = scores[idx].item()
             if score >= min_score:
                 c = chunks[idx]
-                results.append({
+                result = {
                     "chunk": c["text"],
                     "snippet_score": score
-                })
+                }
+                if "offset" in c:
+                    result["offset"] = c["offset"]
+                    result["length"] = c["length"]
+                results.append(result)
 
         return results
 
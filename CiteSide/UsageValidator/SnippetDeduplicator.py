@@ -0,0 +1,152 @@
+import re
+import zlib
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+from CiteSide.Runner.Tracer import NULL_TRACER
+
+# citation markers differ between papers quoting the same sentence: "(Lai et al., 2020)", "[3, 4]"
+_CITATION = re.compile(r"\([^()]*\d{4}[a-z]?\)|\[\d+(?:\s*[,–-]\s*\d+)*\]")
+_TOKEN = re.compile(r"[a-z0-9]+")
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_NEGATIONS = frozenset({
+    "not", "no", "never", "neither", "nor", "none", "nothing", "nobody", "without", "cannot", "lack", "lacks",
+    "lacked", "unlikely", "absence", "absent", "fail", "fails", "failed",
+})
+_PRIME = (1 << 31) - 1
+
+
+class SnippetDeduplicator:
+    """
+    Clusters near-duplicate snippets so the entailment model runs once per
+    cluster instead of once per snippet.
+
+    Snippets are normalized (citation markers, case and punctuation removed)
+    and split into word shingles. A MinHash signature of the shingles is
+    banded into an LSH index, snippets sharing a band are candidates and a
+    candidate joins the cluster whose representative has a shingle Jaccard
+    similarity of at least `threshold`. Negations and numbers decide the
+    entailment label on their own ("associated" / "not associated", "5.2
+    days" / "14 days"), so snippets only share a cluster if both contain
+    exactly the same ones. Clusters live for the whole crawl, so the same
+    claim repeated by review and follow-up papers is validated once per
+    argument and the result is reused for every snippet (and so every
+    source -> linked_ref edge) of the cluster.
+    """
+
+    tracer = NULL_TRACER
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, bands: int = 16, shingle_size: int = 2, seed: int = 0):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be a multiple of bands ({bands})")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = max(1, shingle_size)
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+        self.clear()
+
+    def clear(self):
+        # (band, band signature bytes) -> cluster ids
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        # per cluster: shingles, negations/numbers and text of the representative, member count and results per argument
+        self._clusters: List[dict] = []
+        self._snippets = 0
+        self._validations = 0
+        self._reused = 0
+
+    def configKey(self) -> tuple:
+        # settings that decide which snippets share a cluster
+        return self.threshold, self.num_perm, self.bands, self.shingle_size, self.seed
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(_TOKEN.findall(_CITATION.sub(" ", text).lower().replace("n't", " not")))
+
+    @staticmethod
+    def guard(text: str) -> tuple:
+        """Negation words and numbers of the snippet, which must match exactly within a cluster."""
+        text = _CITATION.sub(" ", text).lower().replace("n't", " not")
+        negations = sorted(set(_TOKEN.findall(text)) & _NEGATIONS)
+        return tuple(negations), tuple(sorted(set(_NUMBER.findall(text))))
+
+    def shingles(self, text: str) -> frozenset:
+        words = self.normalize(text).split()
+        if len(words) <= self.shingle_size:
+            return frozenset([" ".join(words)])
+        return frozenset(" ".join(words[i:i + self.shingle_size]) for i in range(len(words) - self.shingle_size + 1))
+
+    def signature(self, shingles: frozenset) -> np.ndarray:
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) % _PRIME for s in shingles), dtype=np.uint64, count=len(shingles))
+        # one universal hash a*x+b mod p per permutation, minimum over the shingles
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def assign(self, text: str) -> int:
+        """Returns the cluster id of `text`, a new cluster if no representative is similar enough."""
+        self._snippets += 1
+        shingles = self.shingles(text)
+        guard = self.guard(text)
+        keys = [(band, rows.tobytes()) for band, rows in enumerate(np.split(self.signature(shingles), self.bands))]
+
+        best, best_similarity = None, self.threshold
+        seen = set()
+        for key in keys:
+            for cluster_id in self._buckets.get(key, ()):
+                if cluster_id in seen:
+                    continue
+                seen.add(cluster_id)
+                if self._clusters[cluster_id]["guard"] != guard:
+                    continue
+                representative = self._clusters[cluster_id]["shingles"]
+                similarity = len(shingles & representative) / len(shingles | representative)
+                if similarity >= best_similarity:
+                    best, best_similarity = cluster_id, similarity
+        if best is not None:
+            self._clusters[best]["members"] += 1
+            self.tracer.count("dedup_duplicates")
+            return best
+
+        cluster_id = len(self._clusters)
+        self._clusters.append({"shingles": shingles, "guard": guard, "text": text, "members": 1, "results": {}})
+        for key in keys:
+            self._buckets.setdefault(key, []).append(cluster_id)
+        self.tracer.count("dedup_clusters")
+        return cluster_id
+
+    def validate(self, argument: str, text: str, compute: Callable[[str], dict]) -> Tuple[int, dict]:
+        """
+        Cluster id and entailment result of `text`: compute(representative
+        text) on the first snippet of a cluster per argument, the stored
+        result for every further one.
+        """
+        with self.tracer.span("dedup"):
+            cluster_id = self.assign(text)
+        cluster = self._clusters[cluster_id]
+        result = cluster["results"].get(argument)
+        if result is None:
+            result = cluster["results"][argument] = compute(cluster["text"])
+            self._validations += 1
+        else:
+            self._reused += 1
+            self.tracer.count("entailment_reused")
+        return cluster_id, result
+
+    def getRepresentative(self, cluster_id: int) -> str:
+        return self._clusters[cluster_id]["text"]
+
+    def getStats(self) -> dict:
+        clusters = len(self._clusters)
+        return {
+            "snippets": self._snippets,
+            "clusters": clusters,
+            "duplicate_clusters": sum(1 for c in self._clusters if c["members"] > 1),
+            "validations": self._validations,
+            "reused": self._reused,
+            # share of snippets that were not the first of their cluster / whose entailment was skipped
+            "dedup_rate": 1.0 - clusters / self._snippets if self._snippets else 0.0,
+            "reuse_rate": self._reused / (self._validations + self._reused) if self._validations + self._reused else 0.0,
+        }
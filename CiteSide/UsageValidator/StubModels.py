@@ -0,0 +1,103 @@
+import re
+import zlib
+from typing import Dict, List
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_NEGATIONS = {"not", "no", "never", "neither", "nor", "without", "cannot", "unlikely"}
+
+
+def tokens(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def judge(argument: str, text: str):
+    """
+    The rule behind the stub entailment models: share of the argument's
+    words that occur in the text, and whether the text negates them.
+    """
+    argument_tokens = set(tokens(argument))
+    text_tokens = set(tokens(text))
+    overlap = len(argument_tokens & text_tokens) / len(argument_tokens) if argument_tokens else 0.0
+    negated = bool(text_tokens & _NEGATIONS) and not (argument_tokens & _NEGATIONS)
+    return overlap, negated
+
+
+class StubSentenceTransformer:
+    """
+    Deterministic stand-in for SentenceTransformer.encode: hashed bag of
+    words embeddings (crc32 of every token picks a dimension and a sign), so
+    texts sharing words are similar. No weights, no torch.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def encode(self, sentences, convert_to_tensor: bool = False, normalize_embeddings: bool = False, **kwargs):
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        embeddings = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokens(text):
+                h = zlib.crc32(token.encode("utf-8"))
+                embeddings[row, h % self.dim] += 1.0 if (h >> 16) & 1 else -1.0
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings[0] if single else embeddings
+
+
+class StubLlama:
+    """
+    Deterministic stand-in for llama_cpp.Llama as used by
+    LlamaContentEntailment.score_labels. The log probability of the label
+    that ends the prompt follows a rule: SUPPORTS grows with the share of
+    ARGUMENT words found in the TEXT, CONTRADICTS with negations in a related
+    TEXT and UNKNOWN with the share of missing words.
+    """
+
+    def __call__(self, prompt: str, **kwargs) -> Dict:
+        label = prompt.rsplit(" ", 1)[-1]
+        overlap, negated = judge(self._section(prompt, "ARGUMENT:"), self._section(prompt, "TEXT:"))
+        if label == "SUPPORTS":
+            logprob = np.log(max(overlap, 1e-3)) - (1.0 if negated else 0.0)
+        elif label == "CONTRADICTS":
+            logprob = np.log(max(overlap, 1e-3)) - (0.0 if negated else 1.5)
+        else:
+            logprob = np.log(max(1.0 - overlap, 1e-3)) - 0.5
+        prompt_tokens = len(prompt.split())
+        return {
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 0, "total_tokens": prompt_tokens},
+            "choices": [{"logprobs": {"token_logprobs": [None, float(logprob)]}}],
+        }
+
+    @staticmethod
+    def _section(prompt: str, header: str) -> str:
+        start = prompt.find(header)
+        if start < 0:
+            return ""
+        start += len(header)
+        end = prompt.find("\n\n", start)
+        return prompt[start:end if end >= 0 else len(prompt)]
+
+
+class StubNli:
+    """
+    Deterministic stand-in for the transformers NLI model of
+    ContentEntailment (ContentEntailment.useBackend(StubNli())), with the
+    same rule as StubLlama mapped to ENTAILMENT / NEUTRAL / CONTRADICTION.
+    """
+
+    LABELS = ("CONTRADICTION", "NEUTRAL", "ENTAILMENT")
+
+    def predict(self, premise: str, hypothesis: str) -> Dict[str, float]:
+        overlap, negated = judge(hypothesis, premise)
+        logits = np.array([
+            3.0 * overlap if negated else -1.0,
+            2.0 * (1.0 - overlap),
+            -1.0 if negated else 3.0 * overlap,
+        ])
+        probs = np.exp(logits - logits.max())
+        probs /= probs.sum()
+        return {label: float(p) for label, p in zip(self.LABELS, probs)}
@@ -1,40 +1,114 @@
 from CiteSide.UsageValidator.LlamaContentEntailment import LlamaContentEntailment
 from CiteSide.UsageValidator.SnippetCollector import SnippetCollector
 from CiteSide.UsageValidator.ReferenceLinker import ReferenceLinker
+from CiteSide.UsageValidator.SnippetDeduplicator import SnippetDeduplicator
 from CiteSide.ReferenceTreeTools.ScoreCombiner import ScoreCombiner
+from CiteSide.Runner.Tracer import NULL_TRACER
 
 class UsageValidator:
-    def __init__(self):
-        self.snippet_collector = SnippetCollector()
-        self.content_entailment = LlamaContentEntailment()
-        self.reference_linker = ReferenceLinker()
+    def __init__(
+        self,
+        snippet_collector: SnippetCollector | None = None,
+        content_entailment: LlamaContentEntailment | None = None,
+        reference_linker: ReferenceLinker | None = None,
+        top_k: int = 5,
+        min_score: float = 0.55,
+        snippet_deduplicator: SnippetDeduplicator | None = None,
+        dedup: bool = False
+    ):
+        # components that are not passed load their models (mpnet, Mistral GGUF)
+        self.snippet_collector = snippet_collector if snippet_collector is not None else SnippetCollector()
+        self.content_entailment = content_entailment if content_entailment is not None else LlamaContentEntailment()
+        self.reference_linker = reference_linker if reference_linker is not None else ReferenceLinker()
+        # with dedup=True (or a snippet_deduplicator) near-duplicate snippets share one entailment call for the whole crawl
+        if snippet_deduplicator is None and dedup:
+            snippet_deduplicator = SnippetDeduplicator()
+        self.snippet_deduplicator = snippet_deduplicator
+        self.top_k = top_k
+        self.min_score = min_score
+        self.tracer = NULL_TRACER
 
-    def run(self, argument: str, paper_text: str, paper_refs, print_logs: bool = False):
+    @classmethod
+    def withStubs(cls, top_k: int = 5, min_score: float = 0.0, dedup: bool = False):
+        """
+        UsageValidator on the deterministic stub models (StubModels): no
+        weights are loaded and every call is fast, for load tests of the
+        crawl. The stub embeddings score lower than mpnet, so by default every
+        top_k snippet is kept.
+        """
+        from CiteSide.UsageValidator.StubModels import StubLlama, StubSentenceTransformer
+        return cls(
+            SnippetCollector(model=StubSentenceTransformer()),
+            LlamaContentEntailment(llm=StubLlama()),
+            top_k=top_k,
+            min_score=min_score,
+            dedup=dedup,
+        )
+
+    def configKey(self) -> tuple:
+        """
+        Hashable fingerprint of everything a reply depends on besides the
+        paper: model backends, retrieval settings and snippet dedup. Cached
+        replies are keyed by it, so a cache shared between validators with
+        a different setup never hands out the other one's results.
+        """
+        collector = self.snippet_collector
+        entailment = self.content_entailment
+        dedup = self.snippet_deduplicator
+        return (
+            type(collector.model).__name__, collector.model_name, collector.chunk_size, collector.stride,
+            type(entailment).__name__, type(entailment.llm).__name__, entailment.model_path,
+            type(self.reference_linker).__name__,
+            self.top_k, self.min_score,
+            None if dedup is None else dedup.configKey(),
+        )
+
+    def setTracer(self, tracer):
+        # the collector and entailment model record their own stages
+        self.tracer = tracer
+        self.snippet_collector.tracer = tracer
+        self.content_entailment.tracer = tracer
+        if self.snippet_deduplicator is not None:
+            self.snippet_deduplicator.tracer = tracer
+
+    def run(self, argument: str, paper_text: str, paper_refs, print_logs: bool = False, sentence_spans=None, citation_spans=None):
         if paper_refs is None:
             return None
 
         #Collect Snippets
-        snippets = self.snippet_collector.match_argument(
-            paper_text,
-            argument,
-            top_k=5,
-            min_score=0.55
-        )
+        with self.tracer.span("snippet_collection"):
+            snippets = self.snippet_collector.match_argument(
+                paper_text,
+                argument,
+                top_k=self.top_k,
+                min_score=self.min_score,
+                sentence_spans=sentence_spans
+            )
+        self.tracer.count("snippets", len(snippets))
 
         if not snippets:
             return None
 
         # Extract Links
-        for s in snippets:
-            linked_ref = self.reference_linker.link_references(s["chunk"], paper_refs)
-            s["linked_ref"] = linked_ref
+        with self.tracer.span("linking", snippets=len(snippets)):
+            for s in snippets:
+                if citation_spans is not None and "offset" in s:
+                    # precomputed citation spans, no surname matching needed
+                    linked_ref = self.reference_linker.link_citations(s["offset"], s["length"], citation_spans, paper_refs)
+                else:
+                    linked_ref = self.reference_linker.link_references(s["chunk"], paper_refs)
+                s["linked_ref"] = linked_ref
 
 
         #snippets = [s for s in snippets if s["linked_ref"] is not None]
 
         #Validate Snippet Usage
         for s in snippets:
-            out = self.content_entailment.validate(argument, s["chunk"])
+            if self.snippet_deduplicator is not None:
+                # one validation per cluster of near-duplicates, fanned out to every snippet of it
+                s["cluster"], out = self.snippet_deduplicator.validate(argument, s["chunk"], lambda text: self._entail(argument, text))
+            else:
+                out = self._entail(argument, s["chunk"])
             s['valid'] = out['label']
             print("argument:", argument, "output:", out)
             entailment_prob = out['confidence']
@@ -58,6 +132,8 @@ class UsageValidator:
                 "paper_id": s["linked_ref"],
                 "crit_index": s["overall_score"]
             })
+            if "cluster" in s:
+                reply[-1]["cluster"] = s["cluster"]
 
         if print_logs:
             for s in snippets:
@@ -65,3 +141,6 @@ class UsageValidator:
 
         return reply
 
+    def _entail(self, argument: str, text: str):
+        with self.tracer.span("entailment"):
+            return self.content_entailment.validate(argument, text)
@@ -7,19 +7,38 @@
 grobid_to_minjson.py
 
 1) Runs GROBID to produce TEI XML files.
-2) Converts each TEI into:
-   - <paper>.json        (paper_id, title, abstract?, fulltext, authors, year, references=[ref_id...])
+2) Converts each TEI (in a process pool, one streaming pass per file) into:
+   - <paper>.json        (paper_id, title, abstract?, fulltext, authors, year, doi?, references=[ref_id...])
+                         with --spans also sentence_spans and citation_spans into fulltext
    - <paper>.refs.json   (references objects with generated stable ref_id)
 3) Rewrites inline citations in fulltext:
    - <ref type="bibr" target="#bX">...</ref> -> "(Author, Year)"
 4) Optionally moves successfully processed PDFs into another directory.
 
+Progress is recorded per document in <output>/manifest.jsonl (input hash,
+GROBID version, output paths, status). Reruns only send new, changed or
+failed PDFs to GROBID and only convert TEI files that are not done yet, so
+an interrupted batch resumes where it stopped. --force redoes everything.
+
+With --corpus the converted papers are additionally streamed as one JSON line
+each into a corpus file in the JsonHandler.loadDataset schema (optionally
+sharded with --shard-size), reference metadata into <corpus>.refs.jsonl.
+Reruns merge the new and changed papers into the existing corpus files and
+record every paper's file and line in the manifest.
+Feed a batch into a loaded corpus with JsonHandler.loadBatch. The reference
+ids only become corpus paper_ids after ReferenceResolver.py ran on the corpus.
+
 Assumes GROBID server is running, e.g.
   docker run --rm --init -p 8070:8070 grobid/grobid:0.8.2-crf
+or --grobid-standin [RecordedTeiFolder] for a local stand-in (GrobidStandIn.py)
+that serves recorded or synthetic TEI. PreprocessorBenchmark.py measures the
+throughput of the stages.
 
 Call file as script (change paths to correct locations): 
   python ApplicationDataPreprocessor.py --input InputFolderOfPDFs --output OutputFolderForJSON --processed-pdf-dir LocationForProcessedPDFs
 
+The TEI->JSON stage uses --workers processes (default: one per core).
+
 """
 
 from __future__ import annotations
@@ -27,13 +46,21 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import os
+import re
 import shutil
+import tempfile
+import time
+import urllib.request
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import xml.etree.ElementTree as ET
 
 from grobid_client.grobid_client import GrobidClient
 
 TEI_NS = {"tei": "http://www.tei-c.org/ns/1.0"}
+TEI_PREFIX = "{" + TEI_NS["tei"] + "}"
 XML_NS = "{http://www.w3.org/XML/1998/namespace}"
 
 
@@ -53,61 +80,27 @@ def stable_id(prefix: str, *parts: str, n: int = 16) -> str:
 
 # ---------- paper-level fields ----------
 
-def pick_title(root: ET.Element) -> str:
-    el = root.find(".//tei:teiHeader/tei:fileDesc/tei:titleStmt/tei:title", TEI_NS)
-    if el is None:
-        el = root.find(".//tei:title", TEI_NS)
-    return all_text(el)
-
-
-def pick_abstract(root: ET.Element) -> str | None:
-    ps = root.findall(".//tei:teiHeader//tei:profileDesc//tei:abstract//tei:p", TEI_NS)
-    text = norm(" ".join(all_text(p) for p in ps))
-    return text or None
-
-
-def pick_authors(root: ET.Element) -> list[str]:
-    authors: list[str] = []
-
-    for a in root.findall(".//tei:teiHeader//tei:sourceDesc//tei:biblStruct//tei:analytic//tei:author", TEI_NS):
-        pers = a.find(".//tei:persName", TEI_NS)
-        if pers is not None:
-            forenames = [all_text(fn) for fn in pers.findall(".//tei:forename", TEI_NS)]
-            surnames = [all_text(sn) for sn in pers.findall(".//tei:surname", TEI_NS)]
-            name = norm(" ".join([p for p in forenames + surnames if p]))
-            if name:
-                authors.append(name)
-                continue
-        t = all_text(a)
-        if t:
-            authors.append(t)
-
-    if authors:
-        return authors
-
-    for a in root.findall(".//tei:teiHeader/tei:fileDesc/tei:titleStmt/tei:author", TEI_NS):
-        t = all_text(a)
-        if t:
-            authors.append(t)
-
-    return authors
-
-
-def pick_year(root: ET.Element) -> str | None:
-    for path in [
-        ".//tei:teiHeader//tei:sourceDesc//tei:biblStruct//tei:monogr//tei:imprint//tei:date",
-        ".//tei:teiHeader//tei:fileDesc//tei:publicationStmt//tei:date",
-    ]:
-        for d in root.findall(path, TEI_NS):
-            when = d.attrib.get("when")
-            if when:
-                y = when.strip()[:4]
-                if y.isdigit():
-                    return y
-            t = all_text(d)
-            for token in t.split():
-                if len(token) >= 4 and token[:4].isdigit():
-                    return token[:4]
+def author_name(a: ET.Element) -> str:
+    pers = a.find(".//tei:persName", TEI_NS)
+    if pers is not None:
+        forenames = [all_text(fn) for fn in pers.findall(".//tei:forename", TEI_NS)]
+        surnames = [all_text(sn) for sn in pers.findall(".//tei:surname", TEI_NS)]
+        name = norm(" ".join([p for p in forenames + surnames if p]))
+        if name:
+            return name
+    return all_text(a)
+
+
+def date_year(d: ET.Element) -> str | None:
+    when = d.attrib.get("when")
+    if when:
+        y = when.strip()[:4]
+        if y.isdigit():
+            return y
+    t = all_text(d)
+    for token in t.split():
+        if len(token) >= 4 and token[:4].isdigit():
+            return token[:4]
     return None
 
 
@@ -150,17 +143,9 @@ def extract_reference_obj(biblstruct: ET.Element) -> tuple[dict, str]:
 
     ref_authors: list[str] = []
     for a in biblstruct.findall(".//tei:analytic//tei:author", TEI_NS):
-        pers = a.find(".//tei:persName", TEI_NS)
-        if pers is not None:
-            forenames = [all_text(fn) for fn in pers.findall(".//tei:forename", TEI_NS)]
-            surnames = [all_text(sn) for sn in pers.findall(".//tei:surname", TEI_NS)]
-            name = norm(" ".join([p for p in forenames + surnames if p]))
-            if name:
-                ref_authors.append(name)
-                continue
-        t = all_text(a)
-        if t:
-            ref_authors.append(t)
+        name = author_name(a)
+        if name:
+            ref_authors.append(name)
 
     year = None
     for d in biblstruct.findall(".//tei:date", TEI_NS):
@@ -202,21 +187,17 @@ def extract_reference_obj(biblstruct: ET.Element) -> tuple[dict, str]:
     return out, tei_key
 
 
-def extract_references(root: ET.Element) -> tuple[list[dict], dict[str, dict]]:
+def collect_references(extracted: list[tuple[dict, str]]) -> tuple[list[dict], dict[str, dict]]:
     """
+    Takes the extract_reference_obj results of all biblStructs in document order.
     Returns (refs_list, tei_key_to_refmeta)
     tei_key_to_refmeta maps 'b1' -> {'ref_id':..., 'authors':..., 'year':...}
     """
-    biblstructs = root.findall(".//tei:text//tei:back//tei:listBibl//tei:biblStruct", TEI_NS)
-    if not biblstructs:
-        biblstructs = root.findall(".//tei:teiHeader//tei:listBibl//tei:biblStruct", TEI_NS)
-
     refs: list[dict] = []
     seen_ref_ids: set[str] = set()
     tei_key_to_refmeta: dict[str, dict] = {}
 
-    for bs in biblstructs:
-        ref, tei_key = extract_reference_obj(bs)
+    for ref, tei_key in extracted:
         rid = ref["ref_id"]
         if rid in seen_ref_ids:
             # still map tei_key if present
@@ -233,15 +214,14 @@ def extract_references(root: ET.Element) -> tuple[list[dict], dict[str, dict]]:
 
 # ---------- inline citation rewriting ----------
 
-def render_with_citation_rewrite(el: ET.Element | None, tei_key_to_refmeta: dict[str, dict]) -> str:
+def citation_segments(el: ET.Element) -> list:
     """
-    Render element text recursively, replacing <ref type="bibr" target="#bX">...</ref>
-    with "(Author, Year)" using reference metadata.
+    Element text as nested segments: strings, ("cite", tei_key) for
+    <ref type="bibr" target="#bX"> and one sub-list per other child element.
+    The body precedes the bibliography in TEI, so paragraphs are kept like
+    this until the references are known.
     """
-    if el is None:
-        return ""
-
-    parts: list[str] = []
+    parts: list = []
     if el.text:
         parts.append(el.text)
 
@@ -249,41 +229,253 @@ def render_with_citation_rewrite(el: ET.Element | None, tei_key_to_refmeta: dict
         tag_local = child.tag.split("}")[-1]  # handles namespaces
         if tag_local == "ref" and child.attrib.get("type") == "bibr":
             target = child.attrib.get("target", "")
-            tei_key = target[1:] if target.startswith("#") else target
-            meta = tei_key_to_refmeta.get(tei_key)
-            if meta:
-                cite = _format_author_year(meta.get("authors"), meta.get("year"))
-            else:
-                cite = "(Anon, n.d.)"
-            parts.append(cite)
+            parts.append(("cite", target[1:] if target.startswith("#") else target))
         else:
-            parts.append(render_with_citation_rewrite(child, tei_key_to_refmeta))
+            parts.append(citation_segments(child))
 
         if child.tail:
             parts.append(child.tail)
 
-    return norm("".join(parts))
+    return parts
 
 
-def pick_fulltext_with_citations(root: ET.Element, tei_key_to_refmeta: dict[str, dict]) -> str:
-    ps = root.findall(".//tei:text/tei:body//tei:p", TEI_NS)
-    return norm(" ".join(render_with_citation_rewrite(p, tei_key_to_refmeta) for p in ps))
+def resolve_segments(parts: list, tei_key_to_refmeta: dict[str, dict]) -> str:
+    out: list[str] = []
+    for part in parts:
+        if isinstance(part, str):
+            out.append(part)
+        elif isinstance(part, tuple):
+            meta = tei_key_to_refmeta.get(part[1])
+            if meta:
+                out.append(_format_author_year(meta.get("authors"), meta.get("year")))
+            else:
+                out.append("(Anon, n.d.)")
+        else:
+            out.append(resolve_segments(part, tei_key_to_refmeta))
+    return norm("".join(out))
 
 
-# ---------- main conversion ----------
+def render_with_citation_rewrite(el: ET.Element | None, tei_key_to_refmeta: dict[str, dict]) -> str:
+    """
+    Render element text recursively, replacing <ref type="bibr" target="#bX">...</ref>
+    with "(Author, Year)" using reference metadata.
+    """
+    if el is None:
+        return ""
+    return resolve_segments(citation_segments(el), tei_key_to_refmeta)
+
 
-def tei_to_outputs(tei_path: Path) -> tuple[dict, list[dict]]:
-    tree = ET.parse(tei_path)
-    root = tree.getroot()
+# ---------- sentence and citation spans ----------
 
-    title = pick_title(root)
-    abstract = pick_abstract(root)
-    authors_list = pick_authors(root)
-    authors = " and ".join(authors_list)
-    year = pick_year(root)
+def norm_with_spans(raw: str, spans: list[tuple[int, int, str]]) -> tuple[str, list[tuple[int, int, str]]]:
+    """
+    norm(raw) together with `spans` (offset, length, ref_id) moved from raw
+    to normalized offsets. Spans start and end on non-whitespace characters.
+    """
+    tokens = [(m.start(), m.end()) for m in re.finditer(r"\S+", raw)]
+    starts = [t[0] for t in tokens]
+    positions = []
+    pos = 0
+    for start, end in tokens:
+        positions.append(pos)
+        pos += end - start + 1
+
+    def moved(i: int) -> int:
+        t = bisect_right(starts, i) - 1
+        return positions[t] + i - tokens[t][0]
+
+    text = " ".join(raw[start:end] for start, end in tokens)
+    out = []
+    for offset, length, ref_id in spans:
+        begin = moved(offset)
+        out.append((begin, moved(offset + length - 1) + 1 - begin, ref_id))
+    return text, out
+
+
+def resolve_segments_with_spans(parts: list, tei_key_to_refmeta: dict[str, dict]) -> tuple[str, list[tuple[int, int, str]]]:
+    """
+    Same text as resolve_segments plus the (offset, length, ref_id) span of
+    every rewritten citation whose reference is known.
+    """
+    out: list[str] = []
+    spans: list[tuple[int, int, str]] = []
+    pos = 0
+    for part in parts:
+        if isinstance(part, str):
+            text = part
+        elif isinstance(part, tuple):
+            meta = tei_key_to_refmeta.get(part[1])
+            if meta:
+                text = _format_author_year(meta.get("authors"), meta.get("year"))
+                spans.append((pos, len(text), meta["ref_id"]))
+            else:
+                text = "(Anon, n.d.)"
+        else:
+            text, inner = resolve_segments_with_spans(part, tei_key_to_refmeta)
+            spans.extend((pos + offset, length, ref_id) for offset, length, ref_id in inner)
+        out.append(text)
+        pos += len(text)
+    return norm_with_spans("".join(out), spans)
+
+
+_sentence_tokenizer = None
+
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """
+    (offset, length) of the sentences of `text`, split like
+    nltk.sent_tokenize does at query time in SnippetCollector.
+    """
+    global _sentence_tokenizer
+    if _sentence_tokenizer is None:
+        import nltk
+        nltk.download("punkt_tab", quiet=True)
+        from nltk.tokenize import PunktTokenizer
+        _sentence_tokenizer = PunktTokenizer("english")
+    return [(start, end - start) for start, end in _sentence_tokenizer.span_tokenize(text)]
 
-    refs, tei_key_to_refmeta = extract_references(root)
-    fulltext = pick_fulltext_with_citations(root, tei_key_to_refmeta)
+
+# ---------- streaming parse ----------
+
+def _under(stack: list[str], *names: str) -> bool:
+    # the open ancestors contain `names` in this order (ElementPath ".//a//b" semantics)
+    i = 0
+    for tag in stack:
+        if tag == names[i]:
+            i += 1
+            if i == len(names):
+                return True
+    return False
+
+
+# elements that are cleared once they ended (outside of body paragraphs)
+_CLEARED = {"teiHeader", "div", "figure", "note", "listBibl", "back", "body"}
+
+
+def parse_tei(tei_path: Path) -> dict:
+    """
+    Extracts all fields of a TEI document in one iterparse pass. Consumed
+    elements are cleared right away, so memory is bounded by the largest
+    paragraph or bibliography entry instead of the whole document.
+    """
+    stack: list[str] = []
+    title = None
+    first_title: ET.Element | None = None
+    first_title_text = ""
+    abstract_ps: list[str] = []
+    analytic_authors: list[str] = []
+    title_authors: list[str] = []
+    imprint_years: list[str | None] = []
+    publication_years: list[str | None] = []
+    doi = None
+    back_refs: list[tuple[dict, str]] = []
+    header_refs: list[tuple[dict, str]] = []
+    body_ps: list[list | None] = []
+    body_p_slots: dict[ET.Element, int] = {}
+    # open ".//tei:text/tei:body" elements and open paragraphs inside them
+    bodies = 0
+    body_p_depth = 0
+    local_tags: dict[str, str] = {}
+
+    for event, elem in ET.iterparse(tei_path, events=("start", "end")):
+        tag = local_tags.get(elem.tag)
+        if tag is None:
+            tag = local_tags[elem.tag] = elem.tag[len(TEI_PREFIX):] if elem.tag.startswith(TEI_PREFIX) else ""
+        if event == "start":
+            if tag == "title" and first_title is None:
+                first_title = elem
+            elif tag == "body" and stack and stack[-1] == "text":
+                bodies += 1
+            elif tag == "p" and bodies:
+                body_p_slots[elem] = len(body_ps)
+                body_ps.append(None)
+                body_p_depth += 1
+            stack.append(tag)
+            continue
+
+        stack.pop()
+        if tag == "body" and stack and stack[-1] == "text":
+            bodies -= 1
+        elif tag == "title":
+            if elem is first_title:
+                first_title_text = all_text(elem)
+            if title is None and stack[-3:] == ["teiHeader", "fileDesc", "titleStmt"]:
+                title = all_text(elem)
+        elif tag == "p":
+            if elem in body_p_slots:
+                body_ps[body_p_slots.pop(elem)] = citation_segments(elem)
+                body_p_depth -= 1
+                # nested paragraphs are rendered again as part of their parent
+                if body_p_depth == 0:
+                    elem.clear()
+            elif _under(stack, "teiHeader", "profileDesc", "abstract"):
+                abstract_ps.append(all_text(elem))
+        elif tag == "author":
+            if _under(stack, "teiHeader", "sourceDesc", "biblStruct", "analytic"):
+                name = author_name(elem)
+                if name:
+                    analytic_authors.append(name)
+            elif stack[-3:] == ["teiHeader", "fileDesc", "titleStmt"]:
+                name = all_text(elem)
+                if name:
+                    title_authors.append(name)
+        elif tag == "date":
+            if _under(stack, "teiHeader", "sourceDesc", "biblStruct", "monogr", "imprint"):
+                imprint_years.append(date_year(elem))
+            if _under(stack, "teiHeader", "fileDesc", "publicationStmt"):
+                publication_years.append(date_year(elem))
+        elif tag == "idno":
+            if doi is None and elem.attrib.get("type", "").lower() == "doi" and _under(stack, "teiHeader", "sourceDesc", "biblStruct"):
+                doi = all_text(elem) or None
+        elif tag == "biblStruct":
+            if _under(stack, "text", "back", "listBibl"):
+                back_refs.append(extract_reference_obj(elem))
+                elem.clear()
+            elif _under(stack, "teiHeader", "listBibl"):
+                header_refs.append(extract_reference_obj(elem))
+        if tag in _CLEARED and body_p_depth == 0:
+            elem.clear()
+
+    years = [y for y in imprint_years + publication_years if y]
+    return {
+        "title": title if title is not None else first_title_text,
+        "abstract": norm(" ".join(abstract_ps)) or None,
+        "authors": analytic_authors or title_authors,
+        "year": years[0] if years else None,
+        "doi": doi,
+        "references": back_refs or header_refs,
+        "body": body_ps,
+    }
+
+
+# ---------- main conversion ----------
+
+def tei_to_outputs(tei_path: Path, spans: bool = False) -> tuple[dict, list[dict]]:
+    """
+    With spans the paper additionally gets "sentence_spans" [[offset, length]]
+    and "citation_spans" [[offset, length, ref_id]] into full_text, so
+    SnippetCollector and ReferenceLinker neither tokenize nor regex scan.
+    """
+    fields = parse_tei(tei_path)
+
+    title = fields["title"]
+    abstract = fields["abstract"]
+    authors = " and ".join(fields["authors"])
+    year = fields["year"]
+
+    refs, tei_key_to_refmeta = collect_references(fields["references"])
+    if spans:
+        fulltext, citations = "", []
+        for p in fields["body"]:
+            text, inner = resolve_segments_with_spans(p, tei_key_to_refmeta)
+            if not text:
+                continue
+            if fulltext:
+                fulltext += " "
+            citations.extend([len(fulltext) + offset, length, ref_id] for offset, length, ref_id in inner)
+            fulltext += text
+    else:
+        fulltext = norm(" ".join(resolve_segments(p, tei_key_to_refmeta) for p in fields["body"]))
 
     paper_id = tei_path.name.replace(".tei.xml", "")
 
@@ -298,6 +490,11 @@ def tei_to_outputs(tei_path: Path) -> tuple[dict, list[dict]]:
         paper["abstract"] = abstract
     if year:
         paper["year"] = year
+    if fields["doi"]:
+        paper["doi"] = fields["doi"]
+    if spans:
+        paper["sentence_spans"] = [list(span) for span in sentence_spans(fulltext)]
+        paper["citation_spans"] = citations
 
     return paper, refs
 
@@ -313,13 +510,330 @@ def pdf_for_tei(tei_path: Path, pdf_candidates: dict[str, Path]) -> Path | None:
     Best-effort mapping:
     <name>.grobid.tei.xml  -> <name>.pdf (same stem before '.grobid')
     """
-    name = tei_path.name
-    if name.endswith(".grobid.tei.xml"):
-        base = name.replace(".grobid.tei.xml", "")
-        return pdf_candidates.get(base.lower())
-    # fallback: try stripping ".tei.xml"
-    base2 = name.replace(".tei.xml", "")
-    return pdf_candidates.get(base2.lower())
+    return pdf_candidates.get(doc_key(tei_path))
+
+
+def doc_key(path: Path) -> str:
+    # manifest key shared by <name>.pdf, <name>.grobid.tei.xml and <name>.tei.xml
+    name = path.name
+    for suffix in (".grobid.tei.xml", ".tei.xml", ".pdf"):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)].lower()
+    return path.stem.lower()
+
+
+def tei_for_pdf(pdf: Path, out: Path) -> Path | None:
+    for name in (f"{pdf.stem}.grobid.tei.xml", f"{pdf.stem}.tei.xml"):
+        if (out / name).exists():
+            return out / name
+    return None
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def grobid_version(url: str) -> str:
+    try:
+        with urllib.request.urlopen(f"{url.rstrip('/')}/api/version", timeout=10) as resp:
+            return resp.read().decode("utf-8").strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def write_atomic(path: Path, text: str) -> None:
+    # readers (and reruns after a crash) never see a half-written file
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+# ---------- manifest ----------
+
+# document states in the manifest
+GROBID_FAILED = "grobid_failed"
+TEI_DONE = "tei_done"
+CONVERT_FAILED = "convert_failed"
+DONE = "done"
+
+
+class Manifest:
+    """
+    Processing state per document as JSON lines: every update appends one
+    complete, fsynced line and the last line of a document wins. A torn
+    trailing line of an interrupted run is ignored. On open the file is
+    compacted to one line per document (temp file + os.replace).
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.records: dict[str, dict] = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[record["doc"]] = record
+        write_atomic(path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in self.records.values()))
+        self._file = open(path, "a", encoding="utf-8")
+
+    def get(self, doc: str) -> dict | None:
+        return self.records.get(doc)
+
+    def update(self, doc: str, **fields) -> dict:
+        record = {**self.records.get(doc, {"doc": doc}), **fields, "updated": time.time()}
+        self.records[doc] = record
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return record
+
+    def close(self) -> None:
+        self._file.close()
+
+
+# ---------- corpus output ----------
+
+class CorpusWriter:
+    """
+    Streams converted papers as JSON lines in the JsonHandler.loadDataset
+    schema into <corpus>.jsonl, or with shard_size into <corpus>-00000.jsonl,
+    <corpus>-00001.jsonl, ... of shard_size papers each. The reference
+    objects of every paper go as {"paper_id", "refs"} lines into the
+    companion <shard>.refs.jsonl. Files are written as .part and renamed
+    once complete, so loaders never pick up a partial shard.
+
+    Reruns only convert new and changed documents, so the corpus of earlier
+    runs is kept: new shards continue the numbering of the existing ones
+    (without sharding the existing lines are copied ahead of the new ones)
+    and the old line of every paper written again is dropped on close, so
+    no paper_id appears twice. `locations` maps every paper_id in a written
+    or rewritten file to its (file, line) once closed.
+    """
+
+    def __init__(self, path: Path, shard_size: int | None = None):
+        self.path = path
+        self.shard_size = shard_size
+        self.stem = path.name[:-len(".jsonl")] if path.name.endswith(".jsonl") else path.name
+        self.shards: list[Path] = []
+        self.locations: dict[str, tuple[Path, int]] = {}
+        self._existing = self._existing_shards()
+        self._next = int(self._existing[-1].name[len(self.stem) + 1:-len(".jsonl")]) + 1 if shard_size and self._existing else 0
+        self._written: list[str] = []
+        self._count = 0
+        self._papers = None
+        self._refs = None
+
+    def write(self, paper: dict, refs: list[dict]) -> Path:
+        if self._papers is None or (self.shard_size and self._count % self.shard_size == 0):
+            self._open()
+        self._papers.write(json.dumps(paper, ensure_ascii=False) + "\n")
+        self._refs.write(json.dumps({"paper_id": paper["paper_id"], "refs": refs}, ensure_ascii=False) + "\n")
+        self._written.append(paper["paper_id"])
+        self._count += 1
+        return self.shards[-1]
+
+    def close(self) -> None:
+        self._finish()
+        if not self._written:
+            return
+        written = set(self._written)
+        # papers written again (changed documents) leave their old shard
+        for shard in self._existing:
+            if shard in self.shards:
+                continue
+            kept = rewrite_without(shard, written)
+            rewrite_without(self._refs_path(shard), written)
+            if kept is None:
+                continue
+            if not kept:
+                shard.unlink()
+                self._refs_path(shard).unlink(missing_ok=True)
+            self._locate(shard, kept)
+        position = 0
+        for shard in self.shards:
+            ids = self._written[position:position + self.shard_size] if self.shard_size else self._written
+            position += len(ids)
+            if not self.shard_size and shard.exists():
+                # unsharded: the lines of earlier runs first, then this run's papers
+                kept = merge_lines(shard, Path(f"{shard}.part"), written)
+                merge_lines(self._refs_path(shard), Path(f"{self._refs_path(shard)}.part"), written)
+                ids = kept + ids
+            else:
+                os.replace(f"{shard}.part", shard)
+                os.replace(f"{self._refs_path(shard)}.part", self._refs_path(shard))
+            self._locate(shard, ids)
+        self._existing = self._existing_shards()
+        self._written = []
+
+    def _finish(self) -> None:
+        if self._papers is None:
+            return
+        for f in (self._papers, self._refs):
+            f.close()
+        self._papers = self._refs = None
+
+    def _open(self) -> None:
+        self._finish()
+        stem = f"{self.stem}-{self._next + len(self.shards):05d}" if self.shard_size else self.stem
+        shard = self.path.with_name(f"{stem}.jsonl")
+        self.shards.append(shard)
+        self._papers = open(f"{shard}.part", "w", encoding="utf-8")
+        self._refs = open(f"{self._refs_path(shard)}.part", "w", encoding="utf-8")
+
+    def _refs_path(self, shard: Path) -> Path:
+        return shard.with_name(shard.name[:-len(".jsonl")] + ".refs.jsonl")
+
+    def _existing_shards(self) -> list[Path]:
+        if not self.shard_size:
+            return [self.path] if self.path.exists() else []
+        pattern = re.compile(re.escape(self.stem) + r"-\d{5}\.jsonl")
+        return sorted(p for p in self.path.parent.glob(f"{self.stem}-*.jsonl") if pattern.fullmatch(p.name))
+
+    def _locate(self, shard: Path, ids: list[str]) -> None:
+        for line, paper_id in enumerate(ids):
+            self.locations[paper_id] = (shard, line)
+
+
+def _line_id(line: str) -> str | None:
+    try:
+        return json.loads(line).get("paper_id")
+    except json.JSONDecodeError:
+        return None
+
+
+def rewrite_without(path: Path, paper_ids: set[str]) -> list[str] | None:
+    """
+    Atomically drops the lines of `paper_ids` from a corpus or refs JSONL.
+    Returns the paper_ids of the kept lines, None if nothing was dropped
+    (the file is left untouched then).
+    """
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    ids = [_line_id(line) for line in lines]
+    if not paper_ids.intersection(ids):
+        return None
+    write_atomic(path, "".join(line for line, paper_id in zip(lines, ids) if paper_id not in paper_ids))
+    return [paper_id for paper_id in ids if paper_id not in paper_ids]
+
+
+def merge_lines(path: Path, part: Path, paper_ids: set[str]) -> list[str]:
+    """
+    Replaces `path` with its lines except those of `paper_ids`, followed by
+    the lines of `part`. Returns the paper_ids of the kept old lines.
+    """
+    kept = []
+    merged = path.with_name(path.name + ".merge")
+    with open(merged, "w", encoding="utf-8") as out:
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    paper_id = _line_id(line) if line.strip() else None
+                    if paper_id is None or paper_id in paper_ids:
+                        continue
+                    out.write(line if line.endswith("\n") else line + "\n")
+                    kept.append(paper_id)
+        with open(part, "r", encoding="utf-8") as f:
+            shutil.copyfileobj(f, out)
+    os.replace(merged, path)
+    part.unlink()
+    return kept
+
+
+def needs_grobid(record: dict | None, pdf_sha256: str, version: str) -> bool:
+    if record is None or record.get("pdf_sha256") != pdf_sha256 or record.get("status") == GROBID_FAILED:
+        return True
+    # the TEI must come from this very PDF content (manifests of older runs only have pdf_sha256)
+    if record.get("tei_pdf_sha256", record.get("pdf_sha256")) != pdf_sha256:
+        return True
+    if version != "unknown" and record.get("grobid_version") not in (None, "unknown", version):
+        return True
+    tei = record.get("tei")
+    return not tei or not Path(tei).exists()
+
+
+def needs_conversion(record: dict | None, tei: Path, spans: bool = False) -> bool:
+    if record is None or record.get("status") != DONE or record.get("tei") != str(tei):
+        return True
+    if record.get("spans", False) != spans:
+        return True
+    stat = tei.stat()
+    if (record.get("tei_size"), record.get("tei_mtime_ns")) != (stat.st_size, stat.st_mtime_ns):
+        return True
+    return not all(Path(p).exists() for p in record.get("outputs", []))
+
+
+def convert_tei(tei: Path, paper_files: bool = True, return_paper: bool = False, spans: bool = False) -> tuple[str, float, str, list[str], tuple | None]:
+    """
+    Converts one TEI file and atomically writes <paper>.json and
+    <paper>.refs.json (unless paper_files is False). Runs in the worker
+    processes; returns (status, seconds, message, output paths, result)
+    with status "ok" or "error" and result (paper, refs) if return_paper.
+    """
+    start = time.perf_counter()
+    paper_json = tei.with_suffix("").with_suffix(".json")
+    refs_json = tei.with_suffix("").with_suffix(".refs.json")
+    try:
+        paper, refs = tei_to_outputs(tei, spans)
+        if paper_files:
+            write_atomic(paper_json, json.dumps(paper, ensure_ascii=False, indent=2))
+            write_atomic(refs_json, json.dumps(refs, ensure_ascii=False, indent=2))
+    except Exception as e:
+        return "error", time.perf_counter() - start, str(e), [], None
+    outputs = [str(paper_json), str(refs_json)] if paper_files else []
+    return "ok", time.perf_counter() - start, f"{len(refs)} refs", outputs, (paper, refs) if return_paper else None
+
+
+def run_grobid(client, pdfs: list[Path], out: Path, args, manifest: Manifest, hashes: dict[Path, str], version: str) -> None:
+    """
+    Sends only `pdfs` to GROBID: they are linked into a temporary staging
+    directory in chunks of --grobid-batch, and the manifest is updated after
+    every chunk, so an interruption loses at most one chunk. Earlier TEI
+    files of the chunk are removed first, so every TEI found afterwards was
+    made from the current PDF (whatever its mtime) and is recorded with the
+    PDF hash as tei_pdf_sha256.
+    """
+    for i in range(0, len(pdfs), args.grobid_batch):
+        chunk = pdfs[i:i + args.grobid_batch]
+        start = time.perf_counter()
+        for pdf in chunk:
+            stale = tei_for_pdf(pdf, out)
+            while stale is not None:
+                stale.unlink()
+                stale = tei_for_pdf(pdf, out)
+        # staged as hard links next to the output: GROBID clients resolve symlinks and
+        # then reject files outside input_path; across file systems the PDFs are copied
+        with tempfile.TemporaryDirectory(prefix="grobid_stage_", dir=out) as stage:
+            for pdf in chunk:
+                try:
+                    os.link(pdf, Path(stage) / pdf.name)
+                except OSError:
+                    shutil.copy2(pdf, Path(stage) / pdf.name)
+            client.process(
+                "processFulltextDocument",
+                input_path=stage,
+                output=str(out),
+                n=args.n,
+                json_output=False,
+                force=True,
+                verbose=False,
+            )
+        for pdf in chunk:
+            tei = tei_for_pdf(pdf, out)
+            if tei is not None:
+                manifest.update(doc_key(pdf), pdf=str(pdf), pdf_sha256=hashes[pdf], grobid_version=version, tei=str(tei),
+                                tei_pdf_sha256=hashes[pdf], status=TEI_DONE, error=None)
+            else:
+                manifest.update(doc_key(pdf), pdf=str(pdf), pdf_sha256=hashes[pdf], grobid_version=version, status=GROBID_FAILED, error="no TEI produced")
+        print(f"[GROBID] {min(i + args.grobid_batch, len(pdfs))}/{len(pdfs)} PDF(s), chunk took {time.perf_counter() - start:.2f}s")
 
 
 def main() -> None:
@@ -328,9 +842,20 @@ def main() -> None:
     ap.add_argument("--output", required=True, help="Output directory")
     ap.add_argument("--grobid-url", default="http://localhost:8070")
     ap.add_argument("--n", type=int, default=2)
-    ap.add_argument("--force", action="store_true", help="Overwrite existing TEI/JSON")
+    ap.add_argument("--force", action="store_true", help="Reprocess everything, ignoring the manifest")
     ap.add_argument("--processed-pdf-dir", default=None, help="Move successfully processed PDFs here")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for the TEI->JSON conversion")
+    ap.add_argument("--grobid-batch", type=int, default=50, help="PDFs per GROBID call, the manifest is updated after each")
+    ap.add_argument("--manifest", default=None, help="Manifest file (default: <output>/manifest.jsonl)")
+    ap.add_argument("--corpus", default=None, help="Stream converted papers into this corpus JSONL (JsonHandler schema)")
+    ap.add_argument("--shard-size", type=int, default=None, help="Split the corpus into shards of N papers")
+    ap.add_argument("--no-paper-files", action="store_true", help="With --corpus, skip the per-paper .json/.refs.json files")
+    ap.add_argument("--spans", action="store_true", help="Add sentence and citation spans to every paper")
+    ap.add_argument("--grobid-standin", nargs="?", const="", default=None, metavar="TEI_DIR",
+                    help="Run against a local GROBID stand-in (GrobidStandIn.py) serving TEI from TEI_DIR or synthetic TEI")
     args = ap.parse_args()
+    if args.no_paper_files and not args.corpus:
+        ap.error("--no-paper-files requires --corpus")
 
     inp = Path(args.input).expanduser().resolve()
     out = Path(args.output).expanduser().resolve()
@@ -340,58 +865,106 @@ def main() -> None:
     if processed_dir:
         processed_dir.mkdir(parents=True, exist_ok=True)
 
+    manifest = Manifest(Path(args.manifest).expanduser().resolve() if args.manifest else out / "manifest.jsonl")
+    corpus = CorpusWriter(Path(args.corpus).expanduser().resolve(), args.shard_size) if args.corpus else None
+    if corpus:
+        corpus.path.parent.mkdir(parents=True, exist_ok=True)
+
     # Map input PDFs by basename for moving later
     pdfs = iter_pdfs(inp)
     pdf_candidates = {p.stem.lower(): p for p in pdfs}
 
-    client = GrobidClient(grobid_server=args.grobid_url)
-
-    # 1) Run GROBID -> TEI XML
-    client.process(
-        "processFulltextDocument",
-        input_path=str(inp),
-        output=str(out),
-        n=args.n,
-        json_output=False,
-        force=args.force,
-        verbose=False,
-    )
+    standin = None
+    if args.grobid_standin is not None:
+        try:
+            from InputDataConstruction.Datasets.GrobidStandIn import start_standin
+        except ImportError:  # called as a script from this directory
+            from GrobidStandIn import start_standin
+        standin = start_standin(args.grobid_standin or None)
+        args.grobid_url = standin.url
+        print(f"Using GROBID stand-in at {standin.url}")
 
-    # 2) Convert TEI -> JSON + refs JSON
-    tei_files = sorted(out.glob("*.tei.xml"))
+    client = GrobidClient(grobid_server=args.grobid_url)
+    version = grobid_version(args.grobid_url)
+
+    # 1) Run GROBID -> TEI XML, only for new, changed or failed PDFs
+    hashes = {pdf: file_sha256(pdf) for pdf in pdfs}
+    todo = []
+    for pdf in pdfs:
+        record = manifest.get(doc_key(pdf))
+        if not args.force and not needs_grobid(record, hashes[pdf], version):
+            continue
+        # a TEI without manifest record (interrupted run) can not be tied to this PDF content, it is redone
+        todo.append(pdf)
+    print(f"GROBID: {len(todo)} of {len(pdfs)} PDF(s) need processing (GROBID {version})")
+    if todo:
+        run_grobid(client, todo, out, args, manifest, hashes, version)
+    if standin:
+        standin.stop()
+
+    # 2) Convert TEI -> JSON + refs JSON, only TEI files that are not done yet
+    tei_files = [tei for tei in sorted(out.glob("*.tei.xml")) if args.force or needs_conversion(manifest.get(doc_key(tei)), tei, args.spans)]
     print(f"Found {len(tei_files)} TEI file(s) to convert")
 
     ok, err = 0, 0
     moved = 0
-
-    for tei in tei_files:
-        try:
-            paper, refs = tei_to_outputs(tei)
-
-            paper_json = tei.with_suffix("").with_suffix(".json")
-            refs_json = tei.with_suffix("").with_suffix(".refs.json")
-
-            if (not args.force) and (paper_json.exists() or refs_json.exists()):
-                print(f"[SKIP] {tei.name} (json exists). Use --force to overwrite.")
-                continue
-
-            paper_json.write_text(json.dumps(paper, ensure_ascii=False, indent=2), encoding="utf-8")
-            refs_json.write_text(json.dumps(refs, ensure_ascii=False, indent=2), encoding="utf-8")
-            ok += 1
-
-            # 3) Move processed PDF if configured
-            if processed_dir:
-                pdf_path = pdf_for_tei(tei, pdf_candidates)
-                if pdf_path and pdf_path.exists():
-                    dst = processed_dir / pdf_path.name
-                    shutil.move(str(pdf_path), str(dst))
-                    moved += 1
-
-        except Exception as e:
+    pending: dict[str, dict] = {}
+    start = time.perf_counter()
+    workers = max(1, min(args.workers, len(tei_files)))
+
+    def finished(tei: Path, status: str, seconds: float, message: str, outputs: list[str], result: tuple | None):
+        nonlocal ok, err, moved
+        stat = tei.stat()
+        tei_state = {"tei": str(tei), "tei_size": stat.st_size, "tei_mtime_ns": stat.st_mtime_ns}
+        if status == "error":
             err += 1
-            print(f"[ERROR] TEI->JSON failed for {tei.name}: {e}")
-
+            manifest.update(doc_key(tei), **tei_state, status=CONVERT_FAILED, error=message)
+            print(f"[ERROR] TEI->JSON failed for {tei.name} after {seconds:.3f}s: {message}")
+            return
+        ok += 1
+        if corpus:
+            # DONE once the corpus file is complete, an interrupted run converts the document again
+            corpus.write(*result)
+            pending[doc_key(tei)] = dict(tei_state, outputs=outputs)
+        else:
+            manifest.update(doc_key(tei), **tei_state, outputs=outputs, spans=args.spans, status=DONE, error=None)
+        print(f"[OK] {tei.name} in {seconds:.3f}s ({message})")
+
+        # 3) Move processed PDF if configured
+        if processed_dir:
+            pdf_path = pdf_for_tei(tei, pdf_candidates)
+            if pdf_path and pdf_path.exists():
+                dst = processed_dir / pdf_path.name
+                shutil.move(str(pdf_path), str(dst))
+                manifest.update(doc_key(tei), pdf=str(dst))
+                moved += 1
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(convert_tei, tei, not args.no_paper_files, corpus is not None, args.spans): tei for tei in tei_files}
+            for future in as_completed(futures):
+                finished(futures[future], *future.result())
+    else:
+        for tei in tei_files:
+            finished(tei, *convert_tei(tei, not args.no_paper_files, corpus is not None, args.spans))
+    if corpus:
+        corpus.close()
+        for paper_id, (shard, line) in corpus.locations.items():
+            doc = doc_key(Path(f"{paper_id}.tei.xml"))
+            if doc in pending:
+                state = pending.pop(doc)
+                state["outputs"] = state["outputs"] + [str(shard)]
+                manifest.update(doc, **state, corpus=str(shard), corpus_line=line, spans=args.spans, status=DONE, error=None)
+            elif (record := manifest.get(doc)) and (record.get("corpus"), record.get("corpus_line")) != (str(shard), line):
+                # kept from an earlier run, but moved up in its file
+                manifest.update(doc, corpus=str(shard), corpus_line=line)
+        print(f"[CORPUS] {ok} paper(s) in {len(corpus.shards)} new file(s): {', '.join(str(p) for p in corpus.shards)}")
+    manifest.close()
+
+    elapsed = time.perf_counter() - start
+    rate = ok / elapsed if elapsed > 0 else 0.0
     print(f"[DONE] Converted OK={ok}, ERR={err}. PDFs moved={moved}. Output dir: {out}")
+    print(f"[TIME] {elapsed:.2f}s with {workers} worker(s), {rate:.1f} docs/s")
 
 
 if __name__ == "__main__":
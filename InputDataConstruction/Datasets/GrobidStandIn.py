@@ -0,0 +1,244 @@
+"""
+GrobidStandIn.py
+
+Local stand-in for a GROBID server, so ApplicationDataPreprocessor can be run,
+benchmarked and regression tested without docker/GROBID. It serves the part of
+the GROBID HTTP API the preprocessor and grobid_client use:
+  GET  /api/isalive
+  GET  /api/version
+  POST /api/processFulltextDocument   (multipart form, PDF in field "input")
+
+For every PDF it returns
+1) a pre-recorded TEI from --tei-dir (<stem>.grobid.tei.xml or <stem>.tei.xml,
+   e.g. the output directory of an earlier run against a real GROBID), or
+2) a synthetic TEI generated deterministically from the PDF bytes, with the
+   structure GROBID produces (header, abstract, body with <ref type="bibr">
+   citations, bibliography with DOIs, authors and dates).
+--latency adds a fixed delay per document to emulate GROBID's processing cost.
+
+Call file as script:
+  python GrobidStandIn.py --port 8070 --tei-dir RecordedTeiFolder
+and point the preprocessor at it with --grobid-url http://localhost:8070, or
+let the preprocessor start one itself with --grobid-standin [RecordedTeiFolder].
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+VERSION = "0.8.2-standin"
+TEI_NS = "http://www.tei-c.org/ns/1.0"
+
+_WORDS = (
+    "virus incubation period days patients cohort analysis data model estimate mean "
+    "transmission infection clinical symptoms onset study cases median interval "
+    "respiratory outbreak population exposure risk severe hospital reported"
+).split()
+_FORENAMES = ["Ann", "Bo", "Chen", "Dee", "Emil", "Fatima", "Goran", "Hana", "Ivo", "Julia"]
+_SURNAMES = ["Lai", "Wang", "Smith", "Li", "Novak", "Huber", "Garcia", "Kim", "Okafor", "Rossi"]
+
+
+# ---------- synthetic TEI ----------
+
+def _words(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(n))
+
+
+def _person(rng: random.Random) -> str:
+    return (
+        f'<persName><forename type="first">{rng.choice(_FORENAMES)}</forename>'
+        f"<surname>{rng.choice(_SURNAMES)}</surname></persName>"
+    )
+
+
+def synthetic_tei(seed: int | str, n_refs: int = 30, n_paragraphs: int = 40) -> str:
+    """
+    Deterministic GROBID-like TEI document for `seed`. About half of the
+    paragraphs' sentences carry a bibr citation, a few point to missing
+    bibliography entries like real GROBID output does.
+    """
+    rng = random.Random(seed)
+    bibl = []
+    for i in range(n_refs):
+        authors = "".join(f"<author>{_person(rng)}</author>" for _ in range(rng.randint(0, 4)))
+        doi = f'<idno type="DOI">10.5555/{rng.getrandbits(32):08x}.{i}</idno>' if rng.random() < 0.5 else ""
+        date = f'<date type="published" when="{rng.randint(1990, 2021)}"/>' if rng.random() < 0.9 else ""
+        bibl.append(
+            f'<biblStruct xml:id="b{i}"><analytic><title level="a" type="main">{_words(rng, 6)}</title>'
+            f"{authors}{doi}</analytic><monogr><title level=\"j\">J {_words(rng, 2)}</title>"
+            f"<imprint>{date}</imprint></monogr></biblStruct>"
+        )
+
+    paragraphs = []
+    for _ in range(n_paragraphs):
+        sentences = []
+        for _ in range(rng.randint(1, 6)):
+            sentence = _words(rng, rng.randint(3, 15)).capitalize()
+            if n_refs and rng.random() < 0.5:
+                k = rng.randint(0, n_refs + 1)
+                sentence += f' <ref type="bibr" target="#b{k}">[{k + 1}]</ref>'
+            sentences.append(sentence + ".")
+        paragraphs.append(f"<p>{' '.join(sentences)}</p>")
+    divs = "".join(
+        f"<div><head>Section {i + 1}</head>{''.join(paragraphs[i:i + 5])}</div>"
+        for i in range(0, len(paragraphs), 5)
+    )
+
+    title = _words(rng, 8).capitalize()
+    authors = "".join(f"<author>{_person(rng)}</author>" for _ in range(rng.randint(1, 5)))
+    year = rng.randint(2000, 2024)
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<TEI xml:space="preserve" xmlns="{TEI_NS}">
+<teiHeader xml:lang="en"><fileDesc><titleStmt><title level="a" type="main">{title}</title></titleStmt>
+<publicationStmt><publisher/><availability status="unknown"><licence/></availability><date type="published" when="{year}">{year}</date></publicationStmt>
+<sourceDesc><biblStruct><analytic>{authors}<title level="a" type="main">{title}</title></analytic><idno type="DOI">10.5555/{rng.getrandbits(32):08x}</idno><monogr><imprint><date type="published" when="{year}"/></imprint></monogr></biblStruct></sourceDesc></fileDesc>
+<profileDesc><abstract><div><p>{_words(rng, 40).capitalize()}.</p></div></abstract></profileDesc></teiHeader>
+<text xml:lang="en"><body>{divs}</body>
+<back><div type="references"><listBibl>{''.join(bibl)}</listBibl></div></back></text></TEI>
+"""
+
+
+def synthetic_pdf(seed: int | str) -> bytes:
+    """Small unique PDF-looking file for feeding the stand-in."""
+    return (
+        b"%PDF-1.4\n1 0 obj << /Type /Catalog >> endobj\n"
+        + f"% synthetic document {seed}\n".encode()
+        + b"trailer << /Root 1 0 R >>\n%%EOF\n"
+    )
+
+
+# ---------- HTTP server ----------
+
+class GrobidStandInHandler(BaseHTTPRequestHandler):
+    server: "GrobidStandInServer"
+
+    def do_GET(self):
+        if self.path.startswith("/api/isalive"):
+            self._reply(200, b"true", "text/plain")
+        elif self.path.startswith("/api/version"):
+            self._reply(200, VERSION.encode(), "text/plain")
+        else:
+            self._reply(404, b"not found", "text/plain")
+
+    def do_POST(self):
+        if not self.path.startswith("/api/processFulltextDocument"):
+            self._reply(404, b"not found", "text/plain")
+            return
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        pdf = self.parseInput(self.headers.get("Content-Type", ""), body)
+        if pdf is None:
+            self._reply(400, b"missing input file", "text/plain")
+            return
+        filename, data = pdf
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        tei = self.server.teiFor(filename, data)
+        self.server.count()
+        self._reply(200, tei.encode("utf-8"), "application/xml")
+
+    @staticmethod
+    def parseInput(content_type: str, body: bytes) -> tuple[str, bytes] | None:
+        # multipart/form-data is parsed as a MIME message, the PDF is the "input" field
+        message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        if not message.is_multipart():
+            return None
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "input":
+                return part.get_filename() or "document.pdf", part.get_payload(decode=True) or b""
+        return None
+
+    def _reply(self, status: int, payload: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class GrobidStandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], tei_dir: Path | None = None, latency: float = 0.0,
+                 n_refs: int = 30, n_paragraphs: int = 40, verbose: bool = False):
+        super().__init__(address, GrobidStandInHandler)
+        self.tei_dir = tei_dir
+        self.latency = latency
+        self.n_refs = n_refs
+        self.n_paragraphs = n_paragraphs
+        self.verbose = verbose
+        self.served = 0
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def teiFor(self, filename: str, data: bytes) -> str:
+        stem = Path(filename).stem
+        if self.tei_dir is not None:
+            for name in (f"{stem}.grobid.tei.xml", f"{stem}.tei.xml"):
+                recorded = self.tei_dir / name
+                if recorded.exists():
+                    return recorded.read_text(encoding="utf-8")
+        seed = hashlib.sha256(data).hexdigest()
+        return synthetic_tei(seed, self.n_refs, self.n_paragraphs)
+
+    def count(self):
+        with self._lock:
+            self.served += 1
+
+    def start(self) -> "GrobidStandInServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="grobid-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def start_standin(tei_dir: str | Path | None = None, host: str = "127.0.0.1", port: int = 0, **kwargs) -> GrobidStandInServer:
+    """Starts a stand-in in a background thread, port 0 picks a free port."""
+    return GrobidStandInServer((host, port), Path(tei_dir) if tei_dir else None, **kwargs).start()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local stand-in for the GROBID HTTP API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8070)
+    ap.add_argument("--tei-dir", default=None, help="Serve pre-recorded <stem>.grobid.tei.xml / <stem>.tei.xml from here")
+    ap.add_argument("--latency", type=float, default=0.0, help="Seconds of simulated processing per document")
+    ap.add_argument("--refs", type=int, default=30, help="References per synthetic document")
+    ap.add_argument("--paragraphs", type=int, default=40, help="Body paragraphs per synthetic document")
+    ap.add_argument("--verbose", action="store_true")
+    args = ap.parse_args()
+
+    tei_dir = Path(args.tei_dir).expanduser().resolve() if args.tei_dir else None
+    server = GrobidStandInServer((args.host, args.port), tei_dir, args.latency, args.refs, args.paragraphs, args.verbose)
+    print(f"GROBID stand-in {VERSION} on {server.url}" + (f", recorded TEI from {tei_dir}" if tei_dir else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
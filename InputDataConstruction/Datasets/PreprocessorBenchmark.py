@@ -0,0 +1,148 @@
+"""
+PreprocessorBenchmark.py
+
+Throughput benchmark for the ApplicationDataPreprocessor stages, measured
+separately in documents per second:
+  grobid   PDFs -> TEI through GrobidClient (against a GrobidStandIn by default)
+  parse    TEI -> paper/refs dicts (tei_to_outputs, --workers processes)
+  write    per-paper .json/.refs.json files and the corpus JSONL
+
+For every size in --sizes a synthetic batch of PDFs is generated in a
+temporary directory. Without --grobid-url a local stand-in is started, so the
+benchmark runs anywhere; --latency emulates GROBID's processing time, --tei-dir
+serves pre-recorded TEI instead of synthetic documents.
+
+Call file as script:
+  python PreprocessorBenchmark.py --sizes 10 100 1000 --workers 4 --json results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from grobid_client.grobid_client import GrobidClient
+
+try:
+    from InputDataConstruction.Datasets.ApplicationDataPreprocessor import CorpusWriter, tei_for_pdf, tei_to_outputs, write_atomic
+    from InputDataConstruction.Datasets.GrobidStandIn import start_standin, synthetic_pdf
+except ImportError:  # called as a script from this directory
+    from ApplicationDataPreprocessor import CorpusWriter, tei_for_pdf, tei_to_outputs, write_atomic
+    from GrobidStandIn import start_standin, synthetic_pdf
+
+
+def _rate(docs: int, seconds: float) -> float:
+    return docs / seconds if seconds > 0 else 0.0
+
+
+def bench_grobid(url: str, pdf_dir: Path, tei_dir: Path, n: int) -> float:
+    client = GrobidClient(grobid_server=url)
+    start = time.perf_counter()
+    client.process(
+        "processFulltextDocument",
+        input_path=str(pdf_dir),
+        output=str(tei_dir),
+        n=n,
+        json_output=False,
+        force=True,
+        verbose=False,
+    )
+    return time.perf_counter() - start
+
+
+def bench_parse(tei_files: list[Path], workers: int, spans: bool) -> tuple[float, list[tuple[dict, list[dict]]]]:
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(tei_to_outputs, tei_files, [spans] * len(tei_files), chunksize=8))
+    else:
+        results = [tei_to_outputs(tei, spans) for tei in tei_files]
+    return time.perf_counter() - start, results
+
+
+def bench_write(results: list[tuple[dict, list[dict]]], out: Path, shard_size: int | None) -> float:
+    start = time.perf_counter()
+    corpus = CorpusWriter(out / "corpus.jsonl", shard_size)
+    for paper, refs in results:
+        write_atomic(out / f"{paper['paper_id']}.json", json.dumps(paper, ensure_ascii=False, indent=2))
+        write_atomic(out / f"{paper['paper_id']}.refs.json", json.dumps(refs, ensure_ascii=False, indent=2))
+        corpus.write(paper, refs)
+    corpus.close()
+    return time.perf_counter() - start
+
+
+def run_size(size: int, args, url: str) -> dict:
+    with tempfile.TemporaryDirectory(prefix="preprocessor_bench_") as tmp:
+        pdf_dir, tei_dir, json_dir = Path(tmp) / "pdf", Path(tmp) / "tei", Path(tmp) / "json"
+        for d in (pdf_dir, tei_dir, json_dir):
+            d.mkdir()
+        pdfs = []
+        for i in range(size):
+            pdf = pdf_dir / f"doc{i:06d}.pdf"
+            pdf.write_bytes(synthetic_pdf(f"{args.seed}-{i}"))
+            pdfs.append(pdf)
+
+        grobid_s = bench_grobid(url, pdf_dir, tei_dir, args.n)
+        tei_files = [tei for tei in (tei_for_pdf(pdf, tei_dir) for pdf in pdfs) if tei is not None]
+        parse_s, results = bench_parse(tei_files, max(1, min(args.workers, len(tei_files))), args.spans)
+        write_s = bench_write(results, json_dir, args.shard_size)
+
+    return {
+        "docs": size,
+        "tei": len(tei_files),
+        "grobid": {"seconds": grobid_s, "docs_per_s": _rate(len(tei_files), grobid_s)},
+        "parse": {"seconds": parse_s, "docs_per_s": _rate(len(results), parse_s)},
+        "write": {"seconds": write_s, "docs_per_s": _rate(len(results), write_s)},
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Documents per second of the preprocessing stages")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="Corpus sizes (number of PDFs) to benchmark")
+    ap.add_argument("--grobid-url", default=None, help="Benchmark a real GROBID instead of the local stand-in")
+    ap.add_argument("--tei-dir", default=None, help="Stand-in serves pre-recorded TEI from here")
+    ap.add_argument("--latency", type=float, default=0.0, help="Stand-in seconds per document")
+    ap.add_argument("--refs", type=int, default=30, help="References per synthetic document")
+    ap.add_argument("--paragraphs", type=int, default=40, help="Body paragraphs per synthetic document")
+    ap.add_argument("--n", type=int, default=2, help="Concurrent GROBID requests")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processes for the parse stage")
+    ap.add_argument("--spans", action="store_true", help="Parse with sentence/citation spans")
+    ap.add_argument("--shard-size", type=int, default=None)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", default=None, help="Write the results to this file")
+    args = ap.parse_args()
+
+    server = None
+    url = args.grobid_url
+    if url is None:
+        server = start_standin(args.tei_dir, latency=args.latency, n_refs=args.refs, n_paragraphs=args.paragraphs)
+        url = server.url
+    print(f"GROBID at {url}" + (" (stand-in)" if server else ""))
+
+    results = []
+    try:
+        for size in args.sizes:
+            result = run_size(size, args, url)
+            results.append(result)
+            print(
+                f"[BENCH] {size:>7} docs | grobid {result['grobid']['docs_per_s']:8.1f} docs/s"
+                f" | parse {result['parse']['docs_per_s']:8.1f} docs/s"
+                f" | write {result['write']['docs_per_s']:8.1f} docs/s"
+            )
+    finally:
+        if server:
+            server.stop()
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
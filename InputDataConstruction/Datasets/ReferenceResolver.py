@@ -0,0 +1,367 @@
+"""
+ReferenceResolver.py
+
+Resolves the reference ids of a preprocessed corpus to corpus paper_ids.
+
+ApplicationDataPreprocessor gives every reference a hash id (R_ + sha1 of DOI
+or title/year/first author) that never equals the paper_id of the cited paper
+if that paper is part of the corpus itself. This stage
+1) indexes all corpus papers by DOI and by normalized title/year/first author,
+2) matches every distinct reference id against that index: by DOI, by exact
+   title/year/first author and finally fuzzy by title with MinHash-LSH
+   (character 3-gram shingles, candidates verified by Jaccard similarity and
+   compatible year/first author),
+3) rewrites `references` of every paper to the resolved paper_ids in one
+   streaming pass (and the ref_ids of `citation_spans` written with
+   --spans). Unresolved references keep their R_ id.
+
+Reference metadata is read from the <shard>.refs.jsonl companions written
+with --corpus (or the per-paper <paper>.refs.json files). Every input file is
+written as <stem>.jsonl to the output directory and its companions are copied
+along, so the resolved corpus can be resolved or loaded like the original.
+
+Call file as script:
+  python ReferenceResolver.py --corpus CorpusDirOrGlob --output ResolvedDir
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import re
+import shutil
+import time
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+
+# MinHash with multiply-shift hashing; LSH with BANDS bands of NUM_PERM / BANDS rows
+NUM_PERM = 64
+BANDS = 16
+# candidates per band and query above this bucket size are ignored (e.g. "Introduction")
+MAX_BUCKET = 64
+MIN_JACCARD = 0.8
+
+
+# ---------- normalization ----------
+
+def norm_title(title: str | None) -> str:
+    if not title:
+        return ""
+    title = unicodedata.normalize("NFKD", title).encode("ascii", "ignore").decode("ascii").lower()
+    return " ".join(re.findall(r"[a-z0-9]+", title))
+
+
+def norm_doi(doi: str | None) -> str:
+    if not doi:
+        return ""
+    doi = doi.strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "https://dx.doi.org/", "http://dx.doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    return doi.strip()
+
+
+def first_surname(authors) -> str:
+    # corpus papers join authors with " and ", references keep a list
+    if isinstance(authors, str):
+        authors = authors.split(" and ")
+    if not authors:
+        return ""
+    tokens = norm_title(authors[0]).split()
+    return tokens[-1] if tokens else ""
+
+
+def norm_year(year) -> str:
+    year = str(year or "").strip()[:4]
+    return year if year.isdigit() else ""
+
+
+def shingles(title: str) -> np.ndarray:
+    """Sorted distinct character 3-grams of a normalized (ASCII) title, packed into ints."""
+    codes = np.frombuffer(title.encode("ascii"), dtype=np.uint8).astype(np.uint64)
+    if len(codes) < 3:
+        return np.unique(codes)
+    return np.unique((codes[:-2] << np.uint64(16)) | (codes[1:-1] << np.uint64(8)) | codes[2:])
+
+
+# ---------- MinHash-LSH ----------
+
+class MinHashLSH:
+    """
+    Title index for fuzzy matching. Signatures are computed for all titles at
+    once; every band is reduced to one 64-bit key and kept sorted, so the
+    candidates of a batch of queries are found by binary search.
+    """
+
+    def __init__(self, titles: list[str], num_perm: int = NUM_PERM, bands: int = BANDS, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self.rows = num_perm // bands
+        self.band_mix = rng.integers(1, 1 << 63, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self.shingles = [shingles(t) for t in titles]
+        keys = self.bandKeys(self.signatures(self.shingles))
+        self.order = np.argsort(keys, axis=0, kind="stable")
+        self.sorted_keys = np.take_along_axis(keys, self.order, axis=0)
+
+    def signatures(self, shingle_sets: list[np.ndarray], chunk: int = 4096) -> np.ndarray:
+        sig = np.full((len(shingle_sets), len(self.a)), np.iinfo(np.uint64).max, dtype=np.uint64)
+        for start in range(0, len(shingle_sets), chunk):
+            part = shingle_sets[start:start + chunk]
+            counts = np.array([len(s) for s in part])
+            if counts.sum() == 0:
+                continue
+            flat = np.concatenate(part)
+            # (a * x + b) mod 2^64, upper 32 bits: one random hash function per column
+            hashed = (flat[:, None] * self.a[None, :] + self.b[None, :]) >> np.uint64(32)
+            offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            nonempty = counts > 0
+            sig[start:start + len(part)][nonempty] = np.minimum.reduceat(hashed, offsets[nonempty], axis=0)
+        return sig
+
+    def bandKeys(self, sig: np.ndarray) -> np.ndarray:
+        bands = sig.reshape(len(sig), -1, self.rows)
+        # wrapping multiply-add mixes the rows of a band into one key
+        return (bands * self.band_mix[None, None, :]).sum(axis=2, dtype=np.uint64)
+
+    def candidates(self, query_sets: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (query index, indexed title index) pairs sharing at least one band."""
+        keys = self.bandKeys(self.signatures(query_sets))
+        empty = np.array([len(s) == 0 for s in query_sets], dtype=bool)
+        queries, matches = [], []
+        for band in range(keys.shape[1]):
+            column = self.sorted_keys[:, band]
+            lo = np.searchsorted(column, keys[:, band], side="left")
+            hi = np.searchsorted(column, keys[:, band], side="right")
+            counts = hi - lo
+            counts[(counts > MAX_BUCKET) | empty] = 0
+            q = np.repeat(np.arange(len(query_sets)), counts)
+            pos = np.repeat(lo - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+            queries.append(q)
+            matches.append(self.order[pos, band])
+        n = np.int64(len(self.shingles))
+        pairs = np.unique(np.concatenate(queries).astype(np.int64) * n + np.concatenate(matches))
+        return pairs // n, pairs % n
+
+    def jaccard(self, query_set: np.ndarray, idx: int) -> float:
+        other = self.shingles[idx]
+        if len(query_set) == 0 or len(other) == 0:
+            return 0.0
+        common = len(np.intersect1d(query_set, other, assume_unique=True))
+        return common / (len(query_set) + len(other) - common)
+
+
+# ---------- corpus IO ----------
+
+def corpus_paths(pattern: str) -> list[Path]:
+    path = Path(pattern)
+    if path.is_dir():
+        paths = [p for p in path.iterdir() if p.suffix in (".json", ".jsonl")]
+    else:
+        paths = [Path(p) for p in glob.glob(pattern) if Path(p).is_file()]
+    return sorted(p for p in paths if not p.name.endswith((".refs.json", ".refs.jsonl", ".idx.json")))
+
+
+def read_records(path: Path):
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == "[":
+            yield from json.load(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_reference_meta(paths: list[Path]) -> dict[str, dict]:
+    """ref_id -> reference object from .refs.jsonl companions and per-paper .refs.json files."""
+    meta: dict[str, dict] = {}
+    for path in paths:
+        if path.name.endswith(".refs.jsonl"):
+            for line in read_records(path):
+                for ref in line.get("refs", []):
+                    meta.setdefault(ref["ref_id"], ref)
+        else:
+            for ref in read_records(path):
+                meta.setdefault(ref["ref_id"], ref)
+    return meta
+
+
+def companion_paths(paths: list[Path]) -> list[Path]:
+    found = []
+    for path in paths:
+        stem = path.name[:-len(path.suffix)]
+        for candidate in (path.with_name(f"{stem}.refs.jsonl"), path.with_name(f"{stem}.refs.json")):
+            if candidate.exists():
+                found.append(candidate)
+    return found
+
+
+def output_names(paths: list[Path]) -> dict[Path, str]:
+    """Output shard name per input file; inputs that would overwrite each other are an error."""
+    names: dict[str, Path] = {}
+    for path in paths:
+        name = f"{path.stem}.jsonl"
+        if name in names:
+            raise ValueError(f"{path} and {names[name]} would both be written to {name}")
+        names[name] = path
+    return {path: name for name, path in names.items()}
+
+
+# ---------- resolution ----------
+
+class CorpusIndex:
+    """DOI, exact title/year/first-author and MinHash-LSH title index over the corpus papers."""
+
+    def __init__(self, papers: list[dict]):
+        self.ids = [p["paper_id"] for p in papers]
+        self.id_set = set(self.ids)
+        self.titles = [norm_title(p.get("title")) for p in papers]
+        self.years = [norm_year(p.get("year")) for p in papers]
+        self.surnames = [first_surname(p.get("authors")) for p in papers]
+        self.by_doi = {}
+        self.by_key = {}
+        for i, p in enumerate(papers):
+            doi = norm_doi(p.get("doi"))
+            if doi:
+                self.by_doi.setdefault(doi, i)
+            if self.titles[i]:
+                self.by_key.setdefault((self.titles[i], self.years[i], self.surnames[i]), i)
+        self.lsh = MinHashLSH(self.titles)
+        # year as int (0 = unknown) and interned first author (0 = unknown) for vectorized candidate filtering
+        self.surname_codes: dict[str, int] = {"": 0}
+        self.year_array = np.array([int(y) if y else 0 for y in self.years], dtype=np.int64)
+        self.surname_array = self.encodeSurnames(self.surnames)
+
+    def encodeSurnames(self, surnames: list[str]) -> np.ndarray:
+        return np.array([self.surname_codes.setdefault(s, len(self.surname_codes)) for s in surnames], dtype=np.int64)
+
+    def resolve(self, refs: dict[str, dict]) -> tuple[dict[str, str], dict[str, int]]:
+        """Returns (ref_id -> paper_id, matches per method) for all given references."""
+        resolved: dict[str, str] = {}
+        stats = {"identity": 0, "doi": 0, "exact": 0, "fuzzy": 0, "unresolved": 0}
+        fuzzy: list[tuple[str, str, str, str]] = []
+        for ref_id, ref in refs.items():
+            if ref_id in self.id_set:
+                resolved[ref_id] = ref_id
+                stats["identity"] += 1
+                continue
+            idx = self.by_doi.get(norm_doi(ref.get("doi")))
+            method = "doi"
+            title, year, surname = norm_title(ref.get("title")), norm_year(ref.get("year")), first_surname(ref.get("authors"))
+            if idx is None and title:
+                idx = self.by_key.get((title, year, surname))
+                method = "exact"
+            if idx is not None:
+                resolved[ref_id] = self.ids[idx]
+                stats[method] += 1
+            elif title:
+                fuzzy.append((ref_id, title, year, surname))
+
+        if fuzzy:
+            query_sets = [shingles(f[1]) for f in fuzzy]
+            queries, matches = self.lsh.candidates(query_sets)
+            # candidates need a compatible year (+-1) and the same first author where both are known
+            years = np.array([int(f[2]) if f[2] else 0 for f in fuzzy], dtype=np.int64)[queries]
+            surnames = self.encodeSurnames([f[3] for f in fuzzy])[queries]
+            other_years, other_surnames = self.year_array[matches], self.surname_array[matches]
+            keep = ((years == 0) | (other_years == 0) | (np.abs(years - other_years) <= 1)) \
+                & ((surnames == 0) | (other_surnames == 0) | (surnames == other_surnames))
+            best: dict[int, tuple[float, int]] = {}
+            for q, idx in zip(queries[keep].tolist(), matches[keep].tolist()):
+                score = self.lsh.jaccard(query_sets[q], idx)
+                if score >= MIN_JACCARD and score > best.get(q, (0.0, -1))[0]:
+                    best[q] = (score, idx)
+            for q, (_, idx) in best.items():
+                resolved[fuzzy[q][0]] = self.ids[idx]
+                stats["fuzzy"] += 1
+        stats["unresolved"] = len(refs) - len(resolved)
+        return resolved, stats
+
+
+def rewrite_references(references: list[str], resolved: dict[str, str], paper_id: str) -> list[str]:
+    out, seen = [], set()
+    for ref in references:
+        target = resolved.get(ref, ref)
+        if target != paper_id and target not in seen:
+            seen.add(target)
+            out.append(target)
+    return out
+
+
+def rewrite_citation_spans(spans: list[list], resolved: dict[str, str], paper_id: str) -> list[list]:
+    out = []
+    for offset, length, ref in spans:
+        target = resolved.get(ref, ref)
+        if target != paper_id:
+            out.append([offset, length, target])
+    return out
+
+
+def resolve_corpus(pattern: str, output: Path, refs_pattern: str | None = None) -> dict:
+    start = time.perf_counter()
+    paths = corpus_paths(pattern)
+    if not paths:
+        raise FileNotFoundError(f"No corpus files found for {pattern}")
+    names = output_names(paths)
+
+    # pass 1: metadata only, full texts are not kept
+    papers = []
+    referenced: set[str] = set()
+    for path in paths:
+        for record in read_records(path):
+            papers.append({k: record.get(k) for k in ("paper_id", "title", "year", "authors", "doi")})
+            referenced.update(record.get("references") or [])
+    meta = read_reference_meta([Path(p) for p in glob.glob(refs_pattern)] if refs_pattern else companion_paths(paths))
+    refs = {ref_id: meta.get(ref_id, {}) for ref_id in referenced}
+
+    index = CorpusIndex(papers)
+    resolved, stats = index.resolve(refs)
+
+    # pass 2: stream the corpus again and rewrite the references
+    output.mkdir(parents=True, exist_ok=True)
+    edges = 0
+    for path in paths:
+        target = output / names[path]
+        tmp = target.with_name(target.name + ".part")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for record in read_records(path):
+                record["references"] = rewrite_references(record.get("references") or [], resolved, record["paper_id"])
+                if record.get("citation_spans"):
+                    record["citation_spans"] = rewrite_citation_spans(record["citation_spans"], resolved, record["paper_id"])
+                edges += sum(1 for r in record["references"] if r in index.id_set)
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        tmp.replace(target)
+        for companion in companion_paths([path]):
+            if companion.parent.resolve() != output.resolve():
+                shutil.copyfile(companion, output / companion.name)
+    with open(output / "resolved_refs.json", "w", encoding="utf-8") as f:
+        json.dump({k: v for k, v in resolved.items() if k != v}, f, ensure_ascii=False, indent=2)
+
+    stats.update({"papers": len(papers), "references": len(refs), "corpus_edges": edges, "seconds": time.perf_counter() - start})
+    return stats
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--corpus", required=True, help="Corpus file, directory of shards or glob")
+    ap.add_argument("--output", required=True, help="Directory for the resolved corpus shards")
+    ap.add_argument("--refs", default=None, help="Glob of reference metadata (default: the .refs.jsonl companions)")
+    args = ap.parse_args()
+
+    stats = resolve_corpus(args.corpus, Path(args.output).expanduser().resolve(), args.refs)
+    print(
+        f"[DONE] {stats['papers']} papers, {stats['references']} distinct references: "
+        f"identity={stats['identity']} doi={stats['doi']} exact={stats['exact']} fuzzy={stats['fuzzy']} "
+        f"unresolved={stats['unresolved']}. {stats['corpus_edges']} in-corpus citations, {stats['seconds']:.2f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
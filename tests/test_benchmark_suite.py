@@ -0,0 +1,33 @@
+import json
+
+from CiteSide.Benchmark import BenchmarkSuite as bench
+
+
+def results(**seconds):
+    return {"meta": {}, "results": {name: {"seconds": s} for name, s in seconds.items()}}
+
+
+def test_compare_flags_slowdowns_beyond_the_threshold():
+    rows = bench.compare(results(crawl=1.3, snapshot=1.2, linking=0.7, corpus_load=1.0),
+                         results(crawl=1.0, snapshot=1.0, linking=1.0), threshold=0.25)
+    status = {row["name"]: row["status"] for row in rows}
+    assert status == {"crawl": "regression", "snapshot": "ok", "linking": "improved", "corpus_load": "new"}
+    assert rows[0]["ratio"] == 1.3 and rows[-1]["baseline_s"] is None
+
+
+def test_main_fails_on_a_regression_against_the_baseline(tmp_path, capsys):
+    args = ["--papers", "20", "--references", "3", "--sentences", "5", "--repeat", "1", "--only", "graph_build"]
+    current = tmp_path / "current.json"
+    assert bench.main(args + ["--json", str(current)]) == 0
+    recorded = json.loads(current.read_text(encoding="utf-8"))
+
+    fast = tmp_path / "fast.json"
+    recorded["results"]["graph_build"]["seconds"] = 1e-9
+    fast.write_text(json.dumps(recorded), encoding="utf-8")
+    assert bench.main(args + ["--baseline", str(fast)]) == 1
+    assert "FAILED: 1 regression(s): graph_build" in capsys.readouterr().out
+
+    slow = tmp_path / "slow.json"
+    recorded["results"]["graph_build"]["seconds"] = 1e3
+    slow.write_text(json.dumps(recorded), encoding="utf-8")
+    assert bench.main(args + ["--baseline", str(slow)]) == 0
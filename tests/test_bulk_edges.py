@@ -0,0 +1,25 @@
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+NODES = ["a", "b", "c", "d"]
+# c -> a closes the cycle a -> b -> c, d -> d is a self-citation
+EDGES = [("a", "b", 0.1), ("b", "c", 0.2), ("c", "a", 0.3), ("c", "d", 0.4), ("d", "d", 0.5), ("a", "b", 0.6)]
+
+
+def test_bulk_insert_matches_adding_edges_one_by_one(capsys):
+    bulk = ReferenceTreeBuilder()
+    bulk.create(NODES, EDGES)
+    single = ReferenceTreeBuilder()
+    for node in NODES:
+        single.addNode(node)
+    for edge in EDGES:
+        single.addEdgeTuple(edge)
+    assert sorted(bulk.getEdges()) == sorted(single.getEdges())
+    assert bulk.getWeight("a", "b") == 0.6
+    assert bulk.getReferences("c") == ["d"]
+    assert capsys.readouterr().out.count("would create a cycle") == 4
+
+
+def test_cyclic_nodes_of_a_dag_is_empty():
+    tree = ReferenceTreeBuilder()
+    tree.create(NODES, [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d")])
+    assert tree._graph.cyclicNodes().size == 0
@@ -0,0 +1,49 @@
+import math
+
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+NODES = list("abcde")
+
+
+def weights(tree):
+    return {(u, v): data["weight"] for u, v, data in tree.getEdges()}
+
+
+def rebuilt(edges):
+    tree = ReferenceTreeBuilder()
+    tree.create(NODES, edges)
+    tree.buildCombCritIndex()
+    return tree
+
+
+def test_incremental_updates_match_a_full_rebuild():
+    tree = rebuilt([("a", "b", 0.9), ("b", "c", 0.2), ("b", "d", 0.6), ("c", "e", 0.4)])
+    tree.changeWeightOfEdge("b", "c", 0.7)
+    tree.addEdge("d", "e", 0.1)
+    tree.addEdge("a", "c", -1.0)
+    tree.removeEdge("c", "e")
+
+    expected = weights(rebuilt([("a", "b", 0.9), ("b", "c", 0.7), ("b", "d", 0.6), ("d", "e", 0.1), ("a", "c", -1.0)]))
+    actual = weights(tree)
+    assert actual.keys() == expected.keys()
+    for edge, weight in expected.items():
+        assert math.isclose(actual[edge], weight), edge
+
+
+def test_unscored_edges_keep_their_weight():
+    tree = rebuilt([("a", "b", -1.0), ("b", "c", 0.5)])
+    assert tree.getWeight("a", "b") == -1.0
+    assert tree.getWeight("b", "c") == 0.5
+
+
+def test_node_added_after_indexing_is_unknown(tmp_path):
+    tree = rebuilt([("a", "b", 0.5)])
+    tree.addNode("f")
+    tree.addEdge("a", "f", 0.4)
+    assert tree.getWeight("a", "f") == 0.4
+    assert ("a", "f", 0.4) in tree.getMostCritical()
+    assert tree.build()["nodes"]["f"] == {"critical": -1.0}
+
+    path = tmp_path / "tree.json"
+    tree.store(str(path))
+    assert sorted(ReferenceTreeBuilder.load(str(path)).getEdges()) == sorted(tree.getEdges())
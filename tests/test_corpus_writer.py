@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+pytest.importorskip("grobid_client")
+
+from CiteSide.FileHandler.JsonHandler import JsonHandler
+from InputDataConstruction.Datasets import ApplicationDataPreprocessor as adp
+
+
+def test_sharded_corpus_loads_without_its_reference_companions(tmp_path):
+    writer = adp.CorpusWriter(tmp_path / "corpus.jsonl", shard_size=2)
+    for i in range(3):
+        writer.write({"paper_id": f"doc{i}", "title": f"Paper {i}"}, [{"ref_id": f"r{i}", "title": "Cited"}])
+    writer.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "corpus-00000.jsonl", "corpus-00000.refs.jsonl", "corpus-00001.jsonl", "corpus-00001.refs.jsonl"]
+    refs = [json.loads(line) for line in (tmp_path / "corpus-00001.refs.jsonl").read_text(encoding="utf-8").splitlines()]
+    assert refs == [{"paper_id": "doc2", "refs": [{"ref_id": "r2", "title": "Cited"}]}]
+
+    jh = JsonHandler()
+    jh.loadDataset(str(tmp_path))
+    assert list(jh.getIds()) == ["doc0", "doc1", "doc2"]
+    assert jh.getTitle("doc2") == "Paper 2"
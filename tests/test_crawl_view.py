@@ -0,0 +1,45 @@
+import pytest
+
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+
+def tree():
+    # e cites a, a cites b and c, b cites d
+    rtb = ReferenceTreeBuilder()
+    rtb.create(list("abcde"), [("a", "b", 0.2), ("a", "c", 0.8), ("b", "d", 0.5), ("e", "a", 0.9)])
+    return rtb
+
+
+def test_crawl_reads_the_parent_until_materialized():
+    crawl = tree().buildCrawlTree("a", 1, reverse_depth=1)
+    assert crawl.getNodes() == ["a", "b", "c", "e"]
+    assert crawl.getDepth("e") == -1 and crawl.getDepth("d") is None
+    assert crawl._tree is None
+
+
+def test_materialized_crawl_keeps_weights_and_depths():
+    crawl = tree().buildCrawlTree("a", 1)
+    with pytest.raises(AttributeError):
+        crawl.getEdges()
+    assert crawl._tree is None
+    materialized = crawl.materialize()
+    assert crawl.materialize() is materialized
+    edges = {(u, v): data for u, v, data in materialized.getEdges()}
+    assert set(edges) == {("a", "b"), ("a", "c")}
+    assert edges[("a", "b")]["weight"] == 0.2
+    assert materialized.build()["nodes"]["b"] == {"depth": 1}
+    assert materialized.getMeta()["crawl_root"] == "a"
+
+
+def test_crawls_are_memoized_until_the_graph_changes():
+    rtb = tree()
+    first = rtb.buildCrawlTree("a", 2)
+    assert rtb.buildCrawlTree("a", 2)._depth is first._depth
+    assert rtb.buildCrawlTree("a", 1)._depth is not first._depth
+
+    version = rtb.getVersion()
+    rtb.addEdge("c", "d", 0.3)
+    assert rtb.getVersion() > version
+    second = rtb.buildCrawlTree("a", 2)
+    assert second._depth is not first._depth
+    assert second.getNodes() == ["a", "b", "c", "d"]
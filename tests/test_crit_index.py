@@ -0,0 +1,67 @@
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+from CiteSide.UsageValidator.UsageValidator import UsageValidator
+
+ARGUMENT = "The mean incubation period of the virus is between 4 and 14 days."
+SUPPORTING = "The mean incubation period of the virus is between 4 and 14 days (Lai, 2020)."
+CONTRADICTING = "The mean incubation period of the virus is not between 4 and 14 days (Kim, 2019)."
+
+
+def scored_tree():
+    tree = ReferenceTreeBuilder()
+    tree.create(list("abcde"), [("a", "b", 0.2), ("a", "c", 0.8), ("b", "d", 0.5), ("c", "e")])
+    return tree
+
+
+def targets(edges):
+    return sorted(target for _, target, _ in edges)
+
+
+def test_index_follows_edge_changes():
+    tree = scored_tree()
+    assert targets(tree.getCriticalInRange(0.0, 1.0)) == ["b", "c", "d"]
+    tree.changeWeightOfEdge("a", "c", -1.0)
+    tree.addEdge("d", "e", 0.3)
+    assert targets(tree.getCriticalInRange(0.0, 1.0)) == ["b", "d", "e"]
+    assert targets(tree.getCriticalInRange(0.25, 0.6)) == ["d", "e"]
+    assert targets(tree.getMostCriticalOf("a", 5)) == ["b"]
+
+
+def test_unscored_edges_are_not_ranked():
+    assert targets(scored_tree().getMostCritical(10)) == ["b", "c", "d"]
+
+
+def validated_tree():
+    # crit_index of one supporting and one contradicting citation, scored like a validation run does
+    text = SUPPORTING + " " + CONTRADICTING
+    second = len(SUPPORTING) + 1
+    sentence_spans = [[0, len(SUPPORTING)], [second, len(CONTRADICTING)]]
+    citation_spans = [
+        [SUPPORTING.index("(Lai"), len("(Lai, 2020)"), "supported"],
+        [second + CONTRADICTING.index("(Kim"), len("(Kim, 2019)"), "contradicted"],
+    ]
+    refs = [
+        {"paper_id": "supported", "authors": "Ann Lai", "year": "2020"},
+        {"paper_id": "contradicted", "authors": "Bo Kim", "year": "2019"},
+    ]
+    replies = UsageValidator.withStubs(dedup=False).run(ARGUMENT, text, refs, sentence_spans=sentence_spans,
+                                                        citation_spans=citation_spans)
+    tree = ReferenceTreeBuilder()
+    for node in ("source", "supported", "contradicted", "unscored"):
+        tree.addNode(node)
+    for reply in replies:
+        tree.addEdge("source", reply["paper_id"], reply["crit_index"])
+    tree.addEdge("source", "unscored")
+    return tree
+
+
+def test_contradicted_citation_is_most_critical():
+    tree = validated_tree()
+    assert [target for _, target, _ in tree.getMostCritical()] == ["contradicted", "supported"]
+    assert [target for _, target, _ in tree.getMostCriticalOf("source", 1)] == ["contradicted"]
+    assert [target for _, target, _ in tree.getCriticalInRange(0.0, 1.0)] == ["contradicted", "supported"]
+
+
+def test_descending_lists_least_critical_first():
+    tree = validated_tree()
+    assert [target for _, target, _ in tree.getMostCritical(1, descending=True)] == ["supported"]
+    assert [target for _, target, _ in tree.getCriticalInRange(0.0, 1.0, descending=True)] == ["supported", "contradicted"]
@@ -0,0 +1,70 @@
+import numpy as np
+
+from CiteSide.ReferenceTreeTools import CsrGraph as csr_module
+from CiteSide.ReferenceTreeTools.CsrGraph import CsrGraph
+
+
+def graph(edges, nodes="abcd"):
+    g = CsrGraph()
+    for node in nodes:
+        g.addNode(node)
+    for source, target in edges:
+        g.addEdge(g.nodeIndex(source), g.nodeIndex(target))
+    return g
+
+
+def targets(g, node):
+    return sorted(g.nodeId(n) for n in g.successors(g.nodeIndex(node)).tolist())
+
+
+def test_pending_edges_are_visible_before_and_after_compaction():
+    g = graph([("a", "b"), ("a", "c")])
+    g.compact()
+    g.addEdge(g.nodeIndex("a"), g.nodeIndex("d"))
+    assert targets(g, "a") == ["b", "c", "d"]
+    assert g.addEdge(g.nodeIndex("a"), g.nodeIndex("d")) == 2
+    g.compact()
+    assert targets(g, "a") == ["b", "c", "d"]
+    assert g.edgeIndex(g.nodeIndex("a"), g.nodeIndex("d")) == 2
+
+
+def test_pending_edges_are_folded_in_past_the_threshold(monkeypatch):
+    monkeypatch.setattr(csr_module, "PENDING_MIN", 2)
+    g = graph([("a", "b"), ("a", "c"), ("b", "c"), ("c", "d")])
+    assert len(g._pending_pairs) <= 2
+    assert g.csr()[0].tolist() == [0, 2, 3, 4, 4]
+
+
+def test_removed_nodes_and_edges_are_tombstoned():
+    g = graph([("a", "b"), ("b", "c"), ("c", "d")])
+    g.compact()
+    removed = g.removeNode(g.nodeIndex("c"))
+    assert sorted(removed.tolist()) == [1, 2]
+    assert not g.hasNode("c") and g.numberOfNodes() == 4
+    assert g.liveNodes().tolist() == [0, 1, 3] and g.liveEdges().tolist() == [0]
+    assert targets(g, "b") == []
+    assert g.inDegree().tolist() == [0, 1, 0, 0]
+    # a re-added node revives its tombstone, a re-added edge gets a new id
+    assert g.addNode("c") == 2
+    assert g.addEdge(g.nodeIndex("b"), g.nodeIndex("c")) == 3
+    g.compact()
+    assert targets(g, "b") == ["c"]
+
+
+def test_crawl_depths_go_both_ways():
+    g = graph([("a", "b"), ("b", "c"), ("d", "a")])
+    depth = g.crawlDepths(g.nodeIndex("a"), max_depth=1, reverse_depth=-1)
+    assert np.array_equal(depth, [0, 1, np.nan, -1], equal_nan=True)
+
+
+def test_added_nodes_only_extend_the_row_pointers(monkeypatch):
+    g = graph([("a", "b"), ("b", "c")])
+    g.compact()
+    rebuilds = []
+    monkeypatch.setattr(g, "_rebuildCsr", lambda: rebuilds.append(1))
+    g.addNode("e")
+    ptr, _ = g.csr()
+    rev_ptr, _ = g.csr(reverse=True)
+    assert rebuilds == []
+    assert ptr.tolist() == [0, 1, 2, 2, 2, 2] and rev_ptr.tolist() == [0, 0, 1, 2, 2, 2]
+    assert targets(g, "e") == [] and targets(g, "a") == ["b"]
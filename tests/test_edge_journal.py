@@ -0,0 +1,45 @@
+from CiteSide.ReferenceTreeTools.EdgeJournal import EdgeJournal
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+
+def mutate(tree):
+    tree.create(list("abcd"), [("a", "b", 0.2), ("b", "c", 0.6), ("a", "d")])
+    tree.changeWeightOfEdge("a", "d", 0.9)
+    tree.removeEdge("b", "c")
+    tree.addEdge("c", "d", 0.3)
+    tree.removeNode("b")
+
+
+def test_replayed_journal_matches_the_tree(tmp_path):
+    path = tmp_path / "tree.journal"
+    tree = ReferenceTreeBuilder()
+    tree.attachJournal(str(path), compact_every=None)
+    mutate(tree)
+    tree.detachJournal()
+    entries, _ = EdgeJournal.readEntries(str(path))
+    assert len(entries) == 11
+
+    loaded = ReferenceTreeBuilder.loadJournal(str(path))
+    assert sorted(loaded.getEdges()) == sorted(tree.getEdges())
+    assert not loaded.hasNode("b")
+
+
+def test_compaction_moves_the_journal_into_the_snapshot(tmp_path):
+    path = tmp_path / "tree.journal"
+    tree = ReferenceTreeBuilder()
+    tree.attachJournal(str(path), compact_every=4)
+    mutate(tree)
+    tree.detachJournal()
+    assert EdgeJournal.snapshotPath(str(path)).exists()
+    assert len(EdgeJournal.readEntries(str(path))[0]) < 4
+
+    loaded = ReferenceTreeBuilder.loadJournal(str(path))
+    assert sorted(loaded.getEdges()) == sorted(tree.getEdges())
+
+
+def test_reader_skips_a_line_still_being_written(tmp_path):
+    path = tmp_path / "tree.journal"
+    path.write_text('["addNode", "a"]\n["addNo', encoding="utf-8")
+    entries, offset = EdgeJournal.readEntries(str(path))
+    assert entries == [["addNode", "a"]] and offset == len('["addNode", "a"]\n')
+    assert EdgeJournal.readEntries(str(path), offset=1000) == (None, 0)
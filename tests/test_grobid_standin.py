@@ -0,0 +1,34 @@
+import urllib.request
+import xml.etree.ElementTree as ET
+
+from InputDataConstruction.Datasets.GrobidStandIn import VERSION, start_standin, synthetic_pdf
+
+
+def post_pdf(url, filename, data):
+    boundary = "standin-test"
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="input"; filename="{filename}"\r\n'
+            f"Content-Type: application/pdf\r\n\r\n").encode() + data + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(f"{url}/api/processFulltextDocument", data=body,
+                                     headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(request) as response:
+        return response.read().decode("utf-8")
+
+
+def test_standin_serves_deterministic_and_recorded_tei(tmp_path):
+    (tmp_path / "recorded.grobid.tei.xml").write_text("<TEI>recorded</TEI>", encoding="utf-8")
+    server = start_standin(tmp_path, n_paragraphs=3)
+    try:
+        with urllib.request.urlopen(f"{server.url}/api/isalive") as response:
+            assert response.read() == b"true"
+        with urllib.request.urlopen(f"{server.url}/api/version") as response:
+            assert response.read().decode() == VERSION
+
+        first = post_pdf(server.url, "a.pdf", synthetic_pdf(1))
+        assert post_pdf(server.url, "b.pdf", synthetic_pdf(1)) == first
+        assert post_pdf(server.url, "a.pdf", synthetic_pdf(2)) != first
+        root = ET.fromstring(first.encode("utf-8"))
+        assert root.find(".//{http://www.tei-c.org/ns/1.0}listBibl") is not None
+        assert post_pdf(server.url, "recorded.pdf", synthetic_pdf(3)) == "<TEI>recorded</TEI>"
+        assert server.served == 4
+    finally:
+        server.stop()
@@ -0,0 +1,46 @@
+from CiteSide.FileHandler.DerivedCache import DerivedCache
+from CiteSide.FileHandler.JsonHandler import PAPER_ADDED, PAPER_REMOVED, PAPER_UPDATED, JsonHandler
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+
+def corpus():
+    jh = JsonHandler()
+    for paper_id, refs in (("a", ["b"]), ("b", ["c"]), ("c", [])):
+        jh.addPaper({"paper_id": paper_id, "title": paper_id.upper(), "references": refs})
+    return jh
+
+
+def test_changes_are_emitted_once_per_real_change():
+    jh = corpus()
+    changes = []
+    jh.subscribe(changes.append)
+    assert not jh.updatePaper({"paper_id": "c", "title": "C", "references": []})
+    assert jh.updatePaper({"paper_id": "c", "title": "C2", "references": []})
+    jh.addPaper({"paper_id": "d", "references": ["a"]})
+    jh.removePaper("b")
+    assert [(change.kind, change.paper_id) for change in changes] == [(PAPER_UPDATED, "c"), (PAPER_ADDED, "d"), (PAPER_REMOVED, "b")]
+    assert changes[0].old_hash != changes[0].new_hash == jh.getHash("c")
+
+
+def test_cache_entries_are_dropped_with_their_papers():
+    jh = corpus()
+    cache = DerivedCache(jh)
+    cache.put("ab", 1, ["a", "b"])
+    cache.put("c", 2, ["c"])
+    assert cache.get("ab") == 1
+    jh.updatePaper({"paper_id": "b", "title": "changed", "references": ["c"]})
+    assert "ab" not in cache and cache.get("c") == 2
+    assert cache.getOrCompute("ab", ["a", "b"], lambda: 3) == 3
+    assert cache.getStats() == {"entries": 2, "hits": 2, "misses": 1, "invalidated": 1}
+
+
+def test_followed_tree_applies_corpus_changes():
+    jh = corpus()
+    tree = ReferenceTreeBuilder.fromCorpus(jh)
+    jh.removePaper("c")
+    assert not tree.hasNode("c") and tree.getReferences("b") == []
+    # the citing paper is reconnected once the paper comes back
+    jh.addPaper({"paper_id": "c", "references": []})
+    assert tree.getReferences("b") == ["c"]
+    jh.updatePaper({"paper_id": "a", "title": "A", "references": ["c"]})
+    assert tree.getReferences("a") == ["c"]
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from CiteSide.FileHandler.JsonHandler import JsonHandler
+from CiteSide.FileHandler.LazyJsonlStore import LazyJsonlStore
+from CiteSide.FileHandler.SqliteStore import SqliteStore
+
+
+def write_corpus(path, papers=20):
+    records = []
+    for i in range(papers):
+        text = f"Paper {i} reports a mean incubation period of {i % 7 + 4} days (Lai, 2020). Other cohorts agree."
+        records.append({
+            "paper_id": f"P{i:03d}",
+            "title": f"Incubation study {i}",
+            "full_text": text,
+            "authors": f"Ann Lai and Bo Kim {i}",
+            "year": str(2000 + i),
+            "references": [f"P{j:03d}" for j in range(max(0, i - 3), i)],
+            "sentence_spans": [[0, text.index(")") + 2]],
+            "citation_spans": [[text.index("(Lai"), len("(Lai, 2020)"), f"P{max(0, i - 1):03d}"]],
+        })
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def write_shard(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_small_shards_load_sequentially_and_first_duplicate_wins(tmp_path):
+    write_shard(tmp_path / "corpus-00000.jsonl", [{"paper_id": "a", "title": "first"}, {"paper_id": "b"}])
+    write_shard(tmp_path / "corpus-00001.jsonl", [{"paper_id": "a", "title": "second"}, {"paper_id": "c"}])
+    write_shard(tmp_path / "corpus-00000.refs.jsonl", [{"paper_id": "a", "refs": []}])
+
+    jh = JsonHandler()
+    stats = jh.loadShards(str(tmp_path), workers=4)
+    assert stats["workers"] == 1
+    assert stats["papers"] == 3 and stats["duplicates"] == 1
+    assert list(jh.getIds()) == ["a", "b", "c"]
+    assert jh.getTitle("a") == "first"
+
+
+def getters(jh, paper_id):
+    return (jh.getTitle(paper_id), jh.getFullText(paper_id), jh.getAuthors(paper_id), jh.getYear(paper_id),
+            jh.getOutgoingRefs(paper_id), jh.getSentenceSpans(paper_id), jh.getCitationSpans(paper_id))
+
+
+def test_lazy_store_matches_eager_loading_and_keeps_its_index(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    write_corpus(path)
+    eager = JsonHandler()
+    eager.loadDataset(str(path))
+    lazy = JsonHandler()
+    lazy.loadDataset(str(path), lazy=True)
+    assert isinstance(lazy.getFiles(), LazyJsonlStore)
+    assert list(lazy.getIds()) == list(eager.getIds())
+    for paper_id in eager.getIds():
+        assert getters(lazy, paper_id) == getters(eager, paper_id)
+    assert LazyJsonlStore.indexPath(str(path)).exists()
+    assert LazyJsonlStore(str(path))._offsets == lazy.getFiles()._offsets
+
+    with pytest.raises(ValueError):
+        lazy.addPaper({"paper_id": "new"})
+
+
+def test_sqlite_store_matches_the_other_backends(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    write_corpus(path)
+    db = tmp_path / "corpus.sqlite"
+    assert SqliteStore.importFile(str(path), str(db), batch_size=7) == 20
+    backends = [JsonHandler() for _ in range(3)]
+    backends[0].loadDataset(str(path))
+    backends[1].loadDataset(str(path), lazy=True)
+    backends[2].loadSqlite(str(db))
+    eager, lazy, sqlite = backends
+    assert list(sqlite.getIds()) == list(eager.getIds())
+    for paper_id in eager.getIds():
+        assert getters(sqlite, paper_id) == getters(lazy, paper_id) == getters(eager, paper_id)
+
+    # the SQLite corpus stays writable
+    paper_id = next(iter(eager.getIds()))
+    assert sqlite.updatePaper({**eager.getAll(paper_id), "title": "changed"})
+    assert sqlite.getTitle(paper_id) == "changed"
+    sqlite.removePaper(paper_id)
+    assert sqlite.getAll(paper_id) is None and len(sqlite.getFiles()) == 19
+
+
+def test_sqlite_store_keeps_field_types(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    typed = {"paper_id": "typed", "title": "t", "full_text": "x", "year": 2021, "authors": ["A. B", "C. D"],
+             "references": ["p0"], "sentence_spans": [[0, 1]]}
+    path.write_text(json.dumps(typed) + "\n", encoding="utf-8")
+    db = tmp_path / "corpus.sqlite"
+    SqliteStore.importFile(str(path), str(db))
+    eager, sqlite = JsonHandler(), JsonHandler()
+    eager.loadDataset(str(path))
+    sqlite.loadSqlite(str(db))
+    assert sqlite.getYear("typed") == 2021 and sqlite.getAuthors("typed") == ["A. B", "C. D"]
+    assert getters(sqlite, "typed") == getters(eager, "typed")
+    assert sqlite.getAll("typed") == eager.getAll("typed")
+    assert sqlite.getHash("typed") == eager.getHash("typed")
+    assert sqlite.getFiles().getIdsByYear(2021) == ["typed"]
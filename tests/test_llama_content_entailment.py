@@ -0,0 +1,18 @@
+import math
+
+from CiteSide.UsageValidator.LlamaContentEntailment import LlamaContentEntailment
+from CiteSide.UsageValidator.StubModels import StubLlama
+
+
+def test_select_label_returns_the_top_probability():
+    entailment = LlamaContentEntailment(llm=StubLlama())
+    label, p = entailment.select_label({"SUPPORTS": math.log(0.7), "CONTRADICTS": math.log(0.2), "UNKNOWN": math.log(0.1)})
+    assert label == "SUPPORTS"
+    assert math.isclose(p, 0.7)
+
+
+def test_select_label_without_a_clear_winner_keeps_the_top_probability():
+    entailment = LlamaContentEntailment(llm=StubLlama())
+    label, p = entailment.select_label({"SUPPORTS": math.log(0.45), "CONTRADICTS": math.log(0.44), "UNKNOWN": math.log(0.11)})
+    assert label == "Could not determine: difference too small"
+    assert math.isclose(p, 0.45)
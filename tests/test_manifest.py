@@ -0,0 +1,60 @@
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("grobid_client")
+
+from InputDataConstruction.Datasets import ApplicationDataPreprocessor as adp
+from InputDataConstruction.Datasets.GrobidStandIn import synthetic_pdf
+
+
+def test_last_line_wins_and_a_torn_line_is_dropped(tmp_path):
+    path = tmp_path / "manifest.jsonl"
+    manifest = adp.Manifest(path)
+    manifest.update("doc0", status=adp.TEI_DONE, pdf_sha256="a")
+    manifest.update("doc0", status=adp.DONE)
+    manifest.update("doc1", status=adp.GROBID_FAILED)
+    manifest.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"doc": "doc2", "sta')
+
+    reopened = adp.Manifest(path)
+    reopened.close()
+    assert reopened.get("doc0")["status"] == adp.DONE and reopened.get("doc0")["pdf_sha256"] == "a"
+    assert reopened.get("doc2") is None
+    # compacted to one line per document
+    assert [json.loads(line)["doc"] for line in path.read_text(encoding="utf-8").splitlines()] == ["doc0", "doc1"]
+
+
+def test_finished_documents_are_skipped(tmp_path):
+    tei = tmp_path / "doc0.grobid.tei.xml"
+    tei.write_text("<TEI/>", encoding="utf-8")
+    output = tmp_path / "doc0.grobid.json"
+    output.write_text("{}", encoding="utf-8")
+    stat = tei.stat()
+    record = {"status": adp.DONE, "pdf_sha256": "a", "grobid_version": "0.8.0", "tei": str(tei),
+              "tei_size": stat.st_size, "tei_mtime_ns": stat.st_mtime_ns, "outputs": [str(output)]}
+    assert not adp.needs_grobid(record, "a", "0.8.0")
+    assert not adp.needs_conversion(record, tei)
+
+    assert adp.needs_grobid(record, "b", "0.8.0")
+    assert adp.needs_grobid(record, "a", "0.8.1")
+    assert adp.needs_grobid({**record, "status": adp.GROBID_FAILED}, "a", "0.8.0")
+    output.unlink()
+    assert adp.needs_conversion(record, tei)
+
+
+def test_pdfs_staged_for_grobid_are_converted_and_recorded(monkeypatch, tmp_path):
+    pdfs, out = tmp_path / "pdfs", tmp_path / "out"
+    pdfs.mkdir()
+    for i in range(2):
+        (pdfs / f"doc{i}.pdf").write_bytes(synthetic_pdf(i))
+    monkeypatch.setattr(sys, "argv", ["ApplicationDataPreprocessor.py", "--input", str(pdfs), "--output", str(out),
+                                      "--workers", "1", "--grobid-standin"])
+    adp.main()
+    manifest = adp.Manifest(out / "manifest.jsonl")
+    manifest.close()
+    assert [manifest.get(f"doc{i}")["status"] for i in range(2)] == [adp.DONE, adp.DONE]
+    assert sorted(path.name for path in out.glob("*.grobid.json")) == ["doc0.grobid.json", "doc1.grobid.json"]
+    assert not list(out.glob("grobid_stage_*"))
@@ -0,0 +1,29 @@
+import pytest
+
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+
+def chain(n):
+    tree = ReferenceTreeBuilder()
+    tree.create([str(i) for i in range(n)], [(str(i), str(i + 1), 0.5) for i in range(n - 1)])
+    return tree
+
+
+def test_crawl_is_exported_headless(tmp_path):
+    crawl = chain(5).buildCrawlTree("0", 3).materialize()
+    crawl.plotTree(path=str(tmp_path / "crawl.svg"))
+    crawl.plotTree(path=str(tmp_path / "crawl.html"))
+    assert (tmp_path / "crawl.svg").read_text(encoding="utf-8").lstrip().startswith("<?xml")
+    assert "<svg" in (tmp_path / "crawl.html").read_text(encoding="utf-8")
+
+
+def test_large_graph_uses_the_fast_layout(tmp_path):
+    tree = chain(40)
+    tree.plotTree(path=str(tmp_path / "large.png"), large_threshold=10)
+    assert (tmp_path / "large.png").read_bytes().startswith(b"\x89PNG")
+    assert tree._layout_cache[0][1] is True
+
+
+def test_unknown_export_format_raises(tmp_path):
+    with pytest.raises(ValueError):
+        chain(2).plotTree(path=str(tmp_path / "tree.pdf"))
@@ -0,0 +1,108 @@
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("grobid_client")
+
+from InputDataConstruction.Datasets import ApplicationDataPreprocessor as adp
+from InputDataConstruction.Datasets.GrobidStandIn import synthetic_pdf
+
+
+def run_preprocessor(monkeypatch, pdfs, out, corpus, *extra):
+    argv = ["ApplicationDataPreprocessor.py", "--input", str(pdfs), "--output", str(out), "--corpus", str(corpus),
+            "--no-paper-files", "--workers", "1", "--grobid-standin", *extra]
+    monkeypatch.setattr(sys, "argv", argv)
+    adp.main()
+
+
+def corpus_ids(corpus_dir, pattern):
+    ids = []
+    for path in sorted(corpus_dir.glob(pattern)):
+        if path.name.endswith(".refs.jsonl"):
+            continue
+        with open(path, encoding="utf-8") as f:
+            ids += [json.loads(line)["paper_id"] for line in f if line.strip()]
+    return ids
+
+
+@pytest.mark.parametrize("shard_args, pattern", [((), "corpus.jsonl"), (("--shard-size", "2"), "corpus-*.jsonl")])
+def test_rerun_keeps_papers_of_earlier_runs(monkeypatch, tmp_path, shard_args, pattern):
+    pdfs, out, corpus_dir = tmp_path / "pdfs", tmp_path / "out", tmp_path / "corpus"
+    pdfs.mkdir()
+    for i in range(4):
+        (pdfs / f"doc{i}.pdf").write_bytes(synthetic_pdf(i))
+    run_preprocessor(monkeypatch, pdfs, out, corpus_dir / "corpus.jsonl", *shard_args)
+    assert sorted(corpus_ids(corpus_dir, pattern)) == [f"doc{i}.grobid" for i in range(4)]
+
+    (pdfs / "doc4.pdf").write_bytes(synthetic_pdf(4))
+    run_preprocessor(monkeypatch, pdfs, out, corpus_dir / "corpus.jsonl", *shard_args)
+    assert sorted(corpus_ids(corpus_dir, pattern)) == [f"doc{i}.grobid" for i in range(5)]
+
+    manifest = adp.Manifest(out / "manifest.jsonl")
+    manifest.close()
+    for i in range(5):
+        record = manifest.get(f"doc{i}")
+        with open(record["corpus"], encoding="utf-8") as f:
+            line = [line for line in f if line.strip()][record["corpus_line"]]
+        assert json.loads(line)["paper_id"] == f"doc{i}.grobid"
+
+
+def test_rewritten_paper_replaces_its_old_line(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    for version in (1, 2):
+        writer = adp.CorpusWriter(path, shard_size=2)
+        papers = ["a", "b", "c"] if version == 1 else ["b"]
+        for paper_id in papers:
+            writer.write({"paper_id": paper_id, "version": version}, [])
+        writer.close()
+
+    records = {}
+    for shard in sorted(tmp_path.glob("corpus-*.jsonl")):
+        if not shard.name.endswith(".refs.jsonl"):
+            for line in shard.read_text(encoding="utf-8").splitlines():
+                record = json.loads(line)
+                assert record["paper_id"] not in records
+                records[record["paper_id"]] = record["version"]
+    assert records == {"a": 1, "b": 2, "c": 1}
+    assert writer.locations["b"] == (tmp_path / "corpus-00002.jsonl", 0)
+
+
+class SilentGrobidClient:
+    """GROBID client that produces no TEI, like a server failing on every PDF."""
+
+    def __init__(self, grobid_server):
+        pass
+
+    def process(self, *args, **kwargs):
+        pass
+
+
+def test_replaced_pdf_with_old_mtime_never_reuses_the_old_tei(monkeypatch, tmp_path):
+    pdfs, out, corpus = tmp_path / "pdfs", tmp_path / "out", tmp_path / "corpus.jsonl"
+    pdfs.mkdir()
+    pdf = pdfs / "doc0.pdf"
+    pdf.write_bytes(synthetic_pdf("old"))
+    run_preprocessor(monkeypatch, pdfs, out, corpus)
+    old_title = json.loads(corpus.read_text(encoding="utf-8"))["title"]
+
+    # replaced like cp -p / rsync -t would do it: new content, mtime older than the TEI
+    stat = pdf.stat()
+    pdf.write_bytes(synthetic_pdf("new"))
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    monkeypatch.setattr(adp, "GrobidClient", SilentGrobidClient)
+    run_preprocessor(monkeypatch, pdfs, out, corpus)
+    manifest = adp.Manifest(out / "manifest.jsonl")
+    manifest.close()
+    assert manifest.get("doc0")["status"] == adp.GROBID_FAILED
+    assert adp.tei_for_pdf(pdf, out) is None
+
+    monkeypatch.undo()
+    run_preprocessor(monkeypatch, pdfs, out, corpus)
+    lines = corpus.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])["title"] != old_title
+    manifest = adp.Manifest(out / "manifest.jsonl")
+    manifest.close()
+    assert manifest.get("doc0")["tei_pdf_sha256"] == adp.file_sha256(pdf)
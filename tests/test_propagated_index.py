@@ -0,0 +1,26 @@
+import math
+
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+CONTRADICTED = 0.05
+SUPPORTED = 0.95
+
+
+def chain(first: float, second: float):
+    # A cites B, B cites C
+    tree = ReferenceTreeBuilder()
+    tree.create(["A", "B", "C"], [("A", "B", first), ("B", "C", second)])
+    tree.buildPropagatedCritIndex()
+    return tree
+
+
+def test_contradicted_direct_citation_stays_critical():
+    tree = chain(CONTRADICTED, SUPPORTED)
+    assert tree.getPropagatedCrit("A") <= CONTRADICTED
+    assert math.isclose(tree.getPropagatedCrit("B"), SUPPORTED)
+    assert tree.getPropagatedCrit("C") == -1.0
+
+
+def test_contradicted_descendant_lowers_the_ancestor():
+    assert chain(SUPPORTED, CONTRADICTED).getPropagatedCrit("A") < chain(SUPPORTED, SUPPORTED).getPropagatedCrit("A")
+    assert chain(CONTRADICTED, CONTRADICTED).getPropagatedCrit("A") < CONTRADICTED
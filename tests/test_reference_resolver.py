@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from InputDataConstruction.Datasets.ReferenceResolver import resolve_corpus
+
+PAPERS = [
+    {"paper_id": "lai", "title": "Severe acute respiratory syndrome coronavirus 2 incubation", "year": "2020",
+     "authors": "Ann Lai and Bo Kim", "doi": "10.1000/lai"},
+    {"paper_id": "li", "title": "Early Transmission Dynamics in Wuhan, China", "year": "2020", "authors": "Qun Li"},
+    {"paper_id": "wang", "title": "Clinical characteristics of 138 hospitalized patients with novel coronavirus",
+     "year": "2020", "authors": "Dawei Wang"},
+]
+REFS = [
+    {"ref_id": "R_doi", "title": "Another title entirely", "doi": "https://doi.org/10.1000/LAI"},
+    {"ref_id": "R_exact", "title": "Early transmission dynamics in Wuhan, China.", "year": "2020", "authors": ["Qun Li"]},
+    {"ref_id": "R_fuzzy", "title": "Clinical characteristics of 138 hospitalised patients with novel coronavirus",
+     "year": "2021", "authors": ["D. Wang"]},
+    {"ref_id": "R_other_author", "title": "Clinical characteristics of 138 hospitalized patients with novel coronavirus",
+     "year": "2020", "authors": ["Zoe Miller"]},
+    {"ref_id": "R_unknown", "title": "Something nobody wrote", "year": "1999"},
+]
+
+
+def test_references_resolve_by_doi_exact_and_fuzzy_title(tmp_path):
+    corpus = tmp_path / "corpus.jsonl"
+    records = [dict(paper, references=[ref["ref_id"] for ref in REFS]) for paper in PAPERS]
+    corpus.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+    # the companion lists the reference objects per citing paper
+    (tmp_path / "corpus.refs.jsonl").write_text(json.dumps({"paper_id": "lai", "refs": REFS}) + "\n", encoding="utf-8")
+
+    stats = resolve_corpus(str(corpus), tmp_path / "resolved")
+    assert (stats["doi"], stats["exact"], stats["fuzzy"], stats["unresolved"]) == (1, 1, 1, 2)
+    resolved = {}
+    for line in (tmp_path / "resolved" / "corpus.jsonl").read_text(encoding="utf-8").splitlines():
+        record = json.loads(line)
+        resolved[record["paper_id"]] = record["references"]
+    # a paper resolving to itself drops the self-citation
+    assert resolved["lai"] == ["li", "wang", "R_other_author", "R_unknown"]
+    assert resolved["li"] == ["lai", "wang", "R_other_author", "R_unknown"]
+    assert resolved["wang"] == ["lai", "li", "R_other_author", "R_unknown"]
+
+
+def test_companions_are_copied_and_colliding_outputs_fail(tmp_path):
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.jsonl").write_text(json.dumps(dict(PAPERS[0], references=["R_exact"])) + "\n", encoding="utf-8")
+    (corpus / "a.refs.jsonl").write_text(json.dumps({"paper_id": "lai", "refs": REFS}) + "\n", encoding="utf-8")
+    (corpus / "b.json").write_text(json.dumps([dict(PAPERS[1], references=["R_doi"])]), encoding="utf-8")
+
+    resolve_corpus(str(corpus), tmp_path / "resolved")
+    assert sorted(p.name for p in (tmp_path / "resolved").iterdir()) == \
+        ["a.jsonl", "a.refs.jsonl", "b.jsonl", "resolved_refs.json"]
+    assert (tmp_path / "resolved" / "a.refs.jsonl").read_text(encoding="utf-8") == \
+        (corpus / "a.refs.jsonl").read_text(encoding="utf-8")
+
+    # a.json and a.jsonl would both become a.jsonl
+    (corpus / "a.json").write_text(json.dumps([PAPERS[2]]), encoding="utf-8")
+    with pytest.raises(ValueError):
+        resolve_corpus(str(corpus), tmp_path / "again")
+    assert not (tmp_path / "again").exists()
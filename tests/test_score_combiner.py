@@ -0,0 +1,32 @@
+import math
+
+import numpy as np
+import pytest
+
+from CiteSide.ReferenceTreeTools.ScoreCombiner import ScoreCombiner
+
+
+def test_array_api_matches_scalar_api():
+    nodes = np.array([0.1, 0.5, 0.9, -1.0])
+    edges = np.array([0.3, 0.2, 0.8, 0.4])
+    for mode in ScoreCombiner.modes():
+        combined = ScoreCombiner.combineCritArrays(nodes, edges, mode)
+        for node, edge, value in zip(nodes, edges, combined):
+            assert math.isclose(ScoreCombiner.combineCrits(node, edge, mode), value), mode
+        # a node without index passes the edge weight through
+        assert combined[-1] == 0.4
+
+
+def test_registered_combiner_is_used_and_floored():
+    ScoreCombiner.register("edge_only", lambda node, edge: edge, floor=0.25)
+    try:
+        assert "edge_only" in ScoreCombiner.modes()
+        assert ScoreCombiner.combineCritArrays([0.0, 0.0], [0.5, 0.9], "edge_only").tolist() == [0.5, 0.75]
+    finally:
+        ScoreCombiner._combiners.pop("edge_only")
+        ScoreCombiner._floors.pop("edge_only")
+
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        ScoreCombiner.combineCrits(0.5, 0.5, "unknown")
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+
+
+def scored_tree():
+    tree = ReferenceTreeBuilder()
+    tree.create(["a", "b", "c", "d", "é"], [("a", "b", 0.2), ("a", "c", 0.7), ("b", "d", -1.0), ("c", "é", 0.4)])
+    tree.removeNode("d")
+    tree.buildCombCritIndex()
+    return tree
+
+
+def test_snapshot_round_trip_keeps_edges_weights_and_meta(tmp_path):
+    tree = scored_tree()
+    path = tmp_path / "tree.npz"
+    tree.storeSnapshot(str(path))
+    loaded = ReferenceTreeBuilder.loadSnapshot(str(path))
+    assert sorted(loaded.getEdges()) == sorted(tree.getEdges())
+    assert loaded.build() == tree.build()
+    assert not loaded.hasNode("d")
+    # the loaded tree stays writable
+    loaded.addEdge("b", "é", 0.5)
+    assert loaded.getReferences("b") == ["é"]
+
+
+def test_mapped_snapshot_is_read_only_and_answers_queries(tmp_path):
+    tree = scored_tree()
+    path = tmp_path / "tree.npz"
+    tree.storeSnapshot(str(path))
+    mapped = ReferenceTreeBuilder.openSnapshot(str(path))
+    assert mapped._graph.isReadOnly() and isinstance(mapped._graph.edgeEndpoints()[0], np.memmap)
+    assert sorted(mapped.getEdges()) == sorted(tree.getEdges())
+    assert mapped.hasNode("é") and not mapped.hasNode("d")
+    assert mapped.buildCrawlTree("a", 2).getNodes() == ["a", "b", "c", "é"]
+    with pytest.raises(ValueError):
+        mapped.addEdge("b", "é", 0.5)
+    with pytest.raises(ValueError):
+        mapped.changeWeightOfEdge("a", "b", 0.5)
@@ -0,0 +1,52 @@
+from CiteSide.UsageValidator.SnippetDeduplicator import SnippetDeduplicator
+from CiteSide.UsageValidator.UsageValidator import UsageValidator
+
+CLAIM = "Smoking was associated with severe outcomes in hospitalized patients with COVID-19 (Lai et al., 2020)."
+
+
+def test_near_duplicates_share_a_cluster():
+    dedup = SnippetDeduplicator()
+    first = dedup.assign(CLAIM)
+    assert dedup.assign("Smoking was associated with severe outcomes in hospitalized patients with COVID-19 [12].") == first
+    assert dedup.assign("smoking was associated with severe outcomes in hospitalized patients with covid-19!") == first
+    assert dedup.assign("Hospital capacity was reported weekly by every region.") != first
+
+
+def test_a_cluster_is_validated_once():
+    dedup = SnippetDeduplicator()
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return {"label": "SUPPORTS", "confidence": 0.9}
+
+    first, out = dedup.validate("argument", CLAIM, compute)
+    second, reused = dedup.validate("argument", CLAIM.replace("(Lai et al., 2020)", "[12]"), compute)
+    assert first == second and reused == out and calls == [CLAIM]
+    dedup.validate("other argument", CLAIM, compute)
+    assert len(calls) == 2
+    assert dedup.getStats()["validations"] == 2 and dedup.getStats()["reused"] == 1
+
+
+def test_negated_snippet_is_not_merged():
+    dedup = SnippetDeduplicator(threshold=0.5)
+    first = dedup.assign(CLAIM)
+    assert dedup.assign(CLAIM.replace("was associated", "was not associated")) != first
+    assert dedup.assign(CLAIM.replace("was associated", "wasn't associated")) != first
+
+
+def test_snippets_with_other_numbers_are_not_merged():
+    dedup = SnippetDeduplicator(threshold=0.5)
+    first = dedup.assign("The mean incubation period was 5.2 days in the Wuhan cohort (Li et al., 2020).")
+    assert dedup.assign("The mean incubation period was 14 days in the Wuhan cohort (Li et al., 2020).") != first
+
+
+def test_validator_does_not_deduplicate_by_default():
+    assert UsageValidator.withStubs().snippet_deduplicator is None
+    assert UsageValidator.withStubs(dedup=True).snippet_deduplicator is not None
+
+
+def test_validator_key_follows_the_dedup_settings():
+    assert SnippetDeduplicator(num_perm=32, bands=8).configKey() != SnippetDeduplicator().configKey()
+    assert SnippetDeduplicator(seed=1).configKey() != SnippetDeduplicator().configKey()
+    assert UsageValidator.withStubs(dedup=True).configKey() != UsageValidator.withStubs().configKey()
@@ -0,0 +1,46 @@
+import sys
+
+import numpy as np
+
+from CiteSide.UsageValidator.ContentEntailment import ContentEntailment
+from CiteSide.UsageValidator.LlamaContentEntailment import LlamaContentEntailment
+from CiteSide.UsageValidator.StubModels import StubLlama, StubNli, StubSentenceTransformer
+from CiteSide.UsageValidator.UsageValidator import UsageValidator
+
+ARGUMENT = "The mean incubation period of the virus is between 4 and 14 days."
+SUPPORTING = "The mean incubation period of the virus is between 4 and 14 days."
+NEGATED = "The mean incubation period of the virus is not between 4 and 14 days."
+UNRELATED = "Hospital capacity was reported weekly."
+
+
+def test_stub_embeddings_are_deterministic_and_similar_for_shared_words():
+    model = StubSentenceTransformer()
+    embeddings = model.encode([ARGUMENT, SUPPORTING, UNRELATED], normalize_embeddings=True)
+    assert np.array_equal(embeddings, StubSentenceTransformer().encode([ARGUMENT, SUPPORTING, UNRELATED], normalize_embeddings=True))
+    assert np.allclose(np.linalg.norm(embeddings, axis=1), 1.0)
+    assert embeddings[0] @ embeddings[1] > embeddings[0] @ embeddings[2]
+    assert model.encode(ARGUMENT).shape == (model.dim,)
+
+
+def test_stub_llama_labels_follow_the_rule():
+    entailment = LlamaContentEntailment(llm=StubLlama())
+    assert entailment.validate(SUPPORTING, ARGUMENT)["label"] == "SUPPORTS"
+    assert entailment.validate(NEGATED, ARGUMENT)["label"] == "CONTRADICTS"
+    assert entailment.validate(UNRELATED, ARGUMENT)["label"] == "UNKNOWN"
+
+
+def test_stub_nli_backend():
+    ContentEntailment.useBackend(StubNli())
+    try:
+        assert ContentEntailment.validate(ARGUMENT, SUPPORTING)[0] == "ENTAILMENT"
+        assert ContentEntailment.validate(ARGUMENT, NEGATED)[0] == "CONTRADICTION"
+        assert ContentEntailment.validate(ARGUMENT, UNRELATED)[0] == "NEUTRAL"
+    finally:
+        ContentEntailment.useBackend()
+
+
+def test_stub_validator_loads_no_model_libraries():
+    replies = UsageValidator.withStubs().run(ARGUMENT, SUPPORTING + " " + UNRELATED, [], sentence_spans=[[0, len(SUPPORTING)]])
+    assert replies and replies[0]["snippet"] == SUPPORTING
+    for module in ("llama_cpp", "sentence_transformers", "torch", "transformers"):
+        assert module not in sys.modules
@@ -0,0 +1,81 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("grobid_client")
+
+from InputDataConstruction.Datasets import ApplicationDataPreprocessor as adp
+from InputDataConstruction.Datasets.GrobidStandIn import synthetic_tei
+
+TEI = """<?xml version="1.0" encoding="UTF-8"?>
+<TEI xmlns="http://www.tei-c.org/ns/1.0">
+<teiHeader><fileDesc><titleStmt><title level="a" type="main">Incubation of the virus</title></titleStmt>
+<publicationStmt><date type="published" when="2020">2020</date></publicationStmt>
+<sourceDesc><biblStruct><analytic><author><persName><forename type="first">Ann</forename><surname>Lai</surname></persName></author></analytic>
+<idno type="DOI">10.1/abc</idno><monogr><imprint><date type="published" when="2020"/></imprint></monogr></biblStruct></sourceDesc></fileDesc>
+<profileDesc><abstract><div><p>Short abstract.</p></div></abstract></profileDesc></teiHeader>
+<text><body><div><head>Intro</head>
+<p>The mean incubation period is 5 days <ref type="bibr" target="#b0">[1]</ref>. It is not 20 days.</p>
+<p>Cases rose quickly <ref type="bibr" target="#b1">[2]</ref>.</p></div></body>
+<back><div type="references"><listBibl>
+<biblStruct xml:id="b0"><analytic><title level="a" type="main">Early transmission dynamics</title><author><persName><forename type="first">Qun</forename><surname>Li</surname></persName></author></analytic><monogr><imprint><date type="published" when="2020"/></imprint></monogr></biblStruct>
+<biblStruct xml:id="b1"><analytic><title level="a" type="main">A cohort study</title><author><persName><forename type="first">Bo</forename><surname>Kim</surname></persName></author><author><persName><surname>Wang</surname></persName></author><author><persName><surname>Smith</surname></persName></author></analytic><monogr><imprint><date type="published" when="2019"/></imprint></monogr></biblStruct>
+</listBibl></div></back></text></TEI>
+"""
+FULL_TEXT = "The mean incubation period is 5 days (Li, 2020). It is not 20 days. Cases rose quickly (Kim et al., 2019)."
+
+
+def write_tei(tmp_path) -> Path:
+    path = tmp_path / "doc.grobid.tei.xml"
+    path.write_text(TEI, encoding="utf-8")
+    return path
+
+
+def test_tei_fields_and_inline_citations(tmp_path):
+    paper, refs = adp.tei_to_outputs(write_tei(tmp_path))
+    assert paper["paper_id"] == "doc.grobid"
+    assert (paper["title"], paper["authors"], paper["year"], paper["doi"]) == ("Incubation of the virus", "Ann Lai", "2020", "10.1/abc")
+    assert paper["abstract"] == "Short abstract."
+    assert paper["full_text"] == FULL_TEXT
+    assert [ref["title"] for ref in refs] == ["Early transmission dynamics", "A cohort study"]
+    assert paper["references"] == [ref["ref_id"] for ref in refs]
+
+
+def convert(monkeypatch, tmp_path, name, workers):
+    pdfs, out = tmp_path / "pdfs", tmp_path / name
+    pdfs.mkdir(exist_ok=True)
+    out.mkdir()
+    for i in range(6):
+        (out / f"doc{i}.grobid.tei.xml").write_text(synthetic_tei(i, n_paragraphs=5), encoding="utf-8")
+    monkeypatch.setattr(sys, "argv", ["ApplicationDataPreprocessor.py", "--input", str(pdfs), "--output", str(out),
+                                      "--workers", str(workers), "--grobid-standin"])
+    adp.main()
+    return {path.name: json.loads(path.read_text(encoding="utf-8")) for path in sorted(out.glob("*.json"))}
+
+
+def test_process_pool_converts_like_a_single_process(monkeypatch, tmp_path):
+    single = convert(monkeypatch, tmp_path, "single", 1)
+    pooled = convert(monkeypatch, tmp_path, "pooled", 3)
+    assert len(single) == 12
+    assert pooled == single
+
+
+def test_spans_point_at_sentences_and_citation_markers(monkeypatch, tmp_path):
+    # a plain splitter on ". " instead of punkt, which needs a download
+    def split(text):
+        spans, start = [], 0
+        for end in [i + 1 for i in range(len(text)) if text.startswith(". ", i)] + [len(text)]:
+            spans.append((start, end - start))
+            start = end + 1
+        return spans
+
+    monkeypatch.setattr(adp, "sentence_spans", split)
+    paper, refs = adp.tei_to_outputs(write_tei(tmp_path), spans=True)
+    text = paper["full_text"]
+    assert text == FULL_TEXT
+    assert [text[offset:offset + length] for offset, length in paper["sentence_spans"]] == [
+        "The mean incubation period is 5 days (Li, 2020).", "It is not 20 days.", "Cases rose quickly (Kim et al., 2019)."]
+    assert [(text[offset:offset + length], ref_id) for offset, length, ref_id in paper["citation_spans"]] == [
+        ("(Li, 2020)", refs[0]["ref_id"]), ("(Kim et al., 2019)", refs[1]["ref_id"])]
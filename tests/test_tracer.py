@@ -0,0 +1,76 @@
+import json
+import threading
+
+from CiteSide.Runner.Tracer import Tracer
+
+
+def test_spans_and_counters_are_attributed_to_paper_and_depth(tmp_path):
+    tracer = Tracer()
+    for paper_id, depth in (("P0", 0), ("P1", 1), ("P2", 1)):
+        with tracer.paper(paper_id, depth):
+            with tracer.span("entailment"):
+                tracer.count("llm_calls", 3)
+    tracer.count("unattributed")
+
+    summary = tracer.summary()
+    assert summary["stages"]["paper"]["calls"] == 3 and summary["stages"]["entailment"]["calls"] == 3
+    assert summary["counters"] == {"llm_calls": 9, "unattributed": 1}
+    assert summary["papers"]["P1"]["counters"] == {"llm_calls": 3}
+    assert summary["depths"]["1"]["entailment"]["calls"] == 2
+    assert summary["depths"]["1"]["counters"] == {"llm_calls": 6}
+
+    trace_path, summary_path = tracer.export(str(tmp_path / "trace.json"))
+    assert summary_path.name == "trace.summary.json"
+    events = json.loads(trace_path.read_text(encoding="utf-8"))["traceEvents"]
+    papers = [event["args"]["paper_id"] for event in events if event["name"] == "paper"]
+    assert papers == ["P0", "P1", "P2"]
+
+
+def test_concurrent_papers_keep_their_own_spans():
+    tracer = Tracer()
+    entered = threading.Barrier(2)
+    counted = threading.Barrier(2)
+
+    def validate(paper_id, depth):
+        with tracer.paper(paper_id, depth):
+            # both papers are open before either records anything
+            entered.wait()
+            with tracer.span("entailment"):
+                tracer.count("llm_calls", depth + 1)
+            counted.wait()
+
+    threads = [threading.Thread(target=validate, args=(f"P{depth}", depth)) for depth in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    papers = tracer.summary()["papers"]
+    for depth in range(2):
+        assert papers[f"P{depth}"]["entailment"]["calls"] == 1
+        assert papers[f"P{depth}"]["counters"] == {"llm_calls": depth + 1}
+    assert tracer.summary()["depths"]["1"]["counters"] == {"llm_calls": 2}
+
+
+def test_chrome_trace_puts_each_thread_on_its_own_track():
+    tracer = Tracer()
+    idents = {}
+    # both threads are alive together, so their idents differ
+    running = threading.Barrier(2)
+
+    def validate(paper_id):
+        idents[paper_id] = threading.get_ident()
+        with tracer.paper(paper_id):
+            tracer.count("llm_calls")
+            running.wait()
+
+    threads = [threading.Thread(target=validate, args=(f"P{i}",)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    events = tracer.chromeTrace()["traceEvents"]
+    spans = {event["args"]["paper_id"]: event["tid"] for event in events if event["ph"] == "X"}
+    assert spans == idents and len(set(idents.values())) == 2
+    assert {event["tid"] for event in events if event["ph"] == "C"} == set(idents.values())
@@ -0,0 +1,45 @@
+from CiteSide.Benchmark.SyntheticCorpus import SyntheticCorpus
+from CiteSide.FileHandler.DerivedCache import DerivedCache
+from CiteSide.FileHandler.JsonHandler import JsonHandler
+from CiteSide.ReferenceTreeTools.ReferenceTreeBuilder import ReferenceTreeBuilder
+from CiteSide.Runner import ValidationRunner
+from CiteSide.Runner.RunContext import RunContext
+from CiteSide.UsageValidator.UsageValidator import UsageValidator
+
+ARGUMENT = "The mean incubation period of the virus is between 4 and 14 days."
+
+
+def stub_corpus(tmp_path, papers=40):
+    # few references cited often, so the crawl reaches papers more than once
+    path = tmp_path / "corpus.jsonl"
+    SyntheticCorpus(papers, references=3, sentences=20, citation_rate=0.6, seed=1).write(str(path))
+    jh = JsonHandler()
+    jh.loadDataset(str(path))
+    return jh
+
+
+def test_papers_reached_twice_do_not_warn(tmp_path, capsys):
+    jh = stub_corpus(tmp_path)
+    root = SyntheticCorpus.paperId(39)
+    context = RunContext(jh, ReferenceTreeBuilder.fromCorpus(jh, follow=False), UsageValidator.withStubs())
+    searched_tree, replys = ValidationRunner.run(ARGUMENT, root, context, plot=False)
+    linked = [reply["paper_id"] for reply in replys if reply["paper_id"]]
+    assert len(linked) > len(set(linked))
+    assert searched_tree.hasNode(root)
+    assert "WARNING" not in capsys.readouterr().out
+
+
+def test_cached_replies_are_not_shared_between_validator_setups(tmp_path):
+    jh = stub_corpus(tmp_path)
+    root = SyntheticCorpus.paperId(39)
+    full_tree = ReferenceTreeBuilder.fromCorpus(jh, follow=False)
+    cache = DerivedCache(jh)
+    ValidationRunner.run(ARGUMENT, root, RunContext(jh, full_tree, UsageValidator.withStubs(), cache), plot=False)
+    entries, hits = len(cache), cache.getStats()["hits"]
+
+    ValidationRunner.run(ARGUMENT, root, RunContext(jh, full_tree, UsageValidator.withStubs(dedup=True), cache), plot=False)
+    assert cache.getStats()["hits"] == hits
+    assert len(cache) == 2 * entries
+
+    ValidationRunner.run(ARGUMENT, root, RunContext(jh, full_tree, UsageValidator.withStubs(), cache), plot=False)
+    assert cache.getStats()["hits"] > hits